@@ -13,6 +13,8 @@ import pandas as pd
 from pathlib import Path
 import base64
 
+from seagrass.quality import validate_dataset
+
 # Page configuration
 st.set_page_config(
     page_title="Mediterranean Seagrass Intelligence Panel",
@@ -282,6 +284,12 @@ def load_data():
     return pd.read_csv(data_path)
 
 
+@st.cache_data
+def check_data_quality(dataframe):
+    """Run the data-quality gate once per loaded dataset"""
+    return validate_dataset(dataframe)
+
+
 # ==================== HELPER FUNCTIONS ====================
 def encode_image_to_base64(image_path):
     """Encode image to base64 string"""
@@ -321,6 +329,12 @@ except Exception as e:
     st.error(f"❌ Error loading data: {e}")
     st.stop()
 
+quality = check_data_quality(df)
+if not quality.passed:
+    st.error(f"❌ Data quality check {quality.summary()}")
+    st.dataframe(quality.issues, use_container_width=True, hide_index=True)
+    st.stop()
+
 
 # ==================== SIDEBAR CONFIGURATION ====================
 # Sidebar title (with circular seagrass logo if available)
@@ -412,6 +426,12 @@ st.sidebar.markdown(
     unsafe_allow_html=True
 )
 
+# Data quality gate result
+with st.sidebar.expander("🩺 Data Quality", expanded=False):
+    st.caption(quality.summary())
+    for _, issue in quality.warnings.iterrows():
+        st.markdown(f"⚠️ **{issue['Check']}**: {issue['Detail']} ({issue['Rows']:,} rows)")
+
 # Link to original data on Mendeley
 st.sidebar.markdown("### 🔗 Original Data")
 st.sidebar.markdown(
@@ -138,3 +138,222 @@ def render_footer():
         </div>
         """, unsafe_allow_html=True)
 
+
+
+@st.cache_resource
+def run_store():
+    """Shared experiment-run store (seeded with the notebook results on first use)"""
+    from seagrass.runs import get_run_store
+
+    return get_run_store()
+
+
+def load_run_results(task, cv_strategy, pinned=False, intervals=None):
+    """Latest run per model from the run store (the pinned one instead, where a model has one)"""
+    return run_store().results_table(task, cv_strategy, pinned=pinned, intervals=intervals)
+
+
+CI_METHODS = {"Zone-block bootstrap": 'zone', "Station bootstrap": 'station'}
+
+
+def render_ci_selector(key, spatial):
+    """Radio choosing the bootstrap intervals shown with the results (zone blocks by default under spatial CV)"""
+    label = st.radio(
+        "Confidence intervals (95%):",
+        list(CI_METHODS),
+        index=0 if spatial else 1,
+        horizontal=True,
+        help="Percentile bootstrap over the stored out-of-fold predictions: zone blocks resample whole "
+             "geographic zones, stations resample individual stations",
+        key=f"{key}_ci"
+    )
+    return CI_METHODS[label]
+
+
+def interval_trace(results, metric):
+    """Scatter trace of the pooled out-of-fold estimates with their bootstrap intervals (None without intervals)
+
+    The intervals are bootstrapped around the pooled estimate, which differs from the fold mean shown
+    by the bars, so they are drawn around their own estimate.
+    """
+    import plotly.graph_objects as go
+
+    estimate, low, high = (f'{metric}_{bound}' for bound in ('estimate', 'low', 'high'))
+    if estimate not in results.columns or results[estimate].isna().all():
+        return None
+    upper, lower = results[high] - results[estimate], results[estimate] - results[low]
+    return go.Scatter(
+        x=results['Model'], y=results[estimate], mode='markers', name='Pooled OOF estimate', showlegend=False,
+        marker=dict(symbol='diamond', size=9, color='#333'),
+        error_y=dict(type='data', symmetric=False, color='#333', thickness=1.5,
+                     array=upper.astype(object).where(upper.notna(), None).tolist(),
+                     arrayminus=lower.astype(object).where(lower.notna(), None).tolist()),
+        hovertemplate='<b>%{x}</b><br>Pooled ' + metric + ': %{y:.3f}<extra></extra>'
+    )
+
+
+def with_interval_text(results, metrics):
+    """Results table with the interval columns replaced by one 'estimate [low, high]' text column per metric"""
+    table = results.copy()
+    for metric in metrics:
+        estimate, low, high = (f'{metric}_{bound}' for bound in ('estimate', 'low', 'high'))
+        if low in table.columns:
+            text = (table[estimate].map('{:.3f}'.format) + ' [' + table[low].map('{:.3f}'.format) + ', '
+                    + table[high].map('{:.3f}'.format) + ']')
+            table[f'{metric} pooled (95% CI)'] = text.where(table[low].notna(), '–')
+            table = table.drop(columns=[estimate, low, high])
+    return table
+
+
+def render_run_history(task, key):
+    """Expander with the recorded runs of a task and a pin/unpin control"""
+    store = run_store()
+    with st.expander("🗂️ Run history"):
+        runs = store.runs(task=task, limit=200)
+        if runs.empty:
+            st.info("No runs recorded yet. Record one with `python -m seagrass.runs --evaluate rf`.")
+            return
+        st.dataframe(runs.drop(columns=['task']), use_container_width=True, hide_index=True)
+
+        by_id = runs.set_index('run_id')
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            run_id = st.selectbox("Run:", by_id.index.tolist(), key=f"{key}_pin_run",
+                                  format_func=lambda r: f"#{r} - {by_id.loc[r, 'model_name']} "
+                                                        f"({by_id.loc[r, 'cv_strategy']})")
+        with col2:
+            pinned = bool(by_id.loc[run_id, 'pinned'])
+            if st.button("📌 Unpin" if pinned else "📌 Pin", key=f"{key}_pin_button"):
+                store.pin(run_id, pinned=not pinned)
+                st.rerun()
+
+
+@st.cache_data(show_spinner=False)
+def load_summary_state(df):
+    """Mergeable statistics of df per presence class, merged from the partitions cached in data/stats/"""
+    from seagrass.summaries import dataset_state
+
+    return dataset_state(df)[0]
+
+
+@st.cache_data(show_spinner=False)
+def load_oof_frames(run_ids):
+    """Stored out-of-fold predictions of the given runs (cached per run id tuple)"""
+    from seagrass.oof import load_oof
+
+    return load_oof(list(run_ids), run_store())
+
+
+@st.cache_data(show_spinner=False)
+def load_threshold_curve(run_id):
+    """Metrics at every distinct threshold of a binary run's stored scores (computed once per run)"""
+    from seagrass.oof import SCORE_COL, threshold_curve
+
+    frame = load_oof_frames((run_id,))
+    return threshold_curve(frame['y_true'], frame[SCORE_COL])
+
+
+@st.cache_data(show_spinner=False)
+def load_zone_metrics(run_id):
+    """Per-zone metrics of a run's stored out-of-fold predictions (computed once per run)"""
+    from seagrass.oof import DEFAULT_THRESHOLDS, zone_breakdown
+
+    frame = load_oof_frames((run_id,))
+    threshold = DEFAULT_THRESHOLDS[run_store().config(run_id).get('oof_score') or 'probability']
+    return zone_breakdown(frame.dropna(axis=1, how='all'), threshold)
+
+
+def render_zone_breakdown(df, oof_runs, metrics, key):
+    """Per-zone metrics of every run with stored predictions: map, zone x model heatmap and table"""
+    import plotly.express as px
+    import pandas as pd
+
+    from seagrass.dataset import ZONE_COL
+
+    if oof_runs.empty:
+        st.info("Per-zone metrics need stored out-of-fold predictions (see Out-of-Fold Diagnostics above).")
+        return
+
+    zones = pd.concat([load_zone_metrics(int(run['Run'])).assign(Model=run['Model'])
+                       for _, run in oof_runs.iterrows()], ignore_index=True)
+    centroids = df.groupby(ZONE_COL)[['LATITUDE', 'LONGITUDE']].mean().rename_axis('Zone').reset_index()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.selectbox("Metric:", metrics, key=f"{key}_zone_metric")
+    with col2:
+        model = st.selectbox("Model on map:", oof_runs['Model'].tolist(), key=f"{key}_zone_model")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        df_map = zones[zones['Model'] == model].merge(centroids, on='Zone')
+        df_map['Zone Label'] = df_map['Zone'].apply(lambda x: f"Zone {x}")
+        fig_map = px.scatter_mapbox(
+            df_map,
+            lat='LATITUDE',
+            lon='LONGITUDE',
+            color=metric,
+            size='Stations',
+            hover_name='Zone Label',
+            hover_data={metric: ':.3f', 'Stations': True, 'LATITUDE': False, 'LONGITUDE': False},
+            color_continuous_scale='RdYlGn',
+            range_color=[zones[metric].min(), zones[metric].max()],
+            size_max=40,
+            zoom=3.3,
+            height=450
+        )
+        fig_map.update_layout(mapbox_style="open-street-map", title=f"{metric} by Zone - {model}",
+                              margin={"r": 0, "t": 40, "l": 0, "b": 0})
+        st.plotly_chart(fig_map, use_container_width=True)
+    with col2:
+        heatmap = zones.pivot(index='Model', columns='Zone', values=metric)
+        fig_heat = px.imshow(
+            heatmap.values,
+            x=[f"Zone {z}" for z in heatmap.columns],
+            y=heatmap.index.tolist(),
+            text_auto='.2f',
+            color_continuous_scale='RdYlGn',
+            aspect='auto',
+            title=f"{metric} per Zone and Model"
+        )
+        fig_heat.update_layout(height=450)
+        st.plotly_chart(fig_heat, use_container_width=True)
+
+    spread = zones.groupby('Model', sort=False)[metric].agg(['min', 'max', 'std'])
+    st.caption("📏 Zone-to-zone spread of " + metric + ": " +
+               "; ".join(f"{name} {row['min']:.2f}–{row['max']:.2f} (σ {row['std']:.2f})"
+                         for name, row in spread.iterrows()))
+    numeric = [col for col in zones.columns if col not in ('Zone', 'Model', 'Stations', 'Presences', 'Families')]
+    st.dataframe(
+        zones[['Model'] + [col for col in zones.columns if col != 'Model']]
+        .style.format("{:.3f}", subset=numeric, na_rep='–'),
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+def oof_results(results):
+    """Results rows whose runs have stored out-of-fold predictions, with their OOF frame"""
+    run_ids = tuple(int(run_id) for run_id in results['Run'])
+    frames = load_oof_frames(run_ids)
+    if frames.empty:
+        return results.iloc[:0], frames
+    return results[results['Run'].isin(frames['run_id'].unique())], frames
+
+
+def render_oof_compute(df, task, cv_strategy, results, key):
+    """Button that cross-validates a model once and stores its out-of-fold predictions"""
+    from seagrass.models import MODEL_NAMES
+    from seagrass.runs import evaluate_run
+
+    model_ids = {name: model_id for model_id, name in MODEL_NAMES.items()}
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        model = st.selectbox("Model to cross-validate:", [m for m in results['Model'] if m in model_ids],
+                             key=f"{key}_oof_model")
+    with col2:
+        st.markdown("<div style='height: 1.9rem;'></div>", unsafe_allow_html=True)
+        if st.button("▶️ Compute OOF predictions", key=f"{key}_oof_button") and model is not None:
+            with st.spinner(f"Cross-validating {model} ({cv_strategy})..."):
+                evaluate_run(df, model_ids[model], task, cv_strategy, run_store())
+            st.rerun()
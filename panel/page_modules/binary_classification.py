@@ -11,6 +11,21 @@ from plotly.subplots import make_subplots
 import base64
 from pathlib import Path
 
+from seagrass import explain
+from seagrass.models import MODEL_NAMES, TREE_MODELS
+from page_modules import (interval_trace, load_run_results, load_threshold_curve, oof_results, render_ci_selector,
+                          render_oof_compute, render_run_history, render_zone_breakdown, run_store,
+                          with_interval_text)
+from seagrass import oof
+
+
+@st.cache_data(show_spinner="Computing per-station contributions...")
+def load_contribution_tables(df, model_id):
+    """Fit a tree model and cache its per-station contribution tables"""
+    table = explain.explain_dataset(df, model_id, task='binary')
+    return table, explain.group_by_family(table)
+
+
 def show(df):
     """Display binary classification analysis page"""
     
@@ -26,34 +41,10 @@ def show(df):
     </div>
     """, unsafe_allow_html=True)
     
-    # Model comparison data (from EDA notebook - actual tested models)
-    binary_results_stratified = {
-        'Model': ['Random Forest', 'Decision Tree', 'K Neighbors', 'SVM - Linear',
-                  'LDA', 'Ridge Classifier', 'Logistic Regression'],
-        'Accuracy': [0.9878, 0.8898, 0.9342, 0.8636, 0.8299, 0.7387, 0.8165],
-        'Precision': [0.9903, 0.9061, 0.9398, 0.8962, 0.8516, 0.7281, 0.7342],
-        'Recall': [0.9887, 0.8850, 0.9320, 0.8453, 0.8185, 0.7710, 0.7516],
-        'F1': [0.9895, 0.8953, 0.9358, 0.8696, 0.8345, 0.7487, 0.7426],
-        'ROC_AUC': [0.9993, 0.9412, 0.9856, 0.9313, 0.9088, 0.7799, 0.8763]
-    }
-    
-    binary_results_spatial = {
-        'Model': ['Random Forest', 'Decision Tree', 'K Neighbors', 'SVM - Linear',
-                  'LDA', 'Ridge Classifier', 'Logistic Regression'],
-        'Accuracy': [0.8804, 0.7956, 0.8359, 0.8022, 0.7846, 0.8210, 0.7846],
-        'Precision': [0.9308, 0.8327, 0.8767, 0.8561, 0.8463, 0.8465, 0.8524],
-        'Recall': [0.8450, 0.7722, 0.8082, 0.7652, 0.7390, 0.8321, 0.7545],
-        'F1': [0.8827, 0.8011, 0.8409, 0.8081, 0.7886, 0.8324, 0.7843],
-        'ROC_AUC': [0.9558, 0.8507, 0.9217, 0.8778, 0.8642, 0.8871, 0.8865]
-    }
-    
-    df_strat = pd.DataFrame(binary_results_stratified)
-    df_spatial = pd.DataFrame(binary_results_spatial)
-    
     # Model and CV type selection
     st.markdown("## ⚙️ Interactive Model Comparison")
     
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         cv_type = st.selectbox(
@@ -69,9 +60,24 @@ def show(df):
             help="Choose which metric to visualize in the comparison"
         )
     
-    # Select appropriate dataframe
+    with col3:
+        run_selection = st.radio(
+            "Runs to show:",
+            ["Latest runs", "Pinned runs"],
+            horizontal=True,
+            help="Latest run per model from the run store, or its pinned run where one is pinned",
+            key="binary_runs"
+        )
+    
+    # Model results from the run store (latest or pinned run per model)
+    pinned = run_selection == "Pinned runs"
+    ci_method = render_ci_selector("binary", spatial="Spatial" in cv_type)
+    df_strat = load_run_results('binary', 'stratified', pinned, intervals=ci_method)
+    df_spatial = load_run_results('binary', 'spatial', pinned, intervals=ci_method)
     df_results = df_strat if "Stratified" in cv_type else df_spatial
     
+    render_run_history('binary', key="binary")
+    
     # Performance comparison plot
     st.markdown(f"### 📊 Model Performance Comparison - {metric}")
     
@@ -90,6 +96,9 @@ def show(df):
         textposition='outside',
         hovertemplate='<b>%{x}</b><br>' + metric + ': %{y:.2f}<extra></extra>'
     ))
+    intervals = interval_trace(df_results, metric)
+    if intervals is not None:
+        fig_compare.add_trace(intervals)
     
     fig_compare.update_layout(
         title=f"{metric} Comparison - {cv_type}",
@@ -101,6 +110,8 @@ def show(df):
     )
     
     st.plotly_chart(fig_compare, use_container_width=True)
+    st.caption("Bars: mean over CV folds. Diamonds: the metric on the pooled out-of-fold predictions, with "
+               "its 95% bootstrap interval (runs without stored predictions have none).")
     
     # Model selection for detailed view
     st.markdown("### 🔍 Detailed Model Performance")
@@ -108,7 +119,7 @@ def show(df):
     selected_models = st.multiselect(
         "Select models to compare:",
         options=df_results['Model'].tolist(),
-        default=['Random Forest', 'Decision Tree', 'K Neighbors']
+        default=[m for m in ['Random Forest', 'Decision Tree', 'K Neighbors'] if m in df_results['Model'].tolist()]
     )
     
     if selected_models:
@@ -145,7 +156,7 @@ def show(df):
         
         # Detailed metrics table
         st.markdown("#### 📋 Detailed Metrics Table")
-        filtered_results = df_results[df_results['Model'].isin(selected_models)]
+        filtered_results = with_interval_text(df_results[df_results['Model'].isin(selected_models)], metrics_list)
         st.dataframe(
             filtered_results.style.background_gradient(cmap='Greens', 
                                                        subset=['Accuracy', 'Precision', 'Recall', 'F1', 'ROC_AUC'])
@@ -153,6 +164,110 @@ def show(df):
             use_container_width=True
         )
     
+    # Out-of-fold diagnostics (stored per-station predictions, no retraining)
+    st.markdown("## 📈 Out-of-Fold Diagnostics")
+    
+    cv_strategy = 'stratified' if "Stratified" in cv_type else 'spatial'
+    oof_runs, oof_frames = oof_results(df_results)
+    
+    if oof_runs.empty:
+        st.info("No out-of-fold predictions stored for these runs yet. Cross-validate a model once "
+                "(or run `python -m seagrass.compare --record`) to enable curves and confusion matrices.")
+    else:
+        col1, col2 = st.columns(2)
+        fig_roc, fig_pr = go.Figure(), go.Figure()
+        for _, run in oof_runs.iterrows():
+            frame = oof_frames[oof_frames['run_id'] == run['Run']]
+            fpr, tpr, _ = oof.roc_curve(frame['y_true'], frame['score'])
+            precision, recall, _ = oof.pr_curve(frame['y_true'], frame['score'])
+            auc = oof.roc_auc(frame['y_true'], frame['score'])
+            ap = oof.average_precision(frame['y_true'], frame['score'])
+            fig_roc.add_trace(go.Scatter(x=fpr, y=tpr, mode='lines', name=f"{run['Model']} (AUC {auc:.3f})"))
+            fig_pr.add_trace(go.Scatter(x=recall, y=precision, mode='lines', name=f"{run['Model']} (AP {ap:.3f})"))
+        fig_roc.add_trace(go.Scatter(x=[0, 1], y=[0, 1], mode='lines', line=dict(dash='dash', color='#999'),
+                                     showlegend=False))
+        fig_roc.update_layout(title=f"ROC Curves - {cv_type}", xaxis_title="False Positive Rate",
+                              yaxis_title="True Positive Rate", height=450)
+        fig_pr.update_layout(title=f"Precision-Recall Curves - {cv_type}", xaxis_title="Recall",
+                             yaxis_title="Precision", height=450)
+        with col1:
+            st.plotly_chart(fig_roc, use_container_width=True)
+        with col2:
+            st.plotly_chart(fig_pr, use_container_width=True)
+        
+        # Decision threshold explorer: the curve is computed once per run, the slider only looks rows up
+        st.markdown("### 🎚️ Decision Threshold Explorer")
+        st.markdown("Trade recall for precision: every threshold is read from the stored out-of-fold scores.")
+        
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            cm_model = st.selectbox("Model:", oof_runs['Model'].tolist(), key="binary_cm_model")
+        with col2:
+            fn_cost = st.number_input("Cost of a missed presence (FN):", min_value=0.0, value=1.0, step=0.5,
+                                      key="binary_fn_cost")
+        with col3:
+            fp_cost = st.number_input("Cost of a false alarm (FP):", min_value=0.0, value=1.0, step=0.5,
+                                      key="binary_fp_cost")
+        
+        run_id = int(oof_runs.loc[oof_runs['Model'] == cm_model, 'Run'].iloc[0])
+        curve = load_threshold_curve(run_id)
+        score_kind = run_store().config(run_id).get('oof_score') or 'probability'
+        finite = curve['Threshold'].iloc[:-1]
+        if score_kind == 'probability':
+            low, high, step = 0.0, 1.0, 0.01
+        else:
+            low, high = float(np.floor(finite.min())), float(np.ceil(finite.max()))
+            step = max((high - low) / 200, 1e-3)
+        best, best_cost = oof.cost_optimum(curve, fn_cost, fp_cost)
+        best_threshold = float(np.clip(curve['Threshold'].iloc[best], low, high))
+        
+        threshold = st.slider("Decision threshold:", min_value=low, max_value=high,
+                              value=float(oof.DEFAULT_THRESHOLDS[score_kind]), step=step,
+                              key=f"binary_threshold_{run_id}")
+        row = curve.iloc[oof.curve_index(curve, threshold)]
+        
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("Precision", f"{row['Precision']:.3f}")
+        col2.metric("Recall", f"{row['Recall']:.3f}")
+        col3.metric("F1", f"{row['F1']:.3f}")
+        col4.metric("Accuracy", f"{row['Accuracy']:.3f}")
+        col5.metric("Cost", f"{fn_cost * row['FN'] + fp_cost * row['FP']:,.1f}",
+                    delta=f"{fn_cost * row['FN'] + fp_cost * row['FP'] - best_cost:+,.1f} vs optimum",
+                    delta_color="inverse")
+        st.caption(f"💡 Cost-weighted optimum: threshold {best_threshold:.3f} "
+                   f"(precision {curve['Precision'].iloc[best]:.3f}, recall {curve['Recall'].iloc[best]:.3f}, "
+                   f"cost {best_cost:,.1f})")
+        
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            shown = curve.iloc[:-1]
+            fig_threshold = go.Figure()
+            for metric, color in (('Precision', '#2E7D32'), ('Recall', '#1565C0'), ('F1', '#F57C00'),
+                                  ('Accuracy', '#6A1B9A')):
+                fig_threshold.add_trace(go.Scatter(x=shown['Threshold'], y=shown[metric], mode='lines',
+                                                   name=metric, line=dict(color=color)))
+            fig_threshold.add_vline(x=threshold, line_dash='dash', line_color='#333',
+                                    annotation_text="selected")
+            fig_threshold.add_vline(x=best_threshold, line_dash='dot', line_color='#C62828',
+                                    annotation_text="cost optimum", annotation_position="bottom right")
+            fig_threshold.update_layout(title=f"Metrics vs Threshold - {cm_model}", xaxis_title="Threshold",
+                                        yaxis_title="Score", xaxis_range=[low, high], height=400)
+            st.plotly_chart(fig_threshold, use_container_width=True)
+        with col2:
+            fig_cm = px.imshow(
+                [[int(row['TN']), int(row['FP'])], [int(row['FN']), int(row['TP'])]],
+                x=['Predicted Absence', 'Predicted Presence'],
+                y=['Absence', 'Presence'],
+                text_auto=True,
+                color_continuous_scale='Greens',
+                title=f"Confusion Matrix (threshold {threshold:g})"
+            )
+            fig_cm.update_layout(height=400)
+            st.plotly_chart(fig_cm, use_container_width=True)
+    
+    with st.expander("▶️ Compute out-of-fold predictions"):
+        render_oof_compute(df, 'binary', cv_strategy, df_results, key="binary")
+    
     # Stratified vs Spatial comparison
     st.markdown("## ⚖️ Cross-Validation Strategy Comparison")
     
@@ -167,7 +282,8 @@ def show(df):
     """, unsafe_allow_html=True)
     
     # Compare top 3 models
-    comparison_models = ['Random Forest', 'K Neighbors', 'Decision Tree']
+    comparison_models = [m for m in ['Random Forest', 'K Neighbors', 'Decision Tree']
+                         if m in df_strat['Model'].tolist() and m in df_spatial['Model'].tolist()]
     
     comparison_data = []
     for model in comparison_models:
@@ -184,7 +300,8 @@ def show(df):
                 'Difference %': ((strat_row[metric] - spatial_row[metric]) / strat_row[metric] * 100)
             })
     
-    comparison_df = pd.DataFrame(comparison_data)
+    comparison_df = pd.DataFrame(comparison_data, columns=['Model', 'Metric', 'Stratified CV', 'Spatial CV',
+                                                           'Difference', 'Difference %'])
     
     # Grouped bar chart
     fig_comparison = go.Figure()
@@ -211,6 +328,10 @@ def show(df):
     
     st.plotly_chart(fig_comparison, use_container_width=True)
     
+    # Per-zone breakdown from the stored out-of-fold predictions
+    st.markdown(f"### 🗺️ Performance by Geographic Zone ({cv_type})")
+    render_zone_breakdown(df, oof_runs, ['Accuracy', 'F1', 'ROC_AUC', 'Precision', 'Recall'], key="binary")
+    
     # Feature Importance
     st.markdown("## 🔑 Top Feature Importance")
     
@@ -262,6 +383,80 @@ def show(df):
         fig_cat.update_layout(height=500, title="Feature Distribution by Category")
         st.plotly_chart(fig_cat, use_container_width=True)
     
+    # Instance-level explanations
+    st.markdown("## 🔬 Instance-Level Explanations")
+    
+    st.markdown("""
+    Exact path-based contributions: each station's predicted presence probability is decomposed into 
+    the dataset baseline plus one contribution per predictor, summed here by variable family.
+    """)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        explain_model = st.selectbox(
+            "Select tree model:",
+            list(TREE_MODELS),
+            format_func=MODEL_NAMES.get,
+            key="explain_model"
+        )
+    
+    contrib_table, family_table = load_contribution_tables(df, explain_model)
+    
+    with col2:
+        station_id = st.selectbox(
+            "Select station (ID):",
+            contrib_table.index.tolist(),
+            key="explain_station"
+        )
+    
+    station = contrib_table.loc[station_id]
+    observed = df.loc[df['ID'] == station_id, 'BIO_FAMILY'].iloc[0]
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("P(presence)", f"{station['prediction']:.3f}")
+    col2.metric("Baseline", f"{station['bias']:.3f}")
+    col3.metric("Observed", observed)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        family_values = family_table.loc[station_id]
+        fig_waterfall = go.Figure(go.Waterfall(
+            orientation='v',
+            x=['Baseline'] + family_values.index.tolist() + ['Prediction'],
+            y=[station['bias']] + family_values.values.tolist() + [station['prediction']],
+            measure=['absolute'] + ['relative'] * len(family_values) + ['total'],
+            connector={'line': {'color': '#999'}},
+            increasing={'marker': {'color': '#2E8B57'}},
+            decreasing={'marker': {'color': '#e74c3c'}},
+            totals={'marker': {'color': '#2196F3'}}
+        ))
+        fig_waterfall.update_layout(
+            title=f"Contribution by Variable Family - Station {station_id}",
+            yaxis_title="P(presence)",
+            height=500,
+            xaxis_tickangle=-45
+        )
+        st.plotly_chart(fig_waterfall, use_container_width=True)
+    
+    with col2:
+        top_station = explain.top_contributions(contrib_table, station_id)
+        fig_station = px.bar(
+            top_station,
+            x='Contribution',
+            y='Feature',
+            color='Category',
+            orientation='h',
+            title=f"Top 10 Feature Contributions - Station {station_id}"
+        )
+        fig_station.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
+        st.plotly_chart(fig_station, use_container_width=True)
+    
+    with st.expander("📋 Mean absolute contribution by variable family (all stations)"):
+        family_summary = family_table.abs().mean().rename('Mean |Contribution|').to_frame()
+        st.dataframe(family_summary.style.format('{:.4f}'), use_container_width=True)
+    
     # Key insights
     st.markdown("## 💡 Key Insights")
     
@@ -11,6 +11,10 @@ from plotly.subplots import make_subplots
 import base64
 from pathlib import Path
 
+from page_modules import (interval_trace, load_run_results, oof_results, render_ci_selector, render_oof_compute,
+                          render_run_history, render_zone_breakdown, with_interval_text)
+from seagrass import oof
+
 def show(df):
     """Display multi-class classification analysis page"""
     
@@ -88,34 +92,11 @@ def show(df):
         </div>
         """, unsafe_allow_html=True)
     
-    # Model comparison results (from EDA) - 7 models tested
-    # Note: Multiclass uses Macro F1 as primary metric due to class imbalance
-    # Updated with corrected CV strategy results
-    multiclass_stratified = {
-        'Model': ['K Neighbors', 'SVM-Linear', 'Random Forest', 'Logistic Regression', 
-                  'Ridge Classifier', 'Decision Tree', 'LDA'],
-        'Accuracy': [0.8164, 0.7199, 0.8606, 0.8084, 0.8186, 0.8594, 0.8277],
-        'Precision': [0.7921, 0.6893, 0.8470, 0.7760, 0.7952, 0.8419, 0.8099],
-        'Recall': [0.8164, 0.7199, 0.8606, 0.8084, 0.8186, 0.8594, 0.8277],
-        'Macro_F1': [0.7659, 0.6572, 0.8222, 0.7454, 0.7590, 0.8169, 0.7781]
-    }
-    
-    multiclass_spatial = {
-        'Model': ['K Neighbors', 'SVM-Linear', 'Random Forest', 'Logistic Regression', 
-                  'Ridge Classifier', 'Decision Tree', 'LDA'],
-        'Accuracy': [0.6809, 0.6413, 0.6303, 0.5580, 0.5453, 0.5088, 0.3629],
-        'Precision': [0.6396, 0.6083, 0.5951, 0.5196, 0.5064, 0.4696, 0.3168],
-        'Recall': [0.6809, 0.6413, 0.6303, 0.5580, 0.5453, 0.5088, 0.3629],
-        'Macro_F1': [0.6209, 0.5844, 0.5758, 0.4955, 0.4821, 0.4390, 0.2788]
-    }
-    
-    df_mc_strat = pd.DataFrame(multiclass_stratified)
-    df_mc_spatial = pd.DataFrame(multiclass_spatial)
-    
     # Model selection and comparison
+    # Note: Multiclass uses Macro F1 as primary metric due to class imbalance
     st.markdown("## ⚙️ Interactive Model Comparison")
     
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         cv_type = st.selectbox(
@@ -133,9 +114,24 @@ def show(df):
             key="mc_metric"
         )
     
-    # Select appropriate dataframe
+    with col3:
+        run_selection = st.radio(
+            "Runs to show:",
+            ["Latest runs", "Pinned runs"],
+            horizontal=True,
+            help="Latest run per model from the run store, or its pinned run where one is pinned",
+            key="mc_runs"
+        )
+    
+    # Model results from the run store (latest or pinned run per model)
+    pinned = run_selection == "Pinned runs"
+    ci_method = render_ci_selector("mc", spatial="Spatial" in cv_type)
+    df_mc_strat = load_run_results('family', 'stratified', pinned, intervals=ci_method)
+    df_mc_spatial = load_run_results('family', 'spatial', pinned, intervals=ci_method)
     df_mc_results = df_mc_strat if "Stratified" in cv_type else df_mc_spatial
     
+    render_run_history('family', key="mc")
+    
     # Performance comparison
     st.markdown(f"### 📊 Model Performance Comparison - {metric}")
     
@@ -154,6 +150,9 @@ def show(df):
         textposition='outside',
         hovertemplate='<b>%{x}</b><br>' + metric + ': %{y:.2f}<extra></extra>'
     ))
+    intervals = interval_trace(df_mc_results, metric)
+    if intervals is not None:
+        fig_mc_compare.add_trace(intervals)
     
     fig_mc_compare.update_layout(
         title=f"{metric} Comparison - {cv_type}",
@@ -165,6 +164,8 @@ def show(df):
     )
     
     st.plotly_chart(fig_mc_compare, use_container_width=True)
+    st.caption("Bars: mean over CV folds. Diamonds: the metric on the pooled out-of-fold predictions, with "
+               "its 95% bootstrap interval (runs without stored predictions have none).")
     
     # Detailed comparison
     st.markdown("### 🔍 Detailed Multi-Metric Comparison")
@@ -172,7 +173,7 @@ def show(df):
     selected_mc_models = st.multiselect(
         "Select models to compare:",
         options=df_mc_results['Model'].tolist(),
-        default=['K Neighbors', 'SVM-Linear', 'Random Forest'],
+        default=[m for m in ['K Neighbors', 'SVM - Linear', 'Random Forest'] if m in df_mc_results['Model'].tolist()],
         key="mc_models"
     )
     
@@ -210,7 +211,8 @@ def show(df):
         
         # Detailed table
         st.markdown("#### 📋 Detailed Metrics Table")
-        filtered_mc = df_mc_results[df_mc_results['Model'].isin(selected_mc_models)].copy()
+        filtered_mc = with_interval_text(df_mc_results[df_mc_results['Model'].isin(selected_mc_models)],
+                                         metrics_list)
         
         # Apply styling
         styled_mc = filtered_mc.style.format(
@@ -225,6 +227,42 @@ def show(df):
         
         st.dataframe(styled_mc, use_container_width=True)
     
+    # Out-of-fold diagnostics (stored per-station predictions, no retraining)
+    st.markdown("## 📈 Out-of-Fold Diagnostics")
+    
+    cv_strategy = 'stratified' if "Stratified" in cv_type else 'spatial'
+    oof_runs, oof_frames = oof_results(df_mc_results)
+    
+    if oof_runs.empty:
+        st.info("No out-of-fold predictions stored for these runs yet. Cross-validate a model once "
+                "(or run `python -m seagrass.compare --task family --record`) to enable confusion matrices.")
+    else:
+        cm_model = st.selectbox("Confusion matrix for:", oof_runs['Model'].tolist(), key="mc_cm_model")
+        frame = oof_frames[oof_frames['run_id'] == oof_runs.loc[oof_runs['Model'] == cm_model, 'Run'].iloc[0]]
+        frame = frame.dropna(axis=1, how='all')  # class columns of other runs' models
+        confusion = oof.multiclass_confusion(frame)
+        summary = oof.multiclass_metrics(frame)
+        
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            fig_cm = px.imshow(
+                confusion.values,
+                x=[f"Predicted {label}" for label in confusion.columns],
+                y=confusion.index.tolist(),
+                text_auto=True,
+                color_continuous_scale='Greens',
+                title=f"Out-of-Fold Confusion Matrix - {cm_model}"
+            )
+            fig_cm.update_layout(height=450)
+            st.plotly_chart(fig_cm, use_container_width=True)
+        with col2:
+            st.metric("Accuracy", f"{summary['Accuracy']:.3f}")
+            st.metric("Macro F1", f"{summary['Macro_F1']:.3f}")
+            st.metric("Weighted F1", f"{summary['Weighted_F1']:.3f}")
+    
+    with st.expander("▶️ Compute out-of-fold predictions"):
+        render_oof_compute(df, 'family', cv_strategy, df_mc_results, key="mc")
+    
     # CV Strategy comparison
     st.markdown("## ⚖️ Cross-Validation Impact Analysis")
     
@@ -244,7 +282,7 @@ def show(df):
     
     # Side-by-side comparison
     comparison_mc = []
-    for model in df_mc_strat['Model']:
+    for model in df_mc_strat['Model'][df_mc_strat['Model'].isin(df_mc_spatial['Model'])]:
         strat_row = df_mc_strat[df_mc_strat['Model'] == model].iloc[0]
         spatial_row = df_mc_spatial[df_mc_spatial['Model'] == model].iloc[0]
         
@@ -258,7 +296,8 @@ def show(df):
             'F1 Drop': strat_row['Macro_F1'] - spatial_row['Macro_F1']
         })
     
-    comparison_mc_df = pd.DataFrame(comparison_mc)
+    comparison_mc_df = pd.DataFrame(comparison_mc, columns=['Model', 'Stratified Accuracy', 'Spatial Accuracy', 'Acc. Drop',
+                                                           'Stratified Macro F1', 'Spatial Macro F1', 'F1 Drop'])
     
     # Visualize comparison table
     st.markdown("#### 📊 Stratified vs Spatial CV - Detailed Comparison")
@@ -380,6 +419,10 @@ def show(df):
     </div>
     """, unsafe_allow_html=True)
     
+    # Per-zone breakdown from the stored out-of-fold predictions
+    st.markdown(f"### 🗺️ Performance by Geographic Zone ({cv_type})")
+    render_zone_breakdown(df, oof_runs, ['Macro_F1', 'Accuracy', 'ROC_AUC'], key="mc")
+    
     # Feature importance for family classification
     st.markdown("## 🔑 Top Features for Family Classification")
     
@@ -8,6 +8,8 @@ from pathlib import Path
 import base64
 import plotly.graph_objects as go
 
+from seagrass.dataset import dataset_summary
+
 def show(df):
     """Display the presentation/introduction page"""
     
@@ -58,22 +60,22 @@ def show(df):
     # Executive Summary
     st.markdown("## 📋 Executive Summary")
     
+    summary = dataset_summary(df)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Observations", f"{len(df)}")
+        st.metric("Total Observations", f"{summary['observations']}")
     with col2:
-        st.metric("Environmental Predictors", "217")
+        st.metric("Environmental Predictors", f"{summary['predictors']}")
     with col3:
-        presence_count = df['Presence'].sum()
-        st.metric("Seagrass Present", f"{presence_count}")
+        st.metric("Seagrass Present", f"{summary['presences']}")
     with col4:
-        st.metric("Geographic Zones", "8")
+        st.metric("Geographic Zones", f"{summary['zones']}")
     
     # Study Case Summary
     st.markdown("## 📖 Study Case Summary")
     
-    st.markdown("""
+    st.markdown(f"""
     <div class="info-box" style="background-color: #f0f8ff; border-left: 4px solid #2E8B57; padding: 1.5rem; margin: 1rem 0;">
         <p style="margin: 0 0 1rem 0;">
             This study addresses the critical need for accurate seagrass distribution mapping in the Mediterranean Sea, 
@@ -83,17 +85,17 @@ def show(df):
         </p>
         <p style="margin: 0 0 1rem 0;">
             <strong>Study Area:</strong> Mediterranean-wide coverage spanning diverse coastal environments, from shallow 
-            coastal lagoons to deeper offshore meadows across 8 distinct geographic zones.
+            coastal lagoons to deeper offshore meadows across {summary['zones']} distinct geographic zones.
         </p>
         <p style="margin: 0 0 1rem 0;">
-            <strong>Data Source:</strong> The dataset combines seagrass occurrence data with 217 environmental variables 
+            <strong>Data Source:</strong> The dataset combines seagrass occurrence data with {summary['predictors']} environmental variables 
             derived from the Copernicus Marine Environment Monitoring Service (CMEMS), including oceanographic parameters 
             (temperature, salinity, chlorophyll-α, nutrients), physical characteristics (bathymetry, wave height), and 
             anthropogenic factors (distance to coastal infrastructure).
         </p>
         <p style="margin: 0 0 1rem 0;">
-            <strong>Dataset Composition:</strong> The dataset includes 3055 observations combining <strong>1771 real seagrass 
-            presence records</strong> with <strong>1284 artificial absence points</strong>. Since no publicly available absence 
+            <strong>Dataset Composition:</strong> The dataset includes {summary['observations']} observations combining <strong>{summary['presences']} real seagrass 
+            presence records</strong> with <strong>{summary['absences']} artificial absence points</strong>. Since no publicly available absence 
             dataset exists, artificial absence records were generated using a rule-based methodology: for each presence 
             point, the nearest CMEMS grid cell not already marked as absent was selected, with the assumption that adjacent 
             areas were examined during field surveys and would have been recorded if seagrass were present. Additional 
@@ -228,12 +230,12 @@ def show(df):
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div class="metric-card">
             <h3 style="margin-top: 0; color: #2E8B57;">Spatial Coverage</h3>
             <ul>
                 <li><strong>Geographic Scope:</strong> Mediterranean-wide distribution</li>
-                <li><strong>Regions:</strong> 8 distinct geographic zones</li>
+                <li><strong>Regions:</strong> {summary['zones']} distinct geographic zones</li>
                 <li><strong>Clustering Method:</strong> K-Means spatial clustering</li>
                 <li><strong>Purpose:</strong> Mitigate spatial autocorrelation</li>
             </ul>
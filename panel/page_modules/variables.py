@@ -12,6 +12,11 @@ import base64
 from pathlib import Path
 import plotly.figure_factory as ff
 
+from page_modules import load_summary_state
+from seagrass.dataset import environmental_columns
+from seagrass.spatial import stations_near
+from seagrass.summaries import overall
+
 def show(df):
     """Display variables and statistics page"""
     
@@ -21,8 +26,8 @@ def show(df):
     # Variable categories description
     st.markdown("## 📝 Variable Categories & Data Sources")
     
-    st.markdown("""
-    The dataset contains **217 environmental predictors** organized into the following categories:
+    st.markdown(f"""
+    The dataset contains **{len(environmental_columns(df))} environmental predictors** organized into the following categories:
     """)
     
     # Variable categories
@@ -109,8 +114,10 @@ def show(df):
         </div>
         """, unsafe_allow_html=True)
     
-    # Descriptive Statistics
+    # Descriptive Statistics (merged from per-partition summary states)
     st.markdown("## 📈 Descriptive Statistics")
+    state = load_summary_state(df)
+    summary = overall(state)
     
     # Select variable type for statistics
     var_type = st.radio(
@@ -144,7 +151,7 @@ def show(df):
     
     # Display statistics
     if selected_cols:
-        stats_df = df[selected_cols].describe().T
+        stats_df = summary.describe().loc[selected_cols]
         stats_df['range'] = stats_df['max'] - stats_df['min']
         stats_df['cv'] = (stats_df['std'] / stats_df['mean']) * 100  # Coefficient of variation
         
@@ -175,8 +182,17 @@ def show(df):
     
     # Prepare correlation data
     correlation_vars = static_cols + temporal_cols
+    corr_method = st.radio(
+        "Correlation method:",
+        ["Spearman", "Pearson"],
+        horizontal=True,
+        help="Spearman ranks are recomputed from every row; Pearson comes from the merged co-moment matrices"
+    )
     if correlation_vars:
-        corr_df = df[correlation_vars].corr(method='spearman')
+        if corr_method == "Spearman":
+            corr_df = df[correlation_vars].corr(method='spearman')
+        else:
+            corr_df = summary.correlation(correlation_vars)
         
         # Correlation heatmap
         fig_corr = go.Figure(data=go.Heatmap(
@@ -194,7 +210,7 @@ def show(df):
         ))
         
         fig_corr.update_layout(
-            title="Spearman Correlation Matrix<br><sub>Annual Average & Static Variables</sub>",
+            title=f"{corr_method} Correlation Matrix<br><sub>Annual Average & Static Variables</sub>",
             height=800,
             xaxis=dict(tickangle=-45),
             yaxis=dict(autorange='reversed')
@@ -230,14 +246,14 @@ def show(df):
     # Geographic Distribution
     st.markdown("## 🗺️ Geographic Distribution")
     
-    st.markdown("""
-    The dataset covers the Mediterranean Sea with observations clustered into **8 geographic zones** 
+    # Zone distribution
+    zone_counts = summary.counts['GEOGRAPHIC_ZONE'].sort_index()
+    
+    st.markdown(f"""
+    The dataset covers the Mediterranean Sea with observations clustered into **{len(zone_counts)} geographic zones** 
     to address spatial autocorrelation in modeling.
     """)
     
-    # Zone distribution
-    zone_counts = df['GEOGRAPHIC_ZONE'].value_counts().sort_index()
-    
     col1, col2 = st.columns([1, 1])
     
     with col1:
@@ -271,7 +287,7 @@ def show(df):
         zone_stats = pd.DataFrame({
             'Zone': [f"Zone {i}" for i in zone_counts.index],
             'Count': zone_counts.values,
-            'Percentage': (zone_counts.values / len(df) * 100).round(2)
+            'Percentage': (zone_counts.values / zone_counts.sum() * 100).round(2)
         })
         
         st.markdown("### Zone Distribution Table")
@@ -342,7 +358,45 @@ def show(df):
         )
     )
     
-    st.plotly_chart(fig_map, use_container_width=True)
+    map_event = st.plotly_chart(fig_map, use_container_width=True, on_select="rerun",
+                                selection_mode="points", key="station_map")
+    
+    # Stations near a clicked point
+    st.markdown("### 📍 Stations Near a Point")
+    st.caption("Click a station on the map (or enter coordinates) to list its nearest neighbours.")
+    
+    st.session_state.setdefault('near_lon', float(df['LONGITUDE'].median()))
+    st.session_state.setdefault('near_lat', float(df['LATITUDE'].median()))
+    selected_points = map_event.selection.points if map_event and map_event.selection else []
+    if selected_points:
+        clicked = (float(selected_points[0]['lon']), float(selected_points[0]['lat']))
+        # Only a new click moves the query point, so manual edits are kept on rerun
+        if st.session_state.get('near_clicked') != clicked:
+            st.session_state['near_clicked'] = clicked
+            st.session_state['near_lon'], st.session_state['near_lat'] = clicked
+    
+    col_near1, col_near2, col_near3, col_near4 = st.columns(4)
+    with col_near1:
+        near_lon = st.number_input("Longitude", format="%.4f", key='near_lon')
+    with col_near2:
+        near_lat = st.number_input("Latitude", format="%.4f", key='near_lat')
+    with col_near3:
+        near_mode = st.radio("Query:", ["Nearest k", "Within radius"], horizontal=True, key='near_mode')
+    with col_near4:
+        if near_mode == "Nearest k":
+            near_k = st.slider("Stations (k)", 1, 50, 10, key='near_k')
+            near_radius = None
+        else:
+            near_radius = st.slider("Radius (km)", 1, 100, 10, key='near_radius')
+            near_k = None
+    
+    df_near = stations_near(
+        df, near_lon, near_lat, k=near_k, radius_km=near_radius,
+        columns=['ID', 'BIO_CLASS', 'BIO_FAMILY', 'Presence', 'LONGITUDE', 'LATITUDE',
+                 'GEOGRAPHIC_ZONE', 'Med_bathym']
+    )
+    st.markdown(f"**{len(df_near)} stations** near ({near_lon:.4f}, {near_lat:.4f})")
+    st.dataframe(df_near.round({'Distance (km)': 2}), use_container_width=True, hide_index=True)
     
     # Distribution Analysis
     st.markdown("## 📊 Variable Distributions")
@@ -552,8 +606,10 @@ def show(df):
             
             # Statistics by presence
             st.markdown(f"### Statistics for {viz_var}")
-            presence_stats = df.groupby('Presence')[viz_var].describe().T
-            presence_stats.columns = ['Absence', 'Presence']
+            presence_stats = pd.DataFrame({
+                'Absence': state[False].describe().loc[viz_var],
+                'Presence': state[True].describe().loc[viz_var]
+            })
             st.dataframe(
                 presence_stats.style.format("{:.2f}").background_gradient(cmap='RdYlGn', axis=1),
                 use_container_width=True
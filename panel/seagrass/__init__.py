@@ -0,0 +1 @@
+# Analysis and modelling modules for the Streamlit app
@@ -0,0 +1,198 @@
+"""
+Model Artifacts - Mediterranean Seagrass Intelligence Panel
+
+A model artifact is a directory:
+
+    binary_rf.model/
+    ├─ meta.json          format version, feature schema, data hash, array manifest
+    ├─ feature.npy        packed tree arrays (see seagrass.compiled), one file each
+    ├─ threshold.npy
+    └─ ...
+
+Tree models are stored as compiled arrays, so loading is a handful of
+``np.load(mmap_mode='r')`` calls: nothing is deserialized, pages are read
+lazily and every process mapping the same files shares them through the
+OS page cache. Other estimators fall back to a joblib pickle (``model.joblib``)
+whose NumPy buffers are memory-mapped the same way.
+
+Usage (from the panel folder):
+    python -m seagrass.artifacts
+"""
+
+import json
+import pickle
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .compiled import ARRAY_FIELDS, CompiledForest, compile_model
+
+FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+PICKLE_FILE = 'model.joblib'
+
+
+# ==================== SAVE ====================
+def save_artifact(model, path, data_hash=None, extra=None):
+    """Write a fitted model as a memory-mappable artifact directory"""
+    import sklearn
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    feature_names = [str(f) for f in getattr(model, 'feature_names_in_', range(model.n_features_in_))]
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'estimator': type(model).__name__,
+        'classes': [c.item() if hasattr(c, 'item') else c for c in model.classes_],
+        'feature_schema': [{'name': name, 'dtype': 'float32'} for name in feature_names],
+        'data_hash': data_hash,
+        'sklearn_version': sklearn.__version__,
+        'numpy_version': np.__version__,
+        'extra': extra or {}
+    }
+
+    if isinstance(model, CompiledForest) or hasattr(model, 'estimators_') or hasattr(model, 'tree_'):
+        compiled = model if isinstance(model, CompiledForest) else compile_model(model)
+        meta['kind'] = 'compiled'
+        meta['compiled'] = {k: v for k, v in compiled.meta.items() if k not in ('classes', 'feature_names')}
+        meta['arrays'] = {}
+        for name in ARRAY_FIELDS:
+            array = np.ascontiguousarray(compiled.arrays[name])
+            np.save(path / f'{name}.npy', array, allow_pickle=False)
+            meta['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape)}
+    else:
+        import joblib
+
+        meta['kind'] = 'joblib'
+        joblib.dump(model, path / PICKLE_FILE)
+
+    (path / META_FILE).write_text(json.dumps(meta, indent=2))
+    return path
+
+
+# ==================== LOAD ====================
+def read_metadata(path):
+    """Artifact metadata without touching any array data"""
+    meta_path = Path(path) / META_FILE
+    if not meta_path.exists():
+        raise FileNotFoundError(f"No model artifact at {path} ({META_FILE} missing)")
+    meta = json.loads(meta_path.read_text())
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version {meta.get('format_version')}")
+    return meta
+
+
+def load_artifact(path, mmap=True, expected_hash=None):
+    """Load an artifact; arrays are memory-mapped unless mmap=False"""
+    path = Path(path)
+    meta = read_metadata(path)
+    if expected_hash is not None and meta['data_hash'] != expected_hash:
+        raise ValueError(f"Artifact {path.name} was trained on data {meta['data_hash']}, "
+                         f"expected {expected_hash}")
+    mmap_mode = 'r' if mmap else None
+
+    if meta['kind'] == 'joblib':
+        import joblib
+
+        return joblib.load(path / PICKLE_FILE, mmap_mode=mmap_mode)
+
+    arrays = {}
+    for name, spec in meta['arrays'].items():
+        array = np.load(path / f'{name}.npy', mmap_mode=mmap_mode, allow_pickle=False)
+        if array.dtype.str != spec['dtype'] or list(array.shape) != spec['shape']:
+            raise ValueError(f"Array '{name}' in {path.name} does not match its manifest")
+        arrays[name] = array
+
+    compiled_meta = dict(meta['compiled'])
+    compiled_meta['classes'] = meta['classes']
+    compiled_meta['feature_names'] = [field['name'] for field in meta['feature_schema']]
+    return CompiledForest(arrays, compiled_meta)
+
+
+def load_model(path, mmap=True):
+    """Load either an artifact directory or a plain joblib/pickle file"""
+    path = Path(path)
+    if path.is_dir():
+        return load_artifact(path, mmap=mmap)
+    import joblib
+
+    return joblib.load(path)
+
+
+# ==================== BENCHMARK ====================
+def _cold_start(load, sample, repeats=5):
+    """Median seconds to load a model and score one row"""
+    load_times, first_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model = load()
+        loaded = time.perf_counter()
+        model.predict_proba(sample)
+        load_times.append(loaded - start)
+        first_times.append(time.perf_counter() - start)
+    return np.median(load_times), np.median(first_times)
+
+
+def benchmark_load(model, workdir, sample, repeats=5):
+    """Load and load+first-prediction times for pickle, joblib and the mmap artifact"""
+    import joblib
+
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    pickle_path = workdir / 'model.pkl'
+    joblib_path = workdir / 'model.joblib'
+    artifact_path = workdir / 'model.artifact'
+
+    with open(pickle_path, 'wb') as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    joblib.dump(model, joblib_path)
+    save_artifact(model, artifact_path)
+
+    def load_pickle():
+        with open(pickle_path, 'rb') as f:
+            return pickle.load(f)
+
+    candidates = {
+        'pickle': (load_pickle, pickle_path.stat().st_size),
+        'joblib': (lambda: joblib.load(joblib_path), joblib_path.stat().st_size),
+        'joblib (mmap)': (lambda: joblib.load(joblib_path, mmap_mode='r'), joblib_path.stat().st_size),
+        'artifact (mmap)': (lambda: load_artifact(artifact_path),
+                            sum(f.stat().st_size for f in artifact_path.iterdir()))
+    }
+
+    rows = []
+    for name, (load, size) in candidates.items():
+        load_s, first_s = _cold_start(load, sample, repeats)
+        rows.append({
+            'Format': name,
+            'Size (MB)': size / 1024 ** 2,
+            'Load (ms)': load_s * 1000,
+            'Load + first prediction (ms)': first_s * 1000
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    """Fit the binary Random Forest and compare artifact load times with pickle/joblib"""
+    import tempfile
+
+    from .dataset import data_hash, load_dataset
+    from .models import fit_model, task_data
+
+    df = load_dataset()
+    _, X, _ = task_data(df, 'binary')
+    model = fit_model(df, 'rf', 'binary', n_jobs=1)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        save_artifact(model, Path(workdir) / 'binary_rf.model', data_hash=data_hash(df))
+        print(f"📦 Artifact metadata: data hash {read_metadata(Path(workdir) / 'binary_rf.model')['data_hash']}")
+        print(benchmark_load(model, workdir, X.iloc[:1]).round(2).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""
+Histogram Gradient Boosting - Mediterranean Seagrass Intelligence Panel
+
+Gradient boosting on histogram-binned features, with the bins computed
+once per dataset version (``dataset.data_hash``) and reused by every CV
+fold and tuning trial:
+
+- numeric predictors get at most 255 bins from quantile thresholds
+  (midpoints between distinct values when there are fewer), as in
+  HistGradientBoostingClassifier. Missing values and leaked NetCDF fill
+  values (|x| > 1e30) go to the missing bin;
+- ``Substrate`` is one native categorical feature (category codes)
+  instead of the ten ``Substrate_*`` dummy columns.
+
+The codes are stored as uint8 in ``data/bins/<version>.npz`` and kept in
+memory per process. A model fitted on them only finds the codes' own
+integer values when it re-bins, so per-fit binning is trivial, and folds
+and trials share the same bin boundaries.
+
+Usage (from the panel folder):
+    python -m seagrass.boosting                      # benchmark vs Random Forest (spatial CV)
+    python -m seagrass.boosting --cv stratified --task family
+    python -m seagrass.boosting --record             # record the boosting runs in the run store
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from .dataset import DATA_DIR, predictor_columns
+from .temporal import FILL_VALUE_LIMIT
+
+BINS_DIR = 'bins'
+MAX_BINS = 255
+MISSING_CODE = 255  # uint8 code of the missing bin
+CATEGORICAL_COLS = ('Substrate',)
+BOOSTING_PARAMS = {'learning_rate': 0.1, 'max_iter': 200, 'max_leaf_nodes': 31, 'l2_regularization': 0.0}
+_BIN_CACHE = {}
+
+
+# ==================== BINNING ====================
+class BinnedDataset:
+    """uint8 bin codes of a dataset's predictors with the thresholds / categories that produced them"""
+
+    def __init__(self, codes, columns, thresholds, categories, version=None):
+        self.codes = codes
+        self.columns = list(columns)
+        self.thresholds = thresholds  # {numeric column: thresholds}
+        self.categories = categories  # {categorical column: categories}
+        self.version = version
+        self._features = None
+
+    @property
+    def categorical(self):
+        """Boolean mask of the native categorical columns"""
+        return np.array([col in self.categories for col in self.columns])
+
+    def features(self, rows=None):
+        """float32 code matrix for the model, NaN in the missing bin (computed once)"""
+        if self._features is None:
+            features = self.codes.astype(np.float32)
+            features[self.codes == MISSING_CODE] = np.nan
+            self._features = pd.DataFrame(features, columns=self.columns)
+        return self._features if rows is None else self._features.iloc[rows]
+
+    def encode(self, rows):
+        """uint8 bin codes of new rows with this dataset's thresholds and categories"""
+        codes = np.empty((len(rows), len(self.columns)), dtype=np.uint8)
+        for j, col in enumerate(self.columns):
+            if col in self.categories:
+                codes[:, j] = category_codes(rows[col], self.categories[col])
+            else:
+                codes[:, j] = numeric_codes(rows[col].to_numpy(np.float64), self.thresholds[col])
+        return codes
+
+    def transform(self, rows):
+        """Bin new rows (e.g. a prediction grid) with this dataset's thresholds and categories"""
+        return BinnedDataset(self.encode(rows), self.columns, self.thresholds, self.categories).features()
+
+    def save(self, path):
+        numeric = [col for col in self.columns if col not in self.categories]
+        sizes = [len(self.thresholds[col]) for col in numeric]
+        np.savez(path, codes=self.codes, columns=np.array(self.columns, dtype=str),
+                 numeric=np.array(numeric, dtype=str), sizes=np.array(sizes),
+                 thresholds=np.concatenate([self.thresholds[col] for col in numeric]),
+                 categorical=np.array(list(self.categories), dtype=str),
+                 categories=np.array([json.dumps(self.categories[col]) for col in self.categories], dtype=str),
+                 version=np.array(self.version or ''))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        splits = np.split(data['thresholds'], np.cumsum(data['sizes'])[:-1])
+        thresholds = dict(zip(data['numeric'].tolist(), splits))
+        categories = {col: json.loads(str(values))
+                      for col, values in zip(data['categorical'].tolist(), data['categories'])}
+        return cls(data['codes'], data['columns'].tolist(), thresholds, categories, str(data['version']) or None)
+
+
+def bin_thresholds(values, max_bins=MAX_BINS):
+    """Bin thresholds of one numeric column (NaN already removed), HistGradientBoosting-style"""
+    distinct = np.unique(values)
+    if len(distinct) <= max_bins:
+        return (distinct[:-1] + distinct[1:]) / 2
+    percentiles = np.linspace(0, 100, max_bins + 1)[1:-1]
+    return np.unique(np.percentile(values, percentiles, method='midpoint'))
+
+
+def numeric_codes(values, thresholds):
+    """Bin codes of numeric values; NaN and fill values go to the missing bin"""
+    missing = ~(np.abs(values) < FILL_VALUE_LIMIT)
+    codes = np.searchsorted(thresholds, np.where(missing, 0.0, values), side='left').astype(np.uint8)
+    codes[missing] = MISSING_CODE
+    return codes
+
+
+def category_codes(values, categories):
+    """Codes of categorical values; unseen or missing categories go to the missing bin"""
+    lookup = {category: i for i, category in enumerate(categories)}
+    return values.astype(str).map(lookup).fillna(MISSING_CODE).to_numpy(np.uint8)
+
+
+def boosting_columns(df):
+    """Predictors for boosting: numeric columns plus native categoricals instead of their dummies"""
+    columns = [col for col in predictor_columns(df)
+               if not any(col.startswith(f'{cat}_') for cat in CATEGORICAL_COLS)]
+    return columns + [col for col in CATEGORICAL_COLS if col in df.columns]
+
+
+def bin_dataset(df, max_bins=MAX_BINS, version=None):
+    """BinnedDataset of every boosting predictor of df"""
+    if max_bins >= MISSING_CODE + 1:
+        raise ValueError(f"max_bins must be at most {MISSING_CODE} (one code is the missing bin)")
+    columns = boosting_columns(df)
+    codes = np.empty((len(df), len(columns)), dtype=np.uint8)
+    thresholds, categories = {}, {}
+    for j, col in enumerate(columns):
+        if col in CATEGORICAL_COLS:
+            categories[col] = sorted(df[col].dropna().astype(str).unique())
+            codes[:, j] = category_codes(df[col], categories[col])
+        else:
+            values = df[col].to_numpy(np.float64)
+            thresholds[col] = bin_thresholds(values[np.abs(values) < FILL_VALUE_LIMIT], max_bins)
+            codes[:, j] = numeric_codes(values, thresholds[col])
+    return BinnedDataset(codes, columns, thresholds, categories, version)
+
+
+def load_binned(df, cache_dir=None, max_bins=MAX_BINS):
+    """Binned dataset for df: from memory, then data/bins/<version>.npz, else computed and saved"""
+    from pathlib import Path
+
+    from .dataset import data_hash
+
+    version = f'{data_hash(df)}-{max_bins}'
+    if version not in _BIN_CACHE:
+        path = Path(cache_dir) if cache_dir is not None else DATA_DIR / BINS_DIR
+        path = path / f'{version}.npz'
+        if path.exists():
+            binned = BinnedDataset.load(path)
+        else:
+            binned = bin_dataset(df, max_bins, version)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            binned.save(path)
+        _BIN_CACHE.clear()  # one dataset is loaded at a time; drop stale bins
+        _BIN_CACHE[version] = binned
+    return _BIN_CACHE[version]
+
+
+# ==================== MODEL & CV ====================
+def make_boosting(categorical, random_state=42, **params):
+    """HistGradientBoostingClassifier for binned codes, with native categorical columns"""
+    from sklearn.ensemble import HistGradientBoostingClassifier
+
+    return HistGradientBoostingClassifier(categorical_features=categorical, random_state=random_state,
+                                          **{**BOOSTING_PARAMS, **params})
+
+
+def boosting_task_data(df, binned, task='binary'):
+    """Rows, binned feature matrix and target of a modelling task"""
+    from .models import task_data
+
+    rows, _, y = task_data(df, task)
+    return rows, binned.features(df.index.get_indexer(rows.index)), y
+
+
+def cross_validate_boosting(df, task='binary', cv_strategy='spatial', binned=None, return_predictions=False,
+                            random_state=42, **params):
+    """sklearn cross_validate of the boosting model on the cached binned features"""
+    from sklearn.model_selection import cross_validate
+
+    from .cv import make_cv
+    from .runs import SCORING
+
+    binned = binned if binned is not None else load_binned(df)
+    rows, X, y = boosting_task_data(df, binned, task)
+    cv, groups = make_cv(rows, cv_strategy, random_state=random_state)
+    model = make_boosting(binned.categorical, random_state, **params)
+    scores = cross_validate(model, X, y, groups=groups, cv=cv, scoring=list(SCORING[task]), n_jobs=1,
+                            return_estimator=return_predictions, return_indices=return_predictions)
+    return rows, X, y, scores
+
+
+def tune(df, task='binary', cv_strategy='spatial', grid=None):
+    """Small grid search reusing one binned dataset for every trial and fold"""
+    from itertools import product
+
+    from .runs import SCORING
+
+    grid = grid or {'learning_rate': [0.05, 0.1], 'max_leaf_nodes': [15, 31]}
+    binned = load_binned(df)
+    primary = list(SCORING[task])[-1] if task == 'binary' else 'f1_macro'
+    results = []
+    for values in product(*grid.values()):
+        params = dict(zip(grid, values))
+        start = time.perf_counter()
+        scores = cross_validate_boosting(df, task, cv_strategy, binned, **params)[3]
+        results.append({**params, primary: scores[f'test_{primary}'].mean(),
+                        'accuracy': scores['test_accuracy'].mean(), 'seconds': time.perf_counter() - start})
+    return pd.DataFrame(results).sort_values(primary, ascending=False).reset_index(drop=True)
+
+
+def record_boosting(df, task='binary', cv_strategy='spatial', store=None, **params):
+    """Cross-validate the boosting model and record it (folds, OOF predictions, intervals) as model 'hgb'"""
+    from .bootstrap import record_intervals
+    from .dataset import data_hash
+    from .oof import oof_frame, prediction_scores, save_oof
+    from .runs import SCORING, TIMING_METRICS, get_run_store
+
+    store = store if store is not None else get_run_store()
+    binned = load_binned(df)
+    start = time.perf_counter()
+    rows, X, y, scores = cross_validate_boosting(df, task, cv_strategy, binned, return_predictions=True,
+                                                 **params)
+    total_seconds = time.perf_counter() - start
+
+    fold_predictions, kind, classes = [], None, np.unique(y)
+    for fold, (estimator, test) in enumerate(zip(scores['estimator'], scores['indices']['test'])):
+        predicted, kind = prediction_scores(estimator, X.iloc[test], classes)
+        fold_predictions.append((fold, test, predicted))
+    oof = oof_frame(rows, y, fold_predictions, 'hgb', classes, kind)
+
+    fold_scores = {metric: scores[f'test_{metric}'] for metric in SCORING[task]}
+    fold_scores.update({metric: scores[metric] for metric in TIMING_METRICS})
+    config = {'estimator': 'HistGradientBoostingClassifier', 'params': {**BOOSTING_PARAMS, **params},
+              'bins_version': binned.version, 'n_features': len(binned.columns),
+              'categorical': [col for col in binned.columns if col in binned.categories], 'oof_score': kind}
+    run_id = store.record(task, 'hgb', cv_strategy, fold_scores, data_hash=data_hash(df), config=config,
+                          total_seconds=total_seconds)
+    save_oof(oof, run_id, store)
+    record_intervals(run_id, oof, store)
+    return run_id
+
+
+# ==================== BENCHMARK ====================
+def benchmark(df, task='binary', cv_strategy='spatial'):
+    """Fit / predict time and CV scores: Random Forest vs boosting on raw features vs cached bins"""
+    from sklearn.model_selection import cross_validate
+
+    from .cv import make_cv
+    from .models import make_model, task_data
+    from .runs import SCORING
+
+    rows, X_raw, y = task_data(df, task)
+    X_raw = X_raw.mask(X_raw.abs() > FILL_VALUE_LIMIT)
+    cv, groups = make_cv(rows, cv_strategy)
+    scoring = list(SCORING[task])
+
+    _BIN_CACHE.clear()
+    start = time.perf_counter()
+    binned = bin_dataset(df)
+    binning = time.perf_counter() - start
+    X_binned = binned.features(df.index.get_indexer(rows.index))
+
+    candidates = [
+        ('Random Forest (dummies)', make_model('rf', n_jobs=1), X_raw, 0.0),
+        ('Boosting, raw features (dummies)', make_boosting(None), X_raw, 0.0),
+        ('Boosting, cached bins + categorical', make_boosting(binned.categorical), X_binned, binning)
+    ]
+    results = []
+    for name, model, X, prep in candidates:
+        scores = cross_validate(model, X, y, groups=groups, cv=cv, scoring=scoring, n_jobs=1)
+        results.append({
+            'Model': name,
+            'Features': X.shape[1],
+            'Binning (s, once)': prep,
+            'Fit (s/fold)': scores['fit_time'].mean(),
+            'Predict+score (s/fold)': scores['score_time'].mean(),
+            **{label: scores[f'test_{metric}'].mean() for metric, label in SCORING[task].items()}
+        })
+    return pd.DataFrame(results)
+
+
+def main(argv=None):
+    """Benchmark boosting against Random Forest, tune it, or record boosting runs"""
+    from .dataset import load_dataset
+
+    parser = argparse.ArgumentParser(description="Histogram gradient boosting on cached binned features")
+    parser.add_argument('--task', choices=['binary', 'family'], default='binary')
+    parser.add_argument('--cv', choices=['stratified', 'spatial'], default='spatial')
+    parser.add_argument('--tune', action='store_true', help="Grid over learning_rate x max_leaf_nodes")
+    parser.add_argument('--record', action='store_true', help="Record the boosting run in the run store")
+    args = parser.parse_args(argv)
+
+    df = load_dataset()
+    if args.record:
+        run_id = record_boosting(df, args.task, args.cv)
+        print(f"✅ Run {run_id}: Hist Gradient Boosting ({args.task}, {args.cv})")
+        return
+    if args.tune:
+        start = time.perf_counter()
+        table = tune(df, args.task, args.cv)
+        print(f"🎛️ {len(table)} trials on one binned dataset in {time.perf_counter() - start:.1f}s")
+        print(table.round(4).to_string(index=False))
+        return
+
+    table = benchmark(df, args.task, args.cv)
+    print(f"🚀 {args.task} task, {args.cv} CV")
+    print(table.round(4).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,465 @@
+"""
+Build Graph - Mediterranean Seagrass Intelligence Panel
+
+The derived artifacts form a DAG, from the raw TSVs to the tables and
+figures the pages read:
+
+    raw TSVs -> zones -> merged dataset (CSV) -> quality gate -> features:<task>
+                              |                                    -> folds:<task>:<cv>
+                              |                                       -> run:<task>:<cv>:<model> (run store)
+                              |                                          -> results:<task>:<cv> (CSV + figure)
+                              -> stats (dataset summary JSON)
+
+Every node is keyed by a content hash of its function source, the source of
+the seagrass modules it calls (its ``code`` list, e.g. dataset.py and
+zoning.py for the merged dataset, or runs.py / models.py for a run),
+parameters, input files and the output hashes of its upstream nodes. A build
+recomputes only the nodes whose key changed, whose output files are
+missing or were edited, or whose check fails (a run no longer in
+``data/runs.sqlite``); a rebuilt node with an unchanged output keeps its
+downstream nodes cached (early cutoff). Outputs are pickled to
+``data/build/cache/`` and indexed by ``data/build/manifest.json``. Nodes
+whose upstream nodes are done run in parallel worker processes, and a
+failing node (e.g. the quality gate) skips its downstream nodes only.
+
+Usage (from the panel folder):
+    python -m seagrass.build                         # incremental build of the default graph
+    python -m seagrass.build --status                # node states, without building
+    python -m seagrass.build --models rf et lr --jobs 4
+    python -m seagrass.build --force dataset --targets stats
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dataset import DATA_DIR, MERGED_FILE, ZONE_COL, data_hash
+from .models import TASKS
+from .zoning import CENTROIDS_FILE, COORD_COLS
+
+BUILD_DIR = 'build'
+CACHE_DIR = 'cache'
+MANIFEST_FILE = 'manifest.json'
+STATS_FILE = 'stats.json'
+PACKAGE_DIR = Path(__file__).resolve().parent
+DEFAULT_MODELS = ('rf',)
+DEFAULT_CV = ('stratified', 'spatial')
+# Modules behind evaluate_run: estimators, feature matrix, OOF scores, intervals, fill values, boosting parameters
+RUN_CODE = ('runs', 'models', 'dataset', 'oof', 'bootstrap', 'temporal', 'boosting')
+
+
+# ==================== GRAPH ====================
+class Node:
+    """One build step: func(*upstream outputs, data_dir=..., **params) -> output"""
+
+    def __init__(self, name, func, deps=(), files=(), targets=(), code=(), check=None, **params):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.files = tuple(files)  # input files, relative to the data folder
+        self.targets = tuple(targets)  # files the node writes, relative to the data folder
+        self.code = tuple(code)  # seagrass modules the node calls into, e.g. ('dataset', 'zoning')
+        self.check = check  # check(output, data_dir) -> False when state outside the data files is gone
+        self.params = params
+
+    def __repr__(self):
+        return f"Node({self.name!r}, deps={list(self.deps)})"
+
+
+def build_order(graph, targets=None):
+    """Names of the target nodes and everything upstream of them, in dependency order"""
+    order, state = [], {}
+
+    def visit(name, path):
+        if name not in graph:
+            raise ValueError(f"Unknown build node '{name}'" + (f" (needed by '{path[-1]}')" if path else ''))
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Dependency cycle: {' -> '.join([*path, name])}")
+        state[name] = 'visiting'
+        for dep in graph[name].deps:
+            visit(dep, [*path, name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in (graph if targets is None else targets):
+        visit(name, [])
+    return order
+
+
+# ==================== HASHING ====================
+def file_hash(path, block_size=1 << 20):
+    """sha256 of a file's bytes, None when it does not exist"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _update(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(b'frame' + data_hash(value).encode())
+    elif isinstance(value, pd.Series):
+        digest.update(b'series' + str(value.name).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        digest.update(f'array{value.dtype}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(f'dict{len(value)}'.encode())
+        for key in sorted(value, key=str):
+            _update(digest, key)
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'seq{len(value)}'.encode())
+        for item in value:
+            _update(digest, item)
+    else:
+        digest.update(pickle.dumps(value, protocol=4))
+
+
+def value_hash(value):
+    """Content hash of a node output (frames and arrays by value, containers recursively)"""
+    digest = hashlib.sha256()
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+def node_key(node, data_dir, upstream):
+    """Hash of what determines a node's output: code, parameters, input files, upstream outputs"""
+    digest = hashlib.sha256()
+    digest.update(node.name.encode())
+    digest.update(inspect.getsource(node.func).encode())
+    for module in node.code:
+        source = file_hash(PACKAGE_DIR / f'{module}.py')
+        if source is None:
+            raise ValueError(f"Node '{node.name}' lists unknown seagrass module '{module}'")
+        digest.update(f'{module}:{source}'.encode())
+    digest.update(json.dumps(node.params, sort_keys=True, default=str).encode())
+    for name in node.files:
+        digest.update(f'{name}:{file_hash(Path(data_dir) / name)}'.encode())
+    for dep in node.deps:
+        digest.update(f'{dep}:{upstream[dep]}'.encode())
+    return digest.hexdigest()
+
+
+# ==================== MANIFEST ====================
+def load_manifest(build_dir):
+    """Node name -> {key, output_hash, cache, targets, seconds, built} of the last successful builds"""
+    path = Path(build_dir) / MANIFEST_FILE
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_manifest(manifest, build_dir):
+    """Write the manifest atomically, so an interrupted build keeps the nodes already done"""
+    path = Path(build_dir) / MANIFEST_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def is_current(node, entry, key, data_dir):
+    """A node is up to date when its key matches, its cached output and target files are unchanged
+    and its check (if any) still accepts the cached output"""
+    if entry is None or entry['key'] != key:
+        return False
+    cache = Path(data_dir) / BUILD_DIR / entry['cache']
+    if not cache.exists():
+        return False
+    if not all(file_hash(Path(data_dir) / name) == entry['targets'].get(name) for name in node.targets):
+        return False
+    return node.check is None or node.check(_load(cache), Path(data_dir))
+
+
+# ==================== EXECUTION ====================
+def _load(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def execute_node(func, params, input_paths, cache_path, data_dir):
+    """Worker: load the upstream outputs, run the node, cache its output; returns (output hash, seconds)"""
+    upstream = [_load(path) for path in input_paths]
+    start = time.perf_counter()
+    value = func(*upstream, data_dir=Path(data_dir), **params)
+    seconds = time.perf_counter() - start
+
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return value_hash(value), seconds
+
+
+def build(graph, data_dir=DATA_DIR, targets=None, n_jobs=1, force=(), dry_run=False, log=None):
+    """Bring the target nodes (default: all) up to date; returns Node, Status, Seconds, Key per node
+
+    Status is 'cached', 'built', 'failed' or 'skipped' (an upstream node failed); with
+    dry_run, nodes that would be rebuilt are 'outdated' and nothing is executed.
+    """
+    graph = graph if isinstance(graph, dict) else {node.name: node for node in graph}
+    unknown = set(force) - set(graph)
+    if unknown:
+        raise ValueError(f"Unknown build nodes to force: {sorted(unknown)}")
+    log = log or (lambda message: None)
+    data_dir = Path(data_dir)
+    build_dir = data_dir / BUILD_DIR
+    names = build_order(graph, targets)
+    manifest = load_manifest(build_dir)
+
+    outputs, status, seconds, keys = {}, {}, {}, {}
+    pending, running = list(names), {}
+
+    def finish(name, result):
+        try:
+            output_hash, seconds[name] = result()
+        except Exception as exc:
+            status[name] = 'failed'
+            log(f"❌ {name}: {type(exc).__name__}: {exc}")
+            return
+        node, previous = graph[name], manifest.get(name)
+        cache = f'{CACHE_DIR}/{name.replace(":", "-")}-{keys[name][:16]}.pkl'
+        if previous is not None and previous['cache'] != cache:
+            (build_dir / previous['cache']).unlink(missing_ok=True)
+        manifest[name] = {
+            'key': keys[name],
+            'output_hash': output_hash,
+            'cache': cache,
+            'targets': {target: file_hash(data_dir / target) for target in node.targets},
+            'seconds': round(seconds[name], 3),
+            'built': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        }
+        save_manifest(manifest, build_dir)
+        outputs[name], status[name] = output_hash, 'built'
+        log(f"🔨 {name} ({seconds[name]:.1f}s)")
+
+    pool = ProcessPoolExecutor(n_jobs) if n_jobs > 1 and not dry_run else None
+    try:
+        while pending or running:
+            for name in list(pending):
+                node = graph[name]
+                if any(status.get(dep) in ('failed', 'skipped') for dep in node.deps):
+                    pending.remove(name)
+                    status[name] = 'skipped'
+                    continue
+                if not all(dep in outputs for dep in node.deps):
+                    continue
+                pending.remove(name)
+                key = keys[name] = node_key(node, data_dir, outputs)
+                entry = manifest.get(name)
+                if name not in force and is_current(node, entry, key, data_dir):
+                    outputs[name], status[name] = entry['output_hash'], 'cached'
+                    continue
+                if dry_run:
+                    outputs[name], status[name] = f'outdated:{key}', 'outdated'
+                    continue
+
+                cache = build_dir / CACHE_DIR / f'{name.replace(":", "-")}-{key[:16]}.pkl'
+                args = (node.func, node.params, [str(build_dir / manifest[dep]['cache']) for dep in node.deps],
+                        str(cache), str(data_dir))
+                if pool is None:
+                    finish(name, lambda: execute_node(*args))
+                else:
+                    running[pool.submit(execute_node, *args)] = name
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return pd.DataFrame([{
+        'Node': name,
+        'Status': status[name],
+        'Seconds': seconds.get(name, np.nan),
+        'Key': keys.get(name, '')[:12]
+    } for name in names])
+
+
+# ==================== NODES ====================
+def raw_node(data_dir):
+    """Presence and pseudo-absence TSVs"""
+    from .dataset import load_raw
+
+    return load_raw(data_dir)
+
+
+def zoning_node(raw, data_dir):
+    """Persisted zone centroids (fitted and saved once, when the file is missing)"""
+    from .zoning import get_zoning
+
+    return get_zoning(data_dir, pd.concat(raw, ignore_index=True)[COORD_COLS].values)
+
+
+def dataset_node(raw, zoning, data_dir):
+    """Merged dataset, exported as the CSV the panel reads (and read back, so hashes match load_dataset)"""
+    from .dataset import build_merged_dataset
+
+    path = Path(data_dir) / MERGED_FILE
+    tmp = path.with_suffix('.tmp')
+    build_merged_dataset(*raw, zoning).to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return pd.read_csv(path)
+
+
+def quality_node(dataset, data_dir, tolerance=1e-6):
+    """Data-quality gate: fails (and skips the model nodes) when validate_dataset reports errors"""
+    from .quality import validate_dataset
+
+    report = validate_dataset(dataset, tolerance)
+    if not report.passed:
+        raise ValueError(f"Quality gate {report.summary()}\n{report.errors.to_string(index=False)}")
+    return report.issues
+
+
+def stats_node(dataset, data_dir):
+    """Dataset summary (counts shown on the pages) as data/build/stats.json"""
+    from .dataset import dataset_summary
+
+    summary = dataset_summary(dataset)
+    path = Path(data_dir) / BUILD_DIR / STATS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(summary, indent=2))
+    return summary
+
+
+def store_node(data_dir):
+    """Run store of the model nodes, created and seeded once before they run in parallel"""
+    from .runs import RUNS_FILE, get_run_store
+
+    return str(get_run_store(Path(data_dir) / RUNS_FILE).path)
+
+
+def store_exists(store_path, data_dir):
+    """Check of the store node: the run store file was not deleted"""
+    return Path(store_path).exists()
+
+
+def features_node(dataset, quality, data_dir, task):
+    """Feature matrix and target of a task, with the columns the CV splitters need"""
+    from .models import task_data
+
+    rows, X, y = task_data(dataset, task)
+    return {'rows': rows[['ID', ZONE_COL, *COORD_COLS]], 'X': X, 'y': y}
+
+
+def folds_node(features, data_dir, cv_strategy, radius_km=10.0):
+    """(train, test) index pairs of a CV strategy"""
+    from .cv import make_cv
+
+    cv, groups = make_cv(features['rows'], cv_strategy, radius_km=radius_km)
+    return [(train, test) for train, test in cv.split(features['X'], features['y'], groups)]
+
+
+def run_node(dataset, splits, store_path, data_dir, task, cv_strategy, model_id):
+    """Cross-validate one model on the folds and record the run"""
+    from .runs import RunStore, evaluate_run
+
+    store = RunStore(store_path)
+    run_id = evaluate_run(dataset, model_id, task, cv_strategy, store, n_jobs=1, splits=splits)
+    created = store.runs(task, cv_strategy, model_id, limit=1)['created'].iloc[0]
+    # created: a run re-recorded under the same id (e.g. in a recreated store) still changes the output
+    return {'run_id': run_id, 'model_id': model_id, 'store': store_path, 'created': created}
+
+
+def run_recorded(run, data_dir):
+    """Check of a run node: its run is still in the store (not deleted, nor the store replaced)"""
+    from .runs import RunStore
+
+    store = run.get('store')  # absent in outputs cached before the check existed
+    return store is not None and Path(store).exists() and run['run_id'] in RunStore(store)
+
+
+def results_node(store_path, *runs, data_dir, task, cv_strategy):
+    """Results table of the built runs as CSV, and a grouped bar chart as Plotly JSON"""
+    import plotly.express as px
+
+    from .runs import SCORING, RunStore
+
+    table = RunStore(store_path).results_table(task, cv_strategy, run_ids=[run['run_id'] for run in runs],
+                                               intervals='station')
+    path = Path(data_dir) / BUILD_DIR / f'results_{task}_{cv_strategy}.csv'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(path, index=False)
+
+    long = table.melt(id_vars='Model', value_vars=list(SCORING[task].values()), var_name='Metric', value_name='Score')
+    fig = px.bar(long, x='Metric', y='Score', color='Model', barmode='group',
+                 title=f'{task.capitalize()} - {cv_strategy} CV')
+    fig.write_json(path.with_suffix('.json'))
+    return table
+
+
+def default_graph(models=DEFAULT_MODELS, tasks=TASKS, cv_strategies=DEFAULT_CV, radius_km=10.0):
+    """Panel build graph: data nodes, then features, folds, runs and results per task / CV strategy"""
+    nodes = [
+        Node('raw', raw_node, files=('presence.txt', 'absence.txt'), code=('dataset',)),
+        Node('zoning', zoning_node, deps=('raw',), targets=(CENTROIDS_FILE,), code=('zoning',)),
+        Node('dataset', dataset_node, deps=('raw', 'zoning'), targets=(MERGED_FILE,), code=('dataset', 'zoning')),
+        Node('quality', quality_node, deps=('dataset',), code=('quality', 'dataset', 'rasters', 'temporal')),
+        Node('stats', stats_node, deps=('dataset',), targets=(f'{BUILD_DIR}/{STATS_FILE}',), code=('dataset',)),
+        Node('store', store_node, code=('runs',), check=store_exists)
+    ]
+    for task in tasks:
+        nodes.append(Node(f'features:{task}', features_node, deps=('dataset', 'quality'), code=('models', 'dataset'),
+                          task=task))
+        for cv_strategy in cv_strategies:
+            folds = f'folds:{task}:{cv_strategy}'
+            cv_params = {'radius_km': radius_km} if cv_strategy == 'buffered' else {}
+            nodes.append(Node(folds, folds_node, deps=(f'features:{task}',), code=('cv',), cv_strategy=cv_strategy,
+                              **cv_params))
+            runs = [f'run:{task}:{cv_strategy}:{model_id}' for model_id in models]
+            nodes += [Node(name, run_node, deps=('dataset', folds, 'store'), code=RUN_CODE, check=run_recorded,
+                           task=task, cv_strategy=cv_strategy, model_id=model_id)
+                      for name, model_id in zip(runs, models)]
+            results = f'{BUILD_DIR}/results_{task}_{cv_strategy}'
+            nodes.append(Node(f'results:{task}:{cv_strategy}', results_node, deps=('store', *runs), code=('runs',),
+                              targets=(f'{results}.csv', f'{results}.json'), task=task, cv_strategy=cv_strategy))
+    return {node.name: node for node in nodes}
+
+
+def main(argv=None):
+    """Build the panel artifacts incrementally, or print the state of every node"""
+    from .cv import CV_STRATEGIES
+    from .models import MODEL_NAMES
+
+    parser = argparse.ArgumentParser(description="Incremental content-hash build of the panel artifacts")
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    parser.add_argument('--models', nargs='+', choices=list(MODEL_NAMES), default=list(DEFAULT_MODELS))
+    parser.add_argument('--tasks', nargs='+', choices=list(TASKS), default=list(TASKS))
+    parser.add_argument('--cv', nargs='+', choices=list(CV_STRATEGIES), default=list(DEFAULT_CV))
+    parser.add_argument('--targets', nargs='+', help="Build only these nodes and their upstream nodes")
+    parser.add_argument('--force', nargs='+', default=[], help="Rebuild these nodes even when up to date")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--status', action='store_true', help="Show node states without building")
+    args = parser.parse_args(argv)
+
+    graph = default_graph(args.models, args.tasks, args.cv)
+    start = time.perf_counter()
+    report = build(graph, args.data_dir, args.targets, args.jobs, args.force, dry_run=args.status, log=print)
+    counts = report['Status'].value_counts()
+    print(f"\n🧱 {len(report)} nodes in {time.perf_counter() - start:.1f}s: "
+          + ', '.join(f"{n} {state}" for state, n in counts.items()))
+    print(report.round({'Seconds': 2}).to_string(index=False, na_rep=''))
+    if counts.get('failed'):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Presence -> Family Cascade - Mediterranean Seagrass Intelligence Panel
+
+The binary (presence) and family models are trained on different subsets:
+every station for presence, only stations with Presence == True for the
+family. The cascade chains them:
+
+    P_presence = binary model, every row
+    family     = family model, only rows with P_presence >= gate
+    label      = 'Absence' if P_presence < threshold, else the family
+
+The gate (<= threshold) also sends "likely present" rows to the family
+stage, so their family probabilities are available. On a prediction grid
+most cells are absences, so the family model skips most rows
+(seagrass.scoring ``--family-gate``).
+
+``cascade_cv`` evaluates the chain end to end. Both stages are refit on
+every fold's training rows (the family stage on their presences), and the
+held-out stations are labelled Absence / <family>. The resulting metrics
+are comparable across the two tasks, unlike the multi-class page, which
+scores families on known presences only.
+
+Usage (from the panel folder):
+    python -m seagrass.cascade --binary rf --family rf --cv spatial
+    python -m seagrass.cascade --gate 0.3 --benchmark-rows 500000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from .dataset import FAMILY_TARGET, ZONE_COL
+
+ABSENCE_LABEL = 'Absence'
+
+
+# ==================== PREDICTION ====================
+def cascade_labels(p_presence, family, threshold=0.5):
+    """Absence below the presence threshold, the predicted family otherwise"""
+    return np.where(np.asarray(p_presence) >= threshold, family, ABSENCE_LABEL).astype(object)
+
+
+def cascade_cv(df, binary_id='rf', family_id='rf', cv_strategy='spatial', gate=0.5, random_state=42):
+    """Out-of-fold cascade predictions: ID, zone, fold, y_true, P_presence, gated, family"""
+    from sklearn.base import clone
+
+    from .cv import make_cv
+    from .models import make_model, task_data
+    from .oof import prediction_scores
+
+    rows, X, presence = task_data(df, 'binary')
+    family = rows[FAMILY_TARGET].to_numpy()
+    cv, groups = make_cv(rows, cv_strategy, random_state=random_state)
+    binary_model, family_model = make_model(binary_id, random_state), make_model(family_id, random_state)
+
+    parts = []
+    for fold, (train, test) in enumerate(cv.split(X, presence, groups)):
+        binary_fit = clone(binary_model).fit(X.iloc[train], presence.iloc[train])
+        present = train[presence.values[train]]
+        family_fit = clone(family_model).fit(X.iloc[present], family[present])
+
+        p_presence, kind = prediction_scores(binary_fit, X.iloc[test])
+        if kind != 'probability':
+            raise ValueError(f"The presence stage needs probabilities; '{binary_id}' has no predict_proba")
+        gated = p_presence >= gate
+        predicted = np.full(len(test), None, dtype=object)
+        if gated.any():
+            predicted[gated] = family_fit.predict(X.iloc[test[gated]])
+        parts.append(pd.DataFrame({
+            'ID': rows['ID'].values[test],
+            'zone': rows[ZONE_COL].values[test].astype(np.int8),
+            'fold': np.int8(fold),
+            'y_true': family[test],
+            'P_presence': p_presence.astype(np.float32),
+            'gated': gated,
+            'family': predicted
+        }))
+    return pd.concat(parts, ignore_index=True).sort_values('ID', kind='stable').reset_index(drop=True)
+
+
+def cascade_metrics(frame, threshold=0.5):
+    """End-to-end and per-stage metrics of out-of-fold cascade predictions"""
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+    if frame['gated'].lt(frame['P_presence'] >= threshold).any():
+        raise ValueError("The family gate must not exceed the presence threshold")
+    predicted = cascade_labels(frame['P_presence'], frame['family'], threshold)
+    y_true = frame['y_true'].to_numpy()
+    true_presence, predicted_presence = y_true != ABSENCE_LABEL, predicted != ABSENCE_LABEL
+    detected = true_presence & predicted_presence
+    return {
+        'Accuracy': accuracy_score(y_true, predicted),
+        'Macro_F1': f1_score(y_true, predicted, average='macro'),
+        'Presence_Precision': precision_score(true_presence, predicted_presence, zero_division=0),
+        'Presence_Recall': recall_score(true_presence, predicted_presence, zero_division=0),
+        'Family_Accuracy': accuracy_score(y_true[detected], predicted[detected]) if detected.any() else np.nan,
+        'Family_Stage_Share': float(frame['gated'].mean())
+    }
+
+
+# ==================== THROUGHPUT ====================
+def benchmark_throughput(df, binary_model, family_model, n_rows=500_000, gates=(None, 0.3, 0.5),
+                         chunk_size=50_000):
+    """Rows/s of seagrass.scoring on a tiled grid, with both models on every row (None) or gated"""
+    from .scoring import score_chunk
+
+    reps = -(-n_rows // len(df))
+    grid = df.iloc[np.tile(np.arange(len(df)), reps)[:n_rows]].reset_index(drop=True)
+    rows = []
+    for gate in gates:
+        scored, start = 0, time.perf_counter()
+        for begin in range(0, len(grid), chunk_size):
+            out = score_chunk(grid.iloc[begin:begin + chunk_size], binary_model, family_model, gate)
+            scored += int(out['Predicted_Family'].notna().sum())
+        seconds = time.perf_counter() - start
+        rows.append({'Gate': 'none (both models)' if gate is None else f'P_presence >= {gate}',
+                     'Family rows': scored / len(grid), 'Seconds': seconds, 'Rows/s': len(grid) / seconds})
+    table = pd.DataFrame(rows)
+    table['Speed-up'] = table['Rows/s'] / table['Rows/s'].iloc[0]
+    return table
+
+
+def main(argv=None):
+    """Cross-validate the cascade end to end and benchmark gated scoring"""
+    from .dataset import load_dataset
+    from .models import MODEL_NAMES, fit_model
+
+    parser = argparse.ArgumentParser(description="Presence -> family cascade evaluation")
+    parser.add_argument('--binary', choices=list(MODEL_NAMES), default='rf')
+    parser.add_argument('--family', choices=list(MODEL_NAMES), default='rf')
+    parser.add_argument('--cv', choices=['stratified', 'spatial'], default='spatial')
+    parser.add_argument('--gate', type=float, default=0.5, help="Family stage runs where P_presence >= gate")
+    parser.add_argument('--threshold', type=float, default=0.5, help="Presence decision threshold")
+    parser.add_argument('--benchmark-rows', type=int, default=500_000)
+    args = parser.parse_args(argv)
+    if args.gate > args.threshold:
+        raise ValueError(f"--gate ({args.gate}) must not exceed --threshold ({args.threshold})")
+
+    df = load_dataset()
+    start = time.perf_counter()
+    frame = cascade_cv(df, args.binary, args.family, args.cv, args.gate)
+    print(f"🔗 Cascade {MODEL_NAMES[args.binary]} -> {MODEL_NAMES[args.family]} ({args.cv} CV, gate {args.gate}) "
+          f"in {time.perf_counter() - start:.1f}s")
+    for name, value in cascade_metrics(frame, args.threshold).items():
+        print(f"   {name:<20} {value:.4f}")
+
+    if args.benchmark_rows:
+        binary_model = fit_model(df, args.binary, 'binary', n_jobs=1)
+        family_model = fit_model(df, args.family, 'family', n_jobs=1)
+        gates = (None, *sorted({args.gate, args.threshold}))
+        table = benchmark_throughput(df, binary_model, family_model, args.benchmark_rows, gates)
+        print(f"\n⏱️ Scoring {args.benchmark_rows:,} tiled rows")
+        print(table.round(3).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
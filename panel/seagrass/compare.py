@@ -0,0 +1,286 @@
+"""
+Model Comparison Runner - Mediterranean Seagrass Intelligence Panel
+
+Pure scikit-learn replacement for the notebook's PyCaret comparison
+(``setup`` + ``create_model`` over lr, ridge, lda, svm, knn, dt, rf). It
+reproduces PyCaret's defaults:
+
+- stratified 70 / 30 train / hold-out split (session_id 42), with CV on
+  the training part only;
+- mean imputation of numeric columns (no scaling, no feature selection).
+  Leaked NetCDF fill values (|x| > 1e30, two ZSD stations) are imputed
+  too unless ``mask_fill_values=False``: PyCaret keeps them, and the
+  resulting 1e38 inputs make the linear models degenerate;
+- PyCaret's estimator defaults (``models.PYCARET_OVERRIDES``, hinge-loss
+  SGD as "SVM - Linear");
+- Accuracy, AUC, Recall, Precision, F1 (weighted averages for families).
+
+Every (model, fold) pair is one job on a single joblib pool, so all folds
+of all models run in parallel. Only the estimators being compared are
+imported. Results can be recorded in the run store (``seagrass.runs``).
+
+Usage (from the panel folder):
+    python -m seagrass.compare --task binary --cv spatial --record
+    python -m seagrass.compare --benchmark          # import / wall time / peak memory vs PyCaret
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .models import MODEL_NAMES, PYCARET_MODELS, PYCARET_OVERRIDES
+from .temporal import FILL_VALUE_LIMIT
+
+# sklearn scorer -> PyCaret column name
+PYCARET_METRICS = {
+    'binary': {'accuracy': 'Accuracy', 'roc_auc': 'AUC', 'recall': 'Recall', 'precision': 'Prec.', 'f1': 'F1'},
+    'family': {'accuracy': 'Accuracy', 'roc_auc_ovr_weighted': 'AUC', 'recall_weighted': 'Recall',
+               'precision_weighted': 'Prec.', 'f1_weighted': 'F1', 'f1_macro': 'Macro F1'}
+}
+TRAIN_SIZE = 0.7
+FOLDS = {'stratified': 10, 'spatial': 8}
+
+
+# ==================== RUNNER ====================
+def make_pipeline_model(model_id, random_state=42):
+    """Mean imputation + estimator with PyCaret's defaults (single-threaded: parallelism is per fold)"""
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+
+    from .models import make_estimator
+
+    # The bare estimator: fill values are masked (or kept, for parity) by the caller
+    model = make_estimator(model_id, random_state=random_state, n_jobs=1)
+    model.set_params(**PYCARET_OVERRIDES.get(model_id, {}))
+    return Pipeline([('numerical_imputer', SimpleImputer(strategy='mean')), ('model', model)])
+
+
+def _score_fold(model_id, X, y, train, test, scoring, random_state):
+    """Fit one model on one fold; returns its scores and timings, and the test-row predictions"""
+    from sklearn.metrics import get_scorer
+
+    from .oof import prediction_scores
+
+    model = make_pipeline_model(model_id, random_state)
+    start = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_time = time.perf_counter() - start
+
+    scores = {}
+    for name in scoring:
+        try:
+            scores[name] = get_scorer(name)(model, X[test], y[test])
+        except (ValueError, AttributeError):
+            scores[name] = np.nan  # e.g. AUC on a fold holding one class only
+    scores['fit_time'] = fit_time
+    scores['score_time'] = time.perf_counter() - start - fit_time
+    classes = np.unique(y)  # every fold's scores are laid out on the task's full class list
+    return scores, prediction_scores(model, X[test], classes), classes
+
+
+def split_training_rows(rows, y, train_size=TRAIN_SIZE, random_state=42):
+    """PyCaret's stratified train / hold-out split; train_size=None keeps every row"""
+    if train_size is None or train_size >= 1:
+        return np.arange(len(rows))
+    from sklearn.model_selection import train_test_split
+
+    train, _ = train_test_split(np.arange(len(rows)), train_size=train_size, stratify=y,
+                                random_state=random_state)
+    return np.sort(train)
+
+
+def compare_models(df, task='binary', cv_strategy='stratified', models=PYCARET_MODELS, train_size=TRAIN_SIZE,
+                   mask_fill_values=True, n_jobs=-1, random_state=42):
+    """Cross-validate every model with all folds in one parallel pool
+
+    Returns (summary, per-fold scores, {model_id: out-of-fold frame}).
+    """
+    from joblib import Parallel, delayed
+
+    from .cv import make_cv
+    from .models import task_data
+    from .oof import oof_frame
+
+    rows, X, y = task_data(df, task)
+    keep = split_training_rows(rows, y, train_size, random_state)
+    rows, X, y = rows.iloc[keep], X.to_numpy()[keep], np.asarray(y)[keep]
+    if mask_fill_values:
+        X[np.abs(X) > FILL_VALUE_LIMIT] = np.nan
+
+    cv, groups = make_cv(rows, cv_strategy, n_splits=FOLDS.get(cv_strategy, 10), random_state=random_state)
+    folds = list(cv.split(X, y, groups))
+    scoring = list(PYCARET_METRICS[task])
+
+    jobs = [(model_id, fold, train, test) for model_id in models for fold, (train, test) in enumerate(folds)]
+    start = time.perf_counter()
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_score_fold)(model_id, X, y, train, test, scoring, random_state)
+        for model_id, _, train, test in jobs
+    )
+    wall = time.perf_counter() - start
+
+    per_fold = pd.DataFrame([{'model_id': model_id, 'fold': fold, **scores}
+                             for (model_id, fold, _, _), (scores, _, _) in zip(jobs, results)])
+    oof = {}
+    for model_id in models:
+        fold_predictions = [(fold, test, predicted) for (m, fold, _, test), (_, (predicted, _), _)
+                            in zip(jobs, results) if m == model_id]
+        classes, kind = next((classes, kind) for (m, _, _, _), (_, (_, kind), classes) in zip(jobs, results)
+                             if m == model_id)
+        oof[model_id] = oof_frame(rows, y, fold_predictions, model_id, classes, kind)
+        oof[model_id].attrs['oof_score'] = kind
+    summary = (per_fold.groupby('model_id', sort=False)[scoring + ['fit_time']].mean()
+               .rename(columns={**PYCARET_METRICS[task], 'fit_time': 'Fit (s/fold)'})
+               .reset_index())
+    summary.insert(0, 'Model', summary.pop('model_id').map(MODEL_NAMES))
+    summary.attrs.update({'wall_seconds': wall, 'n_rows': len(rows), 'n_folds': len(folds)})
+    return summary, per_fold, oof
+
+
+def record_comparison(df, per_fold, task, cv_strategy, train_size=TRAIN_SIZE, mask_fill_values=True, oof=None,
+                      store=None):
+    """Store each model of a comparison as one run (with its OOF predictions); returns {model_id: run_id}"""
+    from .bootstrap import record_intervals
+    from .dataset import data_hash
+    from .oof import save_oof
+    from .runs import get_run_store
+
+    store = store if store is not None else get_run_store()
+    hash_ = data_hash(df)
+    run_ids = {}
+    for model_id, folds in per_fold.groupby('model_id', sort=False):
+        model = make_pipeline_model(model_id).named_steps['model']
+        config = {'runner': 'seagrass.compare', 'estimator': type(model).__name__, 'params': model.get_params(),
+                  'imputation': 'mean', 'mask_fill_values': mask_fill_values, 'train_size': train_size}
+        if oof is not None and model_id in oof:
+            config['oof_score'] = oof[model_id].attrs.get('oof_score')
+        scores = {metric: folds[metric].values for metric in folds.columns if metric not in ('model_id', 'fold')}
+        run_ids[model_id] = store.record(task, model_id, cv_strategy, scores, data_hash=hash_, config=config,
+                                         total_seconds=float(folds['fit_time'].sum() + folds['score_time'].sum()))
+        if oof is not None and model_id in oof:
+            save_oof(oof[model_id], run_ids[model_id], store)
+            record_intervals(run_ids[model_id], oof[model_id], store)
+    return run_ids
+
+
+# ==================== BENCHMARK ====================
+def _profile(runner, task, cv_strategy):
+    """Run one comparison path in this process and print import / wall time and peak RSS as JSON"""
+    import resource
+
+    from .dataset import BINARY_TARGET, FAMILY_TARGET, ZONE_COL, load_dataset
+    from .models import task_data
+
+    # numpy / pandas are already loaded by both paths; time only what each one adds
+    start = time.perf_counter()
+    if runner == 'pycaret':
+        from pycaret.classification import create_model, pull, setup
+    else:
+        import joblib  # noqa: F401
+        from sklearn.metrics import get_scorer  # noqa: F401
+
+        for model_id in PYCARET_MODELS:
+            make_pipeline_model(model_id)
+    import_seconds = time.perf_counter() - start
+
+    df = load_dataset()
+    start = time.perf_counter()
+    if runner == 'pycaret':
+        _, X, y = task_data(df, task)
+        target = BINARY_TARGET if task == 'binary' else FAMILY_TARGET
+        data = X.assign(**{target: np.asarray(y).astype(int) if task == 'binary' else np.asarray(y)})
+        fold_options = ({'fold_strategy': 'stratifiedkfold'} if cv_strategy == 'stratified' else
+                        {'fold_strategy': 'groupkfold', 'fold_groups': ZONE_COL})  # a predictor column
+        setup(data=data, target=target, session_id=42, fold=FOLDS[cv_strategy], verbose=False, html=False,
+              **fold_options)
+        for model_id in PYCARET_MODELS:
+            create_model(model_id, verbose=False)
+            pull()
+    else:
+        compare_models(df, task, cv_strategy)
+    wall_seconds = time.perf_counter() - start
+
+    # Worker processes count too: stop joblib's reusable pool so their usage is reported
+    from joblib.externals.loky import get_reusable_executor
+
+    get_reusable_executor().shutdown(wait=True)
+    peak_kb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss +
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)  # KiB on Linux
+    peak_mb = peak_kb / 1024
+    print(json.dumps({'import_seconds': import_seconds, 'wall_seconds': wall_seconds, 'peak_mb': peak_mb}))
+
+
+def benchmark(task='binary', cv_strategy='stratified', pycaret_python=None):
+    """Import time, wall time and peak memory of each comparison path, each in a fresh interpreter"""
+    panel_dir = Path(__file__).resolve().parent.parent
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [str(panel_dir), os.environ.get('PYTHONPATH')]))}
+    rows = []
+    # PyCaret pins old numpy / pandas / scikit-learn, so it usually lives in its own environment
+    for runner, python in (('sklearn', sys.executable), ('pycaret', pycaret_python or sys.executable)):
+        # PyCaret writes logs.log into the working directory: keep it out of the panel folder
+        with tempfile.TemporaryDirectory() as workdir:
+            process = subprocess.run(
+                [python, '-m', 'seagrass.compare', '--profile', runner, '--task', task, '--cv', cv_strategy],
+                capture_output=True, text=True, cwd=workdir, env=env
+            )
+        if process.returncode != 0:
+            reason = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'failed'
+            rows.append({'Runner': runner, 'Import (s)': np.nan, 'Wall (s)': np.nan, 'Peak RSS (MB)': np.nan,
+                         'Note': reason})
+            continue
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        rows.append({'Runner': runner, 'Import (s)': result['import_seconds'], 'Wall (s)': result['wall_seconds'],
+                     'Peak RSS (MB)': result['peak_mb'], 'Note': ''})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    """Run the comparison (optionally recording it) or the PyCaret benchmark"""
+    from .cv import CV_STRATEGIES
+    from .models import TASKS
+
+    parser = argparse.ArgumentParser(description="scikit-learn model comparison (PyCaret-equivalent)")
+    parser.add_argument('--task', choices=list(TASKS), default='binary')
+    parser.add_argument('--cv', choices=[s for s in CV_STRATEGIES if s in FOLDS], default='stratified')
+    parser.add_argument('--models', nargs='+', choices=list(MODEL_NAMES), default=list(PYCARET_MODELS))
+    parser.add_argument('--train-size', type=float, default=TRAIN_SIZE, help="Share of rows used for CV (1 = all)")
+    parser.add_argument('--jobs', type=int, default=-1)
+    parser.add_argument('--record', action='store_true', help="Record one run per model in the run store")
+    parser.add_argument('--keep-fill-values', action='store_true', help="Do not impute |x| > 1e30 (PyCaret parity)")
+    parser.add_argument('--benchmark', action='store_true', help="Compare with the PyCaret path")
+    parser.add_argument('--pycaret-python', help="Interpreter of an environment with PyCaret installed")
+    parser.add_argument('--profile', choices=['sklearn', 'pycaret'], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        _profile(args.profile, args.task, args.cv)
+        return
+    if args.benchmark:
+        print(f"⏱️ Comparison benchmark ({args.task}, {args.cv}), each path in a fresh interpreter")
+        print(benchmark(args.task, args.cv, args.pycaret_python).round(2).to_string(index=False))
+        return
+
+    from .dataset import load_dataset
+
+    df = load_dataset()
+    summary, per_fold, oof = compare_models(df, args.task, args.cv, args.models, args.train_size,
+                                       mask_fill_values=not args.keep_fill_values, n_jobs=args.jobs)
+    print(f"🤖 {len(args.models)} models × {summary.attrs['n_folds']} folds ({CV_STRATEGIES[args.cv]}) "
+          f"on {summary.attrs['n_rows']:,} rows in {summary.attrs['wall_seconds']:.1f}s")
+    print(summary.round(4).to_string(index=False))
+    if args.record:
+        run_ids = record_comparison(df, per_fold, args.task, args.cv, args.train_size, not args.keep_fill_values,
+                                    oof)
+        print(f"\n🗂️ Recorded runs {min(run_ids.values())}-{max(run_ids.values())} in the run store")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+Array-Compiled Tree Inference - Mediterranean Seagrass Intelligence Panel
+
+Flattens fitted Decision Tree / Random Forest / Extra Trees classifiers
+into packed NumPy arrays (feature, threshold, children, leaf values) and
+scores them with a pure-NumPy batched traversal.
+
+Leaves point to themselves, so all (sample, tree) pairs advance one level
+per step with a single gather/compare and no per-tree Python loop; pairs
+that have reached a leaf are dropped from the active set.
+Inputs are cast to float32 and compared with ``<=`` against the float64
+thresholds exactly as sklearn does, and leaf probabilities are summed in
+tree order, so outputs match sklearn's sequential (n_jobs=1) predict_proba
+bit-for-bit.
+
+The runtime removes sklearn's per-call and per-estimator overhead, which
+dominates for single stations and small batches (panel, prediction
+service). For large grids sklearn's compiled traversal stays faster; see
+the benchmark table printed by ``main``.
+
+Usage (from the panel folder):
+    python -m seagrass.compiled
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+ARRAY_FIELDS = ('feature', 'threshold', 'left', 'right', 'missing_left', 'leaf_values', 'roots')
+
+
+# ==================== EXPORT ====================
+def _tree_list(model):
+    """Underlying sklearn Tree objects and whether outputs are averaged"""
+    if hasattr(model, 'estimators_'):
+        return [est.tree_ for est in model.estimators_], True
+    if hasattr(model, 'tree_'):
+        return [model.tree_], False
+    raise TypeError(f"{type(model).__name__} is not a fitted tree or forest classifier")
+
+
+def compile_model(model):
+    """Pack a fitted tree classifier into a CompiledForest"""
+    trees, averaged = _tree_list(model)
+    sizes = np.array([tree.node_count for tree in trees])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    feature, threshold, left, right, missing_left, leaf_values = [], [], [], [], [], []
+    for tree, offset in zip(trees, offsets):
+        own = np.arange(tree.node_count) + offset
+        is_leaf = tree.children_left < 0
+
+        feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(tree.threshold.astype(np.float64))
+        # Leaves loop back to themselves so traversal can run a fixed number of steps
+        left.append(np.where(is_leaf, own, tree.children_left + offset).astype(np.int32))
+        right.append(np.where(is_leaf, own, tree.children_right + offset).astype(np.int32))
+
+        go_left = getattr(tree, 'missing_go_to_left', None)
+        missing_left.append(np.zeros(tree.node_count, dtype=bool) if go_left is None
+                            else np.asarray(go_left, dtype=bool))
+
+        values = tree.value[:, 0, :].astype(np.float64)
+        normalizer = values.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        leaf_values.append(values / normalizer)
+
+    arrays = {
+        'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold),
+        'left': np.concatenate(left),
+        'right': np.concatenate(right),
+        'missing_left': np.concatenate(missing_left),
+        'leaf_values': np.concatenate(leaf_values),
+        'roots': offsets.astype(np.int32)
+    }
+    meta = {
+        'classes': list(model.classes_),
+        'feature_names': [str(f) for f in getattr(model, 'feature_names_in_', range(model.n_features_in_))],
+        'max_depth': int(max(tree.max_depth for tree in trees)),
+        'averaged': averaged
+    }
+    return CompiledForest(arrays, meta)
+
+
+# ==================== RUNTIME ====================
+class CompiledForest:
+    """Packed-array tree ensemble with a vectorized predict_proba"""
+
+    def __init__(self, arrays, meta):
+        missing = [name for name in ARRAY_FIELDS if name not in arrays]
+        if missing:
+            raise ValueError(f"Compiled model is missing arrays: {missing}")
+        self.arrays = arrays
+        self.meta = meta
+        self.classes_ = np.array(meta['classes'])
+        self.feature_names_in_ = np.array(meta['feature_names'], dtype=object)
+        self.n_features_in_ = len(meta['feature_names'])
+        for name in ARRAY_FIELDS:
+            setattr(self, name, arrays[name])
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def _as_float32(self, X):
+        """Feature matrix in training column order, as float32 (like sklearn)"""
+        if hasattr(X, 'columns'):
+            X = X[list(self.meta['feature_names'])]
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+        return X
+
+    def apply(self, X):
+        """Leaf node index (global) for every sample and tree: shape (n_samples, n_trees)"""
+        X = self._as_float32(X)
+        n_samples = X.shape[0]
+        has_nan = np.isnan(X).any()
+
+        flat = X.ravel()
+        row_base = np.repeat(np.arange(n_samples, dtype=np.int64) * X.shape[1], self.n_trees)
+        nodes = np.tile(self.roots, n_samples)
+        active = np.arange(nodes.size)
+
+        for _ in range(self.meta['max_depth']):
+            current = nodes[active]
+            values = flat[row_base[active] + self.feature[current]]
+            go_left = values <= self.threshold[current]
+            if has_nan:
+                go_left |= np.isnan(values) & self.missing_left[current]
+            following = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = following
+            # Pairs that did not move are sitting on a leaf; drop them from the active set
+            active = active[following != current]
+            if not active.size:
+                break
+        return nodes.reshape(n_samples, self.n_trees)
+
+    def predict_proba(self, X, batch_size=4096):
+        """Class probabilities, identical to sklearn's sequential predict_proba"""
+        X = self._as_float32(X)
+        out = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+
+        for start in range(0, X.shape[0], batch_size):
+            leaves = self.apply(X[start:start + batch_size])
+            proba = np.zeros((leaves.shape[0], len(self.classes_)), dtype=np.float64)
+            # Sum trees in order, as sklearn's forest accumulator does
+            for t in range(self.n_trees):
+                proba += self.leaf_values[leaves[:, t]]
+            if self.meta['averaged']:
+                proba /= self.n_trees
+            out[start:start + len(proba)] = proba
+        return out
+
+    def predict(self, X):
+        """Most probable class per sample"""
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+# ==================== BENCHMARK ====================
+def _time_calls(fn, batches, min_seconds=0.2):
+    """Mean seconds per call of fn over the batches, repeating until min_seconds elapse"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for batch in batches:
+            fn(batch)
+            calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def benchmark(model, X, batch_sizes=(1, 10, 100, 1000, None), min_seconds=0.2):
+    """Latency and throughput of sklearn vs compiled predict_proba across batch sizes"""
+    compiled = compile_model(model)
+    X_values = np.asarray(X, dtype=np.float64)
+    X_frame = pd.DataFrame(X_values, columns=compiled.feature_names_in_)
+
+    rows = []
+    for batch_size in batch_sizes:
+        size = len(X_values) if batch_size is None else min(batch_size, len(X_values))
+        starts = range(0, len(X_values) - size + 1, size)
+        frame_batches = [X_frame.iloc[s:s + size] for s in list(starts)[:50]]
+        array_batches = [X_values[s:s + size] for s in list(starts)[:50]]
+
+        sklearn_s = _time_calls(model.predict_proba, frame_batches, min_seconds)
+        compiled_s = _time_calls(compiled.predict_proba, array_batches, min_seconds)
+        rows.append({
+            'Batch Size': size,
+            'sklearn (ms/call)': sklearn_s * 1000,
+            'Compiled (ms/call)': compiled_s * 1000,
+            'sklearn (rows/s)': size / sklearn_s,
+            'Compiled (rows/s)': size / compiled_s,
+            'Speedup': sklearn_s / compiled_s
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    """Fit the tree models, verify exact agreement with sklearn and print the benchmark"""
+    from .dataset import load_dataset
+    from .models import MODEL_NAMES, TREE_MODELS, fit_model, task_data
+
+    df = load_dataset()
+    for task in ('binary', 'family'):
+        _, X, _ = task_data(df, task)
+        for model_id in TREE_MODELS:
+            name = MODEL_NAMES[model_id]
+            model = fit_model(df, model_id, task, n_jobs=1)
+            compiled = compile_model(model)
+            exact = np.array_equal(compiled.predict_proba(X), model.predict_proba(X))
+            print(f"\n🌲 {name} ({task}): {compiled.n_trees} trees, {compiled.n_nodes:,} nodes, "
+                  f"bit-for-bit match: {'✅' if exact else '❌'}")
+            print(benchmark(model, X).round(3).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Cross-Validation Strategies - Mediterranean Seagrass Intelligence Panel
+
+Stratified K-Fold, spatial GroupKFold by GEOGRAPHIC_ZONE and buffered
+spatial CV. The buffered splitter removes every training point lying
+within a haversine radius of any test point, so stations just across a
+zone border cannot leak into the fold. Exclusion uses a BallTree over the
+test points (O(n log n) instead of O(n^2) pairwise distances).
+
+Usage (from the panel folder):
+    python -m seagrass.cv --radii 0 5 10 25 50
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import BaseCrossValidator, GroupKFold, StratifiedKFold
+
+from .dataset import ZONE_COL
+
+EARTH_RADIUS_KM = 6371.0088
+CV_STRATEGIES = {
+    'stratified': "Stratified K-Fold (10-fold)",
+    'spatial': "Spatial Cross-Validation (GroupKFold by Zone)",
+    'buffered': "Buffered Spatial Cross-Validation (zone folds + exclusion radius)"
+}
+
+
+def to_radians(coordinates):
+    """(lon, lat) degrees -> (lat, lon) radians, the order haversine BallTrees expect"""
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    return np.radians(coordinates[:, ::-1])
+
+
+class BufferedSpatialCV(BaseCrossValidator):
+    """Wrap a splitter and drop training points within radius_km of the test fold
+
+    groups: zone of every row, used when split / get_n_splits are called
+    without groups (sklearn calls get_n_splits() with none).
+    """
+
+    def __init__(self, coordinates, radius_km=10.0, base_cv=None, groups=None):
+        self.coordinates = np.asarray(coordinates, dtype=np.float64)
+        self.radius_km = radius_km
+        self.base_cv = base_cv
+        self.groups = groups
+        self.report_ = []
+
+    def _groups(self, groups):
+        groups = self.groups if groups is None else groups
+        return None if groups is None else np.asarray(groups)
+
+    def _base(self, groups):
+        if self.base_cv is not None:
+            return self.base_cv
+        if groups is None:
+            raise ValueError("BufferedSpatialCV needs the zone groups: pass groups= to the splitter or the call")
+        return GroupKFold(n_splits=len(np.unique(groups)))
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        groups = self._groups(groups)
+        return self._base(groups).get_n_splits(X, y, groups)
+
+    def split(self, X, y=None, groups=None):
+        from sklearn.neighbors import BallTree
+
+        if len(self.coordinates) != len(X):
+            raise ValueError(f"{len(self.coordinates)} coordinates for {len(X)} samples")
+        groups = self._groups(groups)
+        points = to_radians(self.coordinates)
+        radius = self.radius_km / EARTH_RADIUS_KM
+        self.report_ = []
+
+        for fold, (train, test) in enumerate(self._base(groups).split(X, y, groups)):
+            if radius > 0:
+                tree = BallTree(points[test], metric='haversine')
+                nearest, _ = tree.query(points[train], k=1)
+                keep = nearest[:, 0] > radius
+            else:
+                keep = np.ones(len(train), dtype=bool)
+
+            self.report_.append({
+                'Fold': fold,
+                'Test Zones': ', '.join(map(str, np.unique(groups[test]))) if groups is not None else '',
+                'Test': len(test),
+                'Train (before buffer)': len(train),
+                'Removed by buffer': int((~keep).sum()),
+                'Train (after buffer)': int(keep.sum())
+            })
+            yield train[keep], test
+
+    def _iter_test_indices(self, X=None, y=None, groups=None):
+        for _, test in self.split(X, y, groups):
+            yield test
+
+    def buffer_report(self):
+        """Per-fold counts of the last split, as a dataframe"""
+        return pd.DataFrame(self.report_)
+
+
+def make_cv(rows, strategy='spatial', radius_km=10.0, n_splits=10, random_state=42):
+    """CV splitter and groups for a strategy over the given dataset rows"""
+    groups = rows[ZONE_COL].values
+    if strategy == 'stratified':
+        return StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state), None
+    if strategy == 'spatial':
+        return GroupKFold(n_splits=len(np.unique(groups))), groups
+    if strategy == 'buffered':
+        coordinates = rows[['LONGITUDE', 'LATITUDE']].values
+        return BufferedSpatialCV(coordinates, radius_km, groups=groups), groups
+    raise ValueError(f"Unknown CV strategy '{strategy}'. Choose from {list(CV_STRATEGIES)}")
+
+
+# ==================== REPORT ====================
+def buffer_sweep(rows, radii=(0, 5, 10, 25, 50)):
+    """Training points removed per radius, summed over the zone folds"""
+    summary = []
+    for radius in radii:
+        cv = BufferedSpatialCV(rows[['LONGITUDE', 'LATITUDE']].values, radius)
+        for _ in cv.split(rows, groups=rows[ZONE_COL].values):
+            pass
+        report = cv.buffer_report()
+        summary.append({
+            'Radius (km)': radius,
+            'Removed (total)': int(report['Removed by buffer'].sum()),
+            'Removed (max fold)': int(report['Removed by buffer'].max()),
+            'Mean train size': report['Train (after buffer)'].mean()
+        })
+    return pd.DataFrame(summary)
+
+
+def main(argv=None):
+    """Print how many training points each buffer radius removes"""
+    from .dataset import load_dataset
+
+    parser = argparse.ArgumentParser(description="Buffered spatial CV exclusion report")
+    parser.add_argument('--radii', type=float, nargs='+', default=[0, 5, 10, 25, 50])
+    args = parser.parse_args(argv)
+
+    df = load_dataset()
+    print("🧭 Buffered spatial CV: training points excluded per radius")
+    print(buffer_sweep(df, args.radii).round(1).to_string(index=False))
+
+    cv = BufferedSpatialCV(df[['LONGITUDE', 'LATITUDE']].values, args.radii[-1])
+    for _ in cv.split(df, groups=df[ZONE_COL].values):
+        pass
+    print(f"\n📋 Per-fold detail at {args.radii[-1]:g} km")
+    print(cv.buffer_report().to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
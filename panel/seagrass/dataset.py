@@ -0,0 +1,190 @@
+"""
+Dataset & Feature Schema - Mediterranean Seagrass Intelligence Panel
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / 'data'
+MERGED_FILE = 'pres_abs_merge_def.csv'
+
+BINARY_TARGET = 'Presence'
+FAMILY_TARGET = 'BIO_FAMILY'
+ZONE_COL = 'GEOGRAPHIC_ZONE'
+N_ZONES = 8
+
+# Non-feature columns (same exclusion list as the EDA notebook)
+EXCLUDE_COLS = [
+    'ID',
+    'BIO_CLASS',
+    'BIO_FAMILY',
+    'Presence',
+    'Substrate',
+    'LONGITUDE',
+    'LATITUDE'
+]
+
+STATIC_COLS = [
+    'Med_bathym',
+    'Distance_to_Coast',
+    'Distance_to_Major_River',
+    'Distance_to_Complete_River',
+    'Distance_to_Major_Cities',
+    'Distance_to_Complete_Cities',
+    'Distance_to_Port'
+]
+
+# Variable family -> name tokens (surface/_maxDepth, monthly/seasonal/annual, min/max)
+VARIABLE_FAMILIES = {
+    'Temperature': ('VOTEMPER', 'Temp_'),
+    'Salinity': ('VOSALINE', 'Vosa_'),
+    'Chlorophyll-α': ('CHL',),
+    'Nitrate': ('NIT',),
+    'Phosphate': ('PHO',),
+    'Water Clarity (Secchi)': ('ZSD',),
+    'Wave Height': ('VHM0',),
+    'Distance Metrics': ('Distance',),
+    'Bathymetry': ('Med_bathym',),
+    'Substrate Type': ('Substrate',),
+    'Geographic Zone': ('GEOGRAPHIC_ZONE',),
+}
+
+
+# ==================== CATEGORIZATION ====================
+def categorize_bio_class(bio_class):
+    """Aggregate a BIO_CLASS label into its seagrass family (or Absence)"""
+    bio_class_lower = str(bio_class).lower()
+
+    if 'absence' in bio_class_lower:
+        return 'Absence'
+    elif 'zostera' in bio_class_lower:
+        return 'Zostera'
+    elif 'ruppia' in bio_class_lower:
+        return 'Ruppia'
+    elif 'halophila' in bio_class_lower:
+        return 'Halophila'
+    elif 'cymodocea' in bio_class_lower:
+        return 'Cymodocea'
+    elif 'posidonia' in bio_class_lower:
+        return 'Posidonia'
+    else:
+        return 'Unknown'
+
+
+def categorize_feature(feature_name):
+    """Return the variable family a predictor column belongs to"""
+    for family, tokens in VARIABLE_FAMILIES.items():
+        if any(token in feature_name for token in tokens):
+            return family
+    return 'Other'
+
+
+# ==================== DATA LOADING ====================
+def load_raw(data_dir=DATA_DIR):
+    """Read the presence and pseudo-absence TSV files"""
+    data_dir = Path(data_dir)
+    df_presence = pd.read_csv(data_dir / 'presence.txt', sep='\t')
+    df_absence = pd.read_csv(data_dir / 'absence.txt', sep='\t')
+    return df_presence, df_absence
+
+
+def build_merged_dataset(df_presence, df_absence, zoning=None):
+    """Reproduce the preprocessing notebook: merge, zones, targets and substrate dummies"""
+    from .zoning import fit_zoning
+
+    df_merge = pd.concat([df_presence, df_absence], ignore_index=True)
+
+    # Persisted centroids keep zone IDs stable; fit from scratch only without them
+    zoning = zoning or fit_zoning(df_merge[['LONGITUDE', 'LATITUDE']].values)
+
+    derived = pd.DataFrame({
+        ZONE_COL: zoning.assign_rows(df_merge),
+        FAMILY_TARGET: df_merge['BIO_CLASS'].apply(categorize_bio_class),
+        BINARY_TARGET: np.where(df_merge['BIO_CLASS'] == 'absence', False, True)
+    }, index=df_merge.index)
+
+    substrate_dummies = pd.get_dummies(df_merge['Substrate'], prefix='Substrate', drop_first=True)
+    return pd.concat([df_merge, derived, substrate_dummies], axis=1)
+
+
+def load_dataset(data_dir=DATA_DIR):
+    """Load the merged dataset, rebuilding it from the raw TSVs when the CSV is missing"""
+    merged_path = Path(data_dir) / MERGED_FILE
+    if merged_path.exists():
+        return pd.read_csv(merged_path)
+
+    from .zoning import get_zoning
+
+    df_presence, df_absence = load_raw(data_dir)
+    coords = pd.concat([df_presence, df_absence])[['LONGITUDE', 'LATITUDE']].values
+    return build_merged_dataset(df_presence, df_absence, get_zoning(data_dir, coords))
+
+
+# ==================== FEATURE SCHEMA ====================
+def predictor_columns(df):
+    """Predictor columns in dataset order"""
+    return [col for col in df.columns if col not in EXCLUDE_COLS]
+
+
+def environmental_columns(df):
+    """Environmental variables as collected: predictors without zones and Substrate dummies, plus Substrate"""
+    columns = [col for col in predictor_columns(df) if col != ZONE_COL and not col.startswith('Substrate_')]
+    return columns + (['Substrate'] if 'Substrate' in df.columns else [])
+
+
+def feature_matrix(df, columns=None):
+    """Float feature matrix for the given (or all) predictor columns"""
+    columns = predictor_columns(df) if columns is None else list(columns)
+    return df[columns].astype(np.float64)
+
+
+def prepare_features(rows, columns):
+    """Align raw rows to a model's feature columns, deriving Substrate dummies and zones when needed"""
+    columns = list(columns)
+    missing = [col for col in columns if col not in rows.columns]
+
+    if ZONE_COL in missing and {'LONGITUDE', 'LATITUDE'} <= set(rows.columns):
+        from .zoning import get_zoning
+
+        rows = rows.assign(**{ZONE_COL: get_zoning().assign_rows(rows)})
+        missing.remove(ZONE_COL)
+
+    dummy_cols = [col for col in missing if col.startswith('Substrate_')]
+    if dummy_cols and 'Substrate' in rows.columns:
+        substrate = rows['Substrate'].astype(str).values
+        dummies = pd.DataFrame(
+            {col: substrate == col[len('Substrate_'):] for col in dummy_cols},
+            index=rows.index
+        )
+        rows = pd.concat([rows, dummies], axis=1)
+        missing = [col for col in missing if col not in dummies.columns]
+
+    if missing:
+        raise ValueError(f"Missing {len(missing)} feature columns, e.g. {missing[:5]}")
+    return rows[columns].astype(np.float64)
+
+
+def data_hash(df):
+    """Short content hash of a dataframe (values and column names)"""
+    digest = hashlib.sha256()
+    digest.update('|'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+# ==================== SUMMARY ====================
+def dataset_summary(df):
+    """Headline counts of the dataset (pages, seagrass.build stats)"""
+    presence = df[BINARY_TARGET].astype(bool)
+    return {
+        'observations': len(df),
+        'predictors': len(environmental_columns(df)),
+        'presences': int(presence.sum()),
+        'absences': int((~presence).sum()),
+        'zones': int(df[ZONE_COL].nunique()),
+        'families': {family: int(n) for family, n in df.loc[presence, FAMILY_TARGET].value_counts().items()},
+        'data_hash': data_hash(df)
+    }
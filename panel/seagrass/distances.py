@@ -0,0 +1,274 @@
+"""
+Distance Predictors - Mediterranean Seagrass Intelligence Panel
+
+Recomputes the static ``Distance_to_*`` columns for arbitrary points from
+local geometry files (coastline, rivers, cities, ports). The shipped
+columns are planar distances in decimal degrees (lon/lat), and these are
+computed the same way.
+
+Lines and polygon boundaries are densified to vertices no further apart
+than ``spacing`` degrees and loaded into a cKDTree, together with the
+segment each vertex belongs to. A query takes the k nearest vertices and
+computes the exact point-to-segment distance for their segments. The
+result is the true distance to the geometry whenever the nearest segment
+owns one of those vertices, and is never off by more than spacing / 2.
+Query points are processed in chunks on a process pool; each worker
+receives the trees once.
+
+Expected layout of the geometry folder (GeoJSON; Shapefile / GeoPackage
+also work when geopandas is installed):
+
+    geometry/
+    ├─ coastline.geojson          Distance_to_Coast
+    ├─ major_rivers.geojson       Distance_to_Major_River
+    ├─ rivers.geojson             Distance_to_Complete_River
+    ├─ major_cities.geojson       Distance_to_Major_Cities
+    ├─ cities.geojson             Distance_to_Complete_Cities
+    └─ ports.geojson              Distance_to_Port
+
+Usage (from the panel folder):
+    python -m seagrass.distances points.parquet distances.parquet --geometry-dir ../data/geometry
+"""
+
+import argparse
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DISTANCE_LAYERS = {
+    'Distance_to_Coast': 'coastline',
+    'Distance_to_Major_River': 'major_rivers',
+    'Distance_to_Complete_River': 'rivers',
+    'Distance_to_Major_Cities': 'major_cities',
+    'Distance_to_Complete_Cities': 'cities',
+    'Distance_to_Port': 'ports'
+}
+GEOMETRY_SUFFIXES = ('.geojson', '.json', '.shp', '.gpkg')
+DEFAULT_SPACING = 0.01  # degrees (~1 km)
+
+
+# ==================== GEOMETRY READING ====================
+def _coordinate_parts(geometry):
+    """(points, lines) lists of (n, 2) arrays from a GeoJSON geometry dict"""
+    kind, coords = geometry['type'], geometry.get('coordinates')
+    if kind == 'Point':
+        return [np.atleast_2d(coords)[:, :2]], []
+    if kind == 'MultiPoint':
+        return [np.asarray(coords)[:, :2]], []
+    if kind == 'LineString':
+        return [], [np.asarray(coords)[:, :2]]
+    if kind in ('MultiLineString', 'Polygon'):
+        return [], [np.asarray(line)[:, :2] for line in coords]
+    if kind == 'MultiPolygon':
+        return [], [np.asarray(ring)[:, :2] for polygon in coords for ring in polygon]
+    if kind == 'GeometryCollection':
+        points, lines = [], []
+        for part in geometry['geometries']:
+            p, l = _coordinate_parts(part)
+            points += p
+            lines += l
+        return points, lines
+    raise ValueError(f"Unsupported geometry type '{kind}'")
+
+
+def read_geometry(path):
+    """Points and line/ring vertex arrays from a GeoJSON (or, with geopandas, any vector) file"""
+    path = Path(path)
+    if path.suffix in ('.geojson', '.json'):
+        collection = json.loads(path.read_text())
+        features = collection['features'] if collection.get('type') == 'FeatureCollection' else [collection]
+        geometries = [f['geometry'] if f.get('type') == 'Feature' else f for f in features]
+    else:
+        import geopandas as gpd
+
+        frame = gpd.read_file(path).to_crs(epsg=4326)
+        geometries = [json.loads(gpd.GeoSeries([g]).to_json())['features'][0]['geometry']
+                      for g in frame.geometry if g is not None]
+
+    points, lines = [], []
+    for geometry in geometries:
+        if geometry is None:
+            continue
+        p, l = _coordinate_parts(geometry)
+        points += p
+        lines += [line for line in l if len(line) >= 2]
+    return points, lines
+
+
+# ==================== INDEX ====================
+class GeometryIndex:
+    """Densified segments of one geometry layer with an exact nearest-distance query"""
+
+    def __init__(self, points=(), lines=(), spacing=DEFAULT_SPACING):
+        from scipy.spatial import cKDTree
+
+        starts, ends, last = [np.empty((0, 2))], [np.empty((0, 2))], [np.empty(0, dtype=bool)]
+        for p in points:
+            starts.append(np.asarray(p, dtype=np.float64))
+            ends.append(np.asarray(p, dtype=np.float64))  # a point is a zero-length segment
+            last.append(np.zeros(len(starts[-1]), dtype=bool))
+        for line in lines:
+            line = np.asarray(line, dtype=np.float64)
+            starts.append(line[:-1])
+            ends.append(line[1:])
+            last.append(np.arange(1, len(line)) == len(line) - 1)
+        self.seg_start = np.concatenate(starts)
+        self.seg_end = np.concatenate(ends)
+        if not len(self.seg_start):
+            raise ValueError("Geometry layer has no points or segments")
+
+        # Densify: vertices every <= spacing along each segment, tagged with their segment. A segment's
+        # end point is the next one's start; the last segment of a line also keeps its end point
+        lengths = np.hypot(*(self.seg_end - self.seg_start).T)
+        n_steps = np.maximum(np.ceil(lengths / spacing).astype(np.int64), 1)
+        n_vertices = n_steps + np.concatenate(last)
+        segment = np.repeat(np.arange(len(lengths)), n_vertices)
+        step = np.arange(n_vertices.sum()) - np.repeat(np.cumsum(n_vertices) - n_vertices, n_vertices)
+        fraction = step / n_steps[segment]
+        vertices = self.seg_start[segment] + fraction[:, np.newaxis] * (self.seg_end - self.seg_start)[segment]
+
+        self.vertex_segment = segment
+        self.spacing = spacing
+        self.tree = cKDTree(vertices)
+
+    @property
+    def n_vertices(self):
+        return self.tree.n
+
+    def distance(self, points, k=4):
+        """Exact planar distance (degrees) from each (lon, lat) point to the geometry"""
+        points = np.asarray(points, dtype=np.float64)
+        k = min(k, self.n_vertices)
+        _, nearest = self.tree.query(points, k=k)
+        nearest = nearest.reshape(len(points), k)
+
+        a = self.seg_start[self.vertex_segment[nearest]]
+        b = self.seg_end[self.vertex_segment[nearest]]
+        ab = b - a
+        ap = points[:, np.newaxis, :] - a
+        denom = (ab ** 2).sum(axis=2)
+        t = np.where(denom > 0, (ap * ab).sum(axis=2) / np.where(denom > 0, denom, 1.0), 0.0)
+        closest = a + np.clip(t, 0.0, 1.0)[..., np.newaxis] * ab
+        return np.hypot(*(points[:, np.newaxis, :] - closest).transpose(2, 0, 1)).min(axis=1)
+
+
+def load_layers(geometry_dir, columns=None, spacing=DEFAULT_SPACING):
+    """GeometryIndex per Distance_to_* column whose layer file exists in geometry_dir"""
+    geometry_dir = Path(geometry_dir)
+    layers = {}
+    for column, stem in DISTANCE_LAYERS.items():
+        if columns is not None and column not in columns:
+            continue
+        path = next((geometry_dir / f'{stem}{suffix}' for suffix in GEOMETRY_SUFFIXES
+                     if (geometry_dir / f'{stem}{suffix}').exists()), None)
+        if path is not None:
+            layers[column] = GeometryIndex(*read_geometry(path), spacing=spacing)
+    if not layers:
+        raise FileNotFoundError(f"No geometry layers found in {geometry_dir} "
+                                f"(expected e.g. {list(DISTANCE_LAYERS.values())})")
+    return layers
+
+
+# ==================== BATCH COMPUTATION ====================
+def compute_distances(rows, layers):
+    """Distance_to_* columns for rows with LONGITUDE / LATITUDE"""
+    points = rows[['LONGITUDE', 'LATITUDE']].values
+    return pd.DataFrame({column: index.distance(points) for column, index in layers.items()},
+                        index=rows.index)
+
+
+_WORKER_LAYERS = {}
+
+
+def _init_worker(layers):
+    """Receive the geometry indexes once per worker process"""
+    _WORKER_LAYERS.update(layers)
+
+
+def _distances_in_worker(chunk):
+    return pd.concat([chunk, compute_distances(chunk, _WORKER_LAYERS)], axis=1)
+
+
+def distances_file(input_path, output_path, layers, chunk_size=100_000, n_workers=1, progress=None):
+    """Add (or replace) Distance_to_* columns for every row of input_path, chunk by chunk"""
+    from .scoring import ChunkWriter, iter_chunks
+
+    report = {'rows': 0, 'chunks': 0}
+    start = time.perf_counter()
+
+    def record(result):
+        writer.write(result)
+        report['rows'] += len(result)
+        report['chunks'] += 1
+        if progress is not None:
+            progress(report['chunks'], report['rows'], report['rows'] / (time.perf_counter() - start))
+
+    with ChunkWriter(output_path) as writer:
+        chunks = (chunk.drop(columns=[c for c in layers if c in chunk.columns])
+                  for chunk in iter_chunks(input_path, chunk_size))
+        if n_workers == 1:
+            for chunk in chunks:
+                record(pd.concat([chunk, compute_distances(chunk, layers)], axis=1))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(layers,)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    if len(pending) >= 2 * n_workers:
+                        record(pending.popleft().result())
+                    pending.append(pool.submit(_distances_in_worker, chunk))
+                while pending:
+                    record(pending.popleft().result())
+
+    report['seconds'] = time.perf_counter() - start
+    report['rows_per_s'] = report['rows'] / report['seconds'] if report['seconds'] else 0.0
+    return report
+
+
+def validate_against_dataset(df, layers):
+    """Mean / max absolute difference between recomputed and shipped distance columns"""
+    computed = compute_distances(df, layers)
+    rows = []
+    for column in computed.columns:
+        error = (computed[column] - df[column]).abs()
+        rows.append({'Column': column, 'MAE (deg)': error.mean(), 'Max error (deg)': error.max(),
+                     'Correlation': computed[column].corr(df[column])})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Recompute Distance_to_* predictors from geometry files")
+    parser.add_argument('input', nargs='?', help="Points file (.parquet, .csv, .tsv) with LONGITUDE/LATITUDE")
+    parser.add_argument('output', nargs='?', help="Output file (.parquet or .csv)")
+    parser.add_argument('--geometry-dir', required=True)
+    parser.add_argument('--spacing', type=float, default=DEFAULT_SPACING, help="Densification step (degrees)")
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    layers = load_layers(args.geometry_dir, spacing=args.spacing)
+    print(f"🗺️ Indexed {len(layers)} layers "
+          f"({sum(index.n_vertices for index in layers.values()):,} vertices) in {time.perf_counter() - start:.1f}s")
+
+    if args.input is None:
+        from .dataset import load_dataset
+
+        print(validate_against_dataset(load_dataset(), layers).round(4).to_string(index=False))
+        return
+
+    def progress(chunks, rows, rate):
+        print(f"   • chunk {chunks:>5}: {rows:>12,} rows ({rate:,.0f} rows/s)")
+
+    report = distances_file(args.input, args.output, layers, args.chunk_size, args.workers, progress)
+    print(f"✅ {report['rows']:,} rows in {report['seconds']:.1f}s ({report['rows_per_s']:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Model Definitions - Mediterranean Seagrass Intelligence Panel
+"""
+
+from .dataset import BINARY_TARGET, FAMILY_TARGET, feature_matrix, predictor_columns
+
+MODEL_NAMES = {
+    'rf': 'Random Forest',
+    'et': 'Extra Trees',
+    'dt': 'Decision Tree',
+    'knn': 'K Neighbors',
+    'svm': 'SVM - Linear',
+    'lda': 'LDA',
+    'ridge': 'Ridge Classifier',
+    'lr': 'Logistic Regression',
+    'hgb': 'Hist Gradient Boosting'
+}
+TREE_MODELS = ('rf', 'et', 'dt')
+# Models that cannot take NaN or the 1e38 NetCDF fill values; make_model wraps them in mask + mean imputation
+IMPUTED_MODELS = ('lr', 'ridge', 'lda', 'svm', 'knn')
+
+# The seven estimators of the notebook's PyCaret comparison, and where PyCaret's defaults differ from ours
+PYCARET_MODELS = ('lr', 'ridge', 'lda', 'svm', 'knn', 'dt', 'rf')
+PYCARET_OVERRIDES = {'rf': {'class_weight': None}, 'et': {'class_weight': None}}
+
+TASKS = ('binary', 'family')
+
+
+def mask_fill_values(X):
+    """Leaked NetCDF fill values (|x| > 1e30) -> NaN, so the imputer that follows replaces them"""
+    import numpy as np
+
+    from .temporal import FILL_VALUE_LIMIT
+
+    X = np.asarray(X, dtype=np.float64)
+    return np.where(np.abs(X) > FILL_VALUE_LIMIT, np.nan, X)
+
+
+def make_model(model_id, random_state=42, n_jobs=-1):
+    """Build an unfitted model that accepts raw task_data features (fill values masked and imputed where needed)"""
+    model = make_estimator(model_id, random_state=random_state, n_jobs=n_jobs)
+    if model_id not in IMPUTED_MODELS:
+        return model
+
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer
+
+    return Pipeline([
+        ('fill_values', FunctionTransformer(mask_fill_values, feature_names_out='one-to-one')),
+        ('numerical_imputer', SimpleImputer(strategy='mean')),
+        ('model', model)
+    ])
+
+
+def final_estimator(model):
+    """The estimator at the end of a make_model pipeline (the model itself otherwise)"""
+    return model.steps[-1][1] if hasattr(model, 'steps') else model
+
+
+def make_estimator(model_id, random_state=42, n_jobs=-1):
+    """Build a bare unfitted estimator with the EDA notebook's parameters (PyCaret defaults for the linear / kNN models)"""
+    if model_id in ('rf', 'et'):
+        from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    elif model_id == 'dt':
+        from sklearn.tree import DecisionTreeClassifier
+
+    if model_id == 'rf':
+        return RandomForestClassifier(
+            n_estimators=100,
+            max_depth=None,
+            min_samples_split=2,
+            min_samples_leaf=1,
+            random_state=random_state,
+            n_jobs=n_jobs,
+            class_weight='balanced'
+        )
+    if model_id == 'et':
+        return ExtraTreesClassifier(
+            n_estimators=100,
+            random_state=random_state,
+            n_jobs=n_jobs,
+            class_weight='balanced'
+        )
+    if model_id == 'dt':
+        return DecisionTreeClassifier(random_state=random_state)
+    if model_id == 'lr':
+        from sklearn.linear_model import LogisticRegression
+
+        return LogisticRegression(max_iter=1000, random_state=random_state)
+    if model_id == 'ridge':
+        from sklearn.linear_model import RidgeClassifier
+
+        return RidgeClassifier(random_state=random_state)
+    if model_id == 'lda':
+        from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+
+        return LinearDiscriminantAnalysis()
+    if model_id == 'svm':
+        from sklearn.linear_model import SGDClassifier
+
+        # PyCaret's "SVM - Linear Kernel" is a hinge-loss SGD classifier
+        return SGDClassifier(loss='hinge', eta0=0.001, tol=0.001, random_state=random_state, n_jobs=n_jobs)
+    if model_id == 'knn':
+        from sklearn.neighbors import KNeighborsClassifier
+
+        return KNeighborsClassifier(n_jobs=n_jobs)
+    if model_id == 'hgb':
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        from .boosting import BOOSTING_PARAMS
+
+        # Raw features; seagrass.boosting fits it on cached bins with a native categorical Substrate
+        return HistGradientBoostingClassifier(random_state=random_state, **BOOSTING_PARAMS)
+    raise ValueError(f"Unknown model id '{model_id}'. Choose from {list(MODEL_NAMES)}")
+
+
+def task_data(df, task='binary', columns=None):
+    """Rows, feature matrix and target for a modelling task"""
+    if task == 'binary':
+        rows = df
+        y = df[BINARY_TARGET].astype(bool)
+    elif task == 'family':
+        rows = df[df[BINARY_TARGET] == True]
+        y = rows[FAMILY_TARGET]
+    else:
+        raise ValueError(f"Unknown task '{task}'. Choose from {list(TASKS)}")
+
+    columns = predictor_columns(df) if columns is None else list(columns)
+    return rows, feature_matrix(rows, columns), y
+
+
+def fit_model(df, model_id='rf', task='binary', columns=None, **kwargs):
+    """Fit a model on the full dataset for a task and return it"""
+    _, X, y = task_data(df, task, columns)
+    model = make_model(model_id, **kwargs)
+    model.fit(X, y)
+    return model
@@ -0,0 +1,397 @@
+"""
+Out-of-Fold Predictions - Mediterranean Seagrass Intelligence Panel
+
+Every recorded CV run can persist the out-of-fold scores it produced. One
+Parquet file per run is written to ``data/oof/<run_id>.parquet`` and
+registered as the run's ``oof`` artifact in the run store. The columns are:
+
+    ID, fold (int8), zone (int8), model_id (category), y_true,
+    score                        binary: P(presence) (float32) or decision value
+    p_<family> ...               family: one score column per class
+
+Metrics are then computed from the stored scores, without retraining:
+
+- binary curves sort the scores once and take cumulative sums of positives
+  and negatives. That gives TP / FP at every distinct threshold, and ROC,
+  PR, AUC and the confusion matrix at any threshold follow from it
+  (``searchsorted`` instead of one pass per threshold). The threshold
+  explorer looks rows up in that curve, with a cost-weighted optimum
+  (``cost_optimum``);
+- per-zone metrics use ``bincount`` over zone codes (zone x true x
+  predicted for families), and per-zone AUC uses the rank-sum formula on
+  ranks computed within each zone in one lexsort;
+- multi-class confusion matrices are one ``bincount`` over true x predicted.
+
+Usage (from the panel folder):
+    python -m seagrass.oof 12            # metrics of run 12 from its stored predictions
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dataset import ZONE_COL
+
+OOF_DIR = 'oof'
+SCORE_COL = 'score'
+CLASS_PREFIX = 'p_'
+# Default decision threshold per kind of stored score. Threshold metrics predict presence when
+# score > threshold, like the estimators' predict (argmax leaves p = 0.5 negative; decision value > 0)
+DEFAULT_THRESHOLDS = {'probability': 0.5, 'decision': 0.0}
+
+
+# ==================== FRAMES & FILES ====================
+def prediction_scores(model, X, classes=None):
+    """Positive-class probability (binary) or class-score matrix, with its kind
+
+    classes: the task's full class list. A fold model trained without some
+    classes (e.g. a family absent from a spatial fold) gets its columns placed
+    under its own classes_, and 0 (probabilities) or -inf (decision values)
+    for the classes it never saw.
+    """
+    if hasattr(model, 'predict_proba'):
+        scores, kind = model.predict_proba(X), 'probability'
+    else:
+        scores, kind = model.decision_function(X), 'decision'
+    if classes is None or len(classes) <= 2:
+        if len(model.classes_) == 2:
+            scores = scores[:, 1] if scores.ndim == 2 else scores
+        return scores, kind
+
+    if scores.ndim == 1:  # two-class fold model: the decision value scores classes_[1]
+        scores = np.column_stack([-scores, scores])
+    columns = pd.Index(classes).get_indexer(model.classes_)
+    if (columns < 0).any():
+        raise ValueError(f"Model classes {list(model.classes_)} are not all in {list(classes)}")
+    aligned = np.full((len(scores), len(classes)), 0.0 if kind == 'probability' else -np.inf)
+    aligned[:, columns] = scores
+    return aligned, kind
+
+
+def oof_frame(rows, y, fold_scores, model_id, classes, kind='probability'):
+    """Out-of-fold frame from (fold, test positions, scores) triples over the given rows
+
+    classes: the task's full class list; multi-class scores must have one
+    column per class in that order (prediction_scores(..., classes) aligns them).
+    Probabilities are stored as float32; decision values keep float64, as
+    unscaled inputs can push them past the float32 range.
+    """
+    dtype = np.float32 if kind == 'probability' else np.float64
+    parts = []
+    for fold, test, scores in fold_scores:
+        part = pd.DataFrame({
+            'ID': rows['ID'].values[test],
+            'fold': np.int8(fold),
+            'zone': rows[ZONE_COL].values[test].astype(np.int8),
+            'y_true': np.asarray(y)[test]
+        })
+        scores = np.asarray(scores, dtype=dtype)
+        if scores.ndim == 1:
+            part[SCORE_COL] = scores
+        else:
+            if scores.shape[1] != len(classes):
+                raise ValueError(f"Fold {fold} has {scores.shape[1]} score columns for {len(classes)} classes")
+            for i, label in enumerate(classes):
+                part[f'{CLASS_PREFIX}{label}'] = scores[:, i]
+        parts.append(part)
+    frame = pd.concat(parts, ignore_index=True)
+    frame.insert(3, 'model_id', pd.Categorical([model_id] * len(frame)))
+    return frame.sort_values('ID', kind='stable').reset_index(drop=True)
+
+
+def save_oof(frame, run_id, store=None, oof_dir=None):
+    """Write a run's out-of-fold frame as Parquet and register it with the run"""
+    from .runs import get_run_store
+
+    store = store if store is not None else get_run_store()
+    oof_dir = Path(oof_dir) if oof_dir is not None else store.path.parent / OOF_DIR
+    oof_dir.mkdir(parents=True, exist_ok=True)
+    path = oof_dir / f'{run_id}.parquet'
+    frame.to_parquet(path, index=False)
+    store.add_artifact(run_id, 'oof', path)
+    return path
+
+
+def load_oof(run_ids, store=None):
+    """Out-of-fold frames of one or more runs (with a run_id column); runs without one are skipped"""
+    from .runs import get_run_store
+
+    store = store if store is not None else get_run_store()
+    frames = []
+    for run_id in np.atleast_1d(run_ids):
+        path = store.artifacts(int(run_id)).get('oof')
+        if path is not None and Path(path).exists():
+            frames.append(pd.read_parquet(path).assign(run_id=int(run_id)))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def class_columns(frame):
+    """Per-class score columns of a family OOF frame"""
+    return [col for col in frame.columns if col.startswith(CLASS_PREFIX)]
+
+
+# ==================== BINARY METRICS ====================
+def binary_counts(y_true, score):
+    """Distinct thresholds (descending) with cumulative TP / FP at score >= threshold"""
+    y_true = np.asarray(y_true, dtype=bool)
+    score = np.asarray(score)
+    score = score if np.issubdtype(score.dtype, np.floating) else score.astype(np.float64)
+    order = np.argsort(-score, kind='mergesort')
+    score, y_true = score[order], y_true[order]
+
+    last = np.r_[np.flatnonzero(np.diff(score)), len(score) - 1]  # last index of each distinct score
+    tp = np.cumsum(y_true)[last]
+    fp = (last + 1) - tp
+    return score[last], tp, fp
+
+
+def roc_curve(y_true, score):
+    """(fpr, tpr, thresholds), starting at (0, 0)"""
+    thresholds, tp, fp = binary_counts(y_true, score)
+    tp, fp = np.r_[0, tp], np.r_[0, fp]
+    return fp / max(fp[-1], 1), tp / max(tp[-1], 1), np.r_[np.inf, thresholds]
+
+
+def pr_curve(y_true, score):
+    """(precision, recall, thresholds) at every distinct threshold"""
+    thresholds, tp, fp = binary_counts(y_true, score)
+    return tp / (tp + fp), tp / max(tp[-1], 1), thresholds
+
+
+def roc_auc(y_true, score):
+    """Area under the ROC curve (trapezoidal, ties handled like sklearn)"""
+    fpr, tpr, _ = roc_curve(y_true, score)
+    return float(np.trapezoid(tpr, fpr)) if hasattr(np, 'trapezoid') else float(np.trapz(tpr, fpr))
+
+
+def average_precision(y_true, score):
+    """Step-wise area under the PR curve (sklearn's definition)"""
+    precision, recall, _ = pr_curve(y_true, score)
+    return float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+
+
+def confusion_at(y_true, score, thresholds):
+    """TP, FP, FN, TN arrays for each threshold (prediction: score > threshold, as in predict)"""
+    distinct, tp, fp = binary_counts(y_true, score)
+    # Compare in the scores' precision, so a 0.7 threshold matches float32 scores stored as 0.7
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=distinct.dtype))
+    # Number of distinct scores > each threshold (distinct is descending)
+    n = np.searchsorted(-distinct, -thresholds, side='left')
+    tp_at = np.where(n > 0, tp[np.maximum(n - 1, 0)], 0)
+    fp_at = np.where(n > 0, fp[np.maximum(n - 1, 0)], 0)
+    positives, negatives = tp[-1], fp[-1]
+    return tp_at, fp_at, positives - tp_at, negatives - fp_at
+
+
+def _metrics_frame(thresholds, tp, fp, fn, tn):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = tp / np.maximum(tp + fn, 1)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return pd.DataFrame({
+        'Threshold': thresholds,
+        'TP': tp, 'FP': fp, 'FN': fn, 'TN': tn,
+        'Accuracy': (tp + tn) / (tp + fp + fn + tn),
+        'Precision': precision,
+        'Recall': recall,
+        'Specificity': tn / np.maximum(tn + fp, 1),
+        'F1': f1
+    })
+
+
+def threshold_metrics(y_true, score, thresholds):
+    """Accuracy, precision, recall, specificity and F1 at each threshold (score > threshold), as a dataframe"""
+    tp, fp, fn, tn = confusion_at(y_true, score, thresholds)
+    return _metrics_frame(np.atleast_1d(thresholds), tp, fp, fn, tn)
+
+
+def threshold_curve(y_true, score):
+    """Metrics at every distinct threshold (descending) from one sort and cumulative sum
+
+    Presence is predicted when score > threshold. Row i predicts presence for
+    the i highest distinct scores, and its Threshold is distinct score i (the
+    first row, at the highest score, predicts no presence at all; the last,
+    at -inf, predicts presence everywhere). Any threshold from distinct score
+    i up to score i - 1 gives the metrics of row i (see curve_index).
+    """
+    thresholds, tp, fp = binary_counts(y_true, score)
+    thresholds, tp, fp = np.r_[thresholds, -np.inf], np.r_[0, tp], np.r_[0, fp]
+    return _metrics_frame(thresholds, tp, fp, tp[-1] - tp, fp[-1] - fp)
+
+
+def curve_index(curve, threshold):
+    """Row of a threshold_curve holding the metrics at threshold (a binary search, no recount)"""
+    thresholds = curve['Threshold'].to_numpy()
+    threshold = thresholds.dtype.type(threshold)
+    # Number of distinct scores > threshold
+    return int(np.searchsorted(-thresholds[:-1], -threshold, side='left'))
+
+
+def cost_optimum(curve, fn_cost=1.0, fp_cost=1.0):
+    """Row index of the threshold minimizing fn_cost * FN + fp_cost * FP, and that cost"""
+    cost = fn_cost * curve['FN'].to_numpy() + fp_cost * curve['FP'].to_numpy()
+    best = int(np.argmin(cost))
+    return best, float(cost[best])
+
+
+def zone_metrics(frame, threshold=0.5):
+    """Per-zone counts, accuracy, recall, precision, F1 and AUC of a binary OOF frame (score > threshold)"""
+    zones, codes = np.unique(frame['zone'].values, return_inverse=True)
+    y_true = frame['y_true'].values.astype(bool)
+    score = frame[SCORE_COL].values
+    predicted = score > score.dtype.type(threshold)
+    k = len(zones)
+
+    def count(mask):
+        return np.bincount(codes, weights=mask, minlength=k)
+
+    n, positives = count(np.ones(len(frame))), count(y_true)
+    tp, fp = count(predicted & y_true), count(predicted & ~y_true)
+    tn = n - positives - fp
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = tp / (tp + fp)
+        recall = tp / positives
+        table = pd.DataFrame({
+            'Zone': zones,
+            'Stations': n.astype(int),
+            'Presences': positives.astype(int),
+            'Accuracy': (tp + tn) / n,
+            'Precision': precision,
+            'Recall': recall,
+            'F1': 2 * precision * recall / (precision + recall),
+            'ROC_AUC': grouped_auc(codes, k, y_true, score)
+        })
+    return table
+
+
+def grouped_auc(codes, k, y_true, score):
+    """ROC AUC per group code (0..k-1) from the rank-sum statistic; NaN for one-class groups
+
+    Ranks are taken within each group in one lexsort, ties get their mean rank.
+    """
+    y_true = np.asarray(y_true, dtype=bool)
+    order = np.lexsort((score, codes))
+    sorted_codes, sorted_score = codes[order], score[order]
+    new_value = np.r_[True, (np.diff(sorted_score) != 0) | (np.diff(sorted_codes) != 0)]
+    run_id = np.cumsum(new_value) - 1
+    run_start = np.flatnonzero(new_value)
+    run_end = np.r_[run_start[1:], len(order)]
+    group_start = np.searchsorted(sorted_codes, np.arange(k))
+    mean_rank = (run_start + run_end + 1) / 2 - group_start[sorted_codes[run_start]]
+    ranks = np.empty(len(order))
+    ranks[order] = mean_rank[run_id]
+
+    n = np.bincount(codes, minlength=k)
+    positives = np.bincount(codes, weights=y_true, minlength=k)
+    negatives = n - positives
+    rank_sum = np.bincount(codes, weights=np.where(y_true, ranks, 0.0), minlength=k)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        auc = (rank_sum - positives * (positives + 1) / 2) / (positives * negatives)
+    return np.where((positives > 0) & (negatives > 0), auc, np.nan)
+
+
+# ==================== MULTI-CLASS METRICS ====================
+def multiclass_confusion(frame):
+    """Confusion matrix (rows: true, columns: predicted) of a family OOF frame"""
+    columns = class_columns(frame)
+    labels = np.array([col[len(CLASS_PREFIX):] for col in columns], dtype=object)
+    predicted = frame[columns].to_numpy().argmax(axis=1)
+    lookup = {label: i for i, label in enumerate(labels)}
+    actual = frame['y_true'].map(lookup).to_numpy()
+    counts = np.bincount(actual * len(labels) + predicted, minlength=len(labels) ** 2)
+    return pd.DataFrame(counts.reshape(len(labels), len(labels)), index=labels, columns=labels)
+
+
+def multiclass_zone_metrics(frame):
+    """Per-zone accuracy, macro F1 and macro one-vs-rest AUC of a family OOF frame
+
+    One bincount over zone x true x predicted gives every zone's confusion
+    matrix; per-class AUCs reuse grouped_auc on each class score column.
+    """
+    columns = class_columns(frame)
+    labels = [col[len(CLASS_PREFIX):] for col in columns]
+    c = len(labels)
+    zones, codes = np.unique(frame['zone'].values, return_inverse=True)
+    k = len(zones)
+    scores = frame[columns].to_numpy()
+    predicted = scores.argmax(axis=1)
+    actual = frame['y_true'].map({label: i for i, label in enumerate(labels)}).to_numpy()
+
+    matrix = np.bincount((codes * c + actual) * c + predicted, minlength=k * c * c).reshape(k, c, c)
+    support, predicted_count, correct = matrix.sum(axis=2), matrix.sum(axis=1), np.einsum('zii->zi', matrix)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.where(predicted_count > 0, correct / predicted_count, 0.0)
+        recall = np.where(support > 0, correct / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    macro_f1 = np.where(support > 0, f1, 0.0).sum(axis=1) / (support > 0).sum(axis=1)
+
+    # Macro one-vs-rest AUC over the classes that are neither absent nor alone in the zone
+    auc = np.column_stack([grouped_auc(codes, k, actual == i, scores[:, i]) for i in range(c)])
+    defined = ~np.isnan(auc)
+    with np.errstate(invalid='ignore'):
+        macro_auc = np.where(defined, auc, 0.0).sum(axis=1) / defined.sum(axis=1)
+    n = support.sum(axis=1)
+    return pd.DataFrame({
+        'Zone': zones,
+        'Stations': n.astype(int),
+        'Families': (support > 0).sum(axis=1),
+        'Accuracy': correct.sum(axis=1) / n,
+        'Macro_F1': macro_f1,
+        'ROC_AUC': macro_auc
+    })
+
+
+def zone_breakdown(frame, threshold=0.5):
+    """Per-zone metrics of a binary or family OOF frame"""
+    return zone_metrics(frame, threshold) if SCORE_COL in frame.columns else multiclass_zone_metrics(frame)
+
+
+def multiclass_metrics(frame):
+    """Accuracy, macro / weighted F1 and per-class recall from the confusion matrix"""
+    matrix = multiclass_confusion(frame).to_numpy().astype(np.float64)
+    support, predicted, correct = matrix.sum(axis=1), matrix.sum(axis=0), np.diag(matrix)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.where(predicted > 0, correct / predicted, 0.0)
+        recall = np.where(support > 0, correct / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return {
+        'Accuracy': correct.sum() / matrix.sum(),
+        'Macro_F1': f1[support > 0].mean(),
+        'Weighted_F1': (f1 * support).sum() / support.sum()
+    }
+
+
+def main(argv=None):
+    """Print metrics of a run recomputed from its stored out-of-fold predictions"""
+    from .runs import get_run_store
+
+    parser = argparse.ArgumentParser(description="Metrics from stored out-of-fold predictions")
+    parser.add_argument('run_id', type=int)
+    parser.add_argument('--threshold', type=float, help="Default: 0.5 for probabilities, 0 for decision values")
+    args = parser.parse_args(argv)
+
+    store = get_run_store()
+    frame = load_oof(args.run_id, store)
+    if frame.empty:
+        raise ValueError(f"Run {args.run_id} has no stored out-of-fold predictions")
+    if args.threshold is None:
+        args.threshold = DEFAULT_THRESHOLDS[store.config(args.run_id).get('oof_score') or 'probability']
+
+    print(f"🗃️ Run {args.run_id}: {len(frame):,} out-of-fold predictions")
+    if SCORE_COL in frame.columns:
+        print(f"   ROC AUC {roc_auc(frame['y_true'], frame[SCORE_COL]):.4f}, "
+              f"average precision {average_precision(frame['y_true'], frame[SCORE_COL]):.4f}")
+        print(threshold_metrics(frame['y_true'], frame[SCORE_COL], [args.threshold]).round(4).to_string(index=False))
+        print(zone_metrics(frame, args.threshold).round(4).to_string(index=False))
+    else:
+        print({name: round(value, 4) for name, value in multiclass_metrics(frame).items()})
+        print(multiclass_confusion(frame).to_string())
+        print(multiclass_zone_metrics(frame).round(4).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
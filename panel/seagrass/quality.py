@@ -0,0 +1,210 @@
+"""
+Data Quality Validation - Mediterranean Seagrass Intelligence Panel
+
+One vectorized pass over the merged dataset before it is served or used
+for training:
+
+- schema drift: missing, unexpected or non-numeric columns against the raw
+  TSV schema plus the preprocessing outputs;
+- missing values and leaked NetCDF fill values (|x| > 1e30);
+- physical ranges per variable family (VARIABLE_FAMILIES);
+- ordering invariants: min*_year <= every month <= max*_year, and the
+  seasonal / annual means agree with their months (seagrass.temporal);
+- duplicate station IDs and duplicate coordinates;
+- Presence / BIO_FAMILY consistency with BIO_CLASS.
+
+Errors fail the gate; warnings are reported but let the panel start.
+
+Usage (from the panel folder):
+    python -m seagrass.quality          # exit code 1 when any error is found
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .dataset import (BINARY_TARGET, FAMILY_TARGET, ZONE_COL, categorize_bio_class,
+                      categorize_feature)
+from .temporal import FILL_VALUE_LIMIT
+
+# Plausible physical ranges per variable family (units of the shipped columns)
+FAMILY_RANGES = {
+    'Temperature': (-2.0, 40.0),
+    'Salinity': (0.0, 45.0),
+    'Chlorophyll-α': (0.0, 100.0),
+    'Nitrate': (0.0, 100.0),
+    'Phosphate': (0.0, 10.0),
+    'Water Clarity (Secchi)': (0.0, 80.0),
+    'Wave Height': (0.0, 20.0),
+    'Distance Metrics': (0.0, 45.0),
+    'Bathymetry': (-6000.0, 10.0),
+    'Geographic Zone': (0, 63)
+}
+COORD_RANGES = {'LONGITUDE': (-6.5, 37.0), 'LATITUDE': (30.0, 46.5)}
+
+
+class QualityReport:
+    """Issues found by validate_dataset, with pass/fail status"""
+
+    def __init__(self, issues, n_rows, n_columns, seconds):
+        self.issues = pd.DataFrame(issues, columns=['Check', 'Severity', 'Columns', 'Rows', 'Detail'])
+        self.n_rows = n_rows
+        self.n_columns = n_columns
+        self.seconds = seconds
+
+    @property
+    def errors(self):
+        return self.issues[self.issues['Severity'] == 'error']
+
+    @property
+    def warnings(self):
+        return self.issues[self.issues['Severity'] == 'warning']
+
+    @property
+    def passed(self):
+        return self.errors.empty
+
+    def summary(self):
+        status = '✅ passed' if self.passed else '❌ failed'
+        return (f"{status}: {len(self.errors)} errors, {len(self.warnings)} warnings "
+                f"({self.n_rows:,} rows × {self.n_columns} columns in {self.seconds * 1000:.0f} ms)")
+
+
+def expected_columns():
+    """Raw TSV columns plus the columns added by preprocessing"""
+    from .rasters import dataset_schema
+
+    schema = dataset_schema()
+    return schema[:1] + ['BIO_CLASS'] + schema[1:] + [ZONE_COL, FAMILY_TARGET, BINARY_TARGET]
+
+
+def _column_list(columns, limit=5):
+    columns = list(columns)
+    return ', '.join(columns[:limit]) + (f' (+{len(columns) - limit} more)' if len(columns) > limit else '')
+
+
+# ==================== CHECKS ====================
+def validate_dataset(df, tolerance=1e-6):
+    """Run every check and return a QualityReport"""
+    from .temporal import compute_aggregates, monthly_column, monthly_series
+
+    start = time.perf_counter()
+    issues = []
+
+    def add(check, severity, columns, rows, detail):
+        issues.append((check, severity, columns, int(rows), detail))
+
+    if df.empty:
+        add('Schema', 'error', '', 0, "Dataset is empty")
+        return QualityReport(issues, 0, df.shape[1], time.perf_counter() - start)
+
+    # ---------- schema drift ----------
+    expected = expected_columns()
+    missing = [col for col in expected if col not in df.columns]
+    unexpected = [col for col in df.columns if col not in expected and not col.startswith('Substrate_')]
+    if missing:
+        add('Schema', 'error', _column_list(missing), 0, f"{len(missing)} expected columns missing")
+    if unexpected:
+        add('Schema', 'warning', _column_list(unexpected), 0, f"{len(unexpected)} unexpected columns")
+
+    text_cols = {'BIO_CLASS', 'Substrate', FAMILY_TARGET}
+    numeric_expected = [col for col in expected if col in df.columns and col not in text_cols | {BINARY_TARGET}]
+    non_numeric = [col for col in numeric_expected if not pd.api.types.is_numeric_dtype(df[col])]
+    if non_numeric:
+        add('Schema', 'error', _column_list(non_numeric), 0, "Columns expected to be numeric are not")
+
+    # ---------- one numeric matrix for value checks ----------
+    numeric = [col for col in numeric_expected if col not in non_numeric]
+    X = df[numeric].to_numpy(dtype=np.float64)
+    names = np.array(numeric, dtype=object)
+
+    nan_mask = np.isnan(X)
+    fill_mask = np.abs(X) > FILL_VALUE_LIMIT
+    for mask, check, severity, detail in ((nan_mask, 'Missing values', 'error', "NaN values"),
+                                          (fill_mask, 'Fill values', 'warning', "NetCDF fill values (|x| > 1e30)")):
+        per_column = mask.sum(axis=0)
+        if per_column.any():
+            add(check, severity, _column_list(names[per_column > 0]), mask.any(axis=1).sum(),
+                f"{detail} in {int((per_column > 0).sum())} columns")
+
+    ranges = {**FAMILY_RANGES, **COORD_RANGES}
+    families = np.array([col if col in COORD_RANGES else categorize_feature(col) for col in numeric], dtype=object)
+    low, high = np.array([ranges.get(family, (-np.inf, np.inf)) for family in families]).T
+    with np.errstate(invalid='ignore'):
+        out_of_range = ((X < low) | (X > high)) & ~fill_mask & ~nan_mask
+    for family in np.unique(families[out_of_range.any(axis=0)]):
+        cols = families == family
+        lo, hi = ranges[family]
+        add('Physical range', 'warning', _column_list(names[cols & out_of_range.any(axis=0)]),
+            out_of_range[:, cols].any(axis=1).sum(), f"{family} outside [{lo}, {hi}]")
+
+    # ---------- ordering invariants ----------
+    series = monthly_series(df.columns)
+    if series:
+        computed = compute_aggregates(df, series)
+        shipped = [col for col in computed.columns if col in df.columns]
+        with np.errstate(invalid='ignore'):
+            diff = np.abs(computed[shipped].to_numpy() - df[shipped].to_numpy(dtype=np.float64))
+            scale = np.maximum(1.0, np.abs(computed[shipped].to_numpy()))
+            mismatch = ~(diff <= tolerance * scale)
+        if mismatch.any():
+            add('Aggregate consistency', 'warning', _column_list(np.array(shipped)[mismatch.any(axis=0)]),
+                mismatch.any(axis=1).sum(), "Seasonal/annual/min/max values disagree with their months")
+
+        monthly = np.stack([df[[monthly_column(var, year, m, suffix) for m in range(1, 13)]].to_numpy(np.float64)
+                            for var, year, suffix in series], axis=1)
+        extremes = computed.to_numpy().reshape(len(df), len(series), 7)
+        stored_max = np.stack([df[name].to_numpy(np.float64) if name in df.columns else extremes[:, i, 5]
+                               for i, name in enumerate(computed.columns[5::7])], axis=1)
+        stored_min = np.stack([df[name].to_numpy(np.float64) if name in df.columns else extremes[:, i, 6]
+                               for i, name in enumerate(computed.columns[6::7])], axis=1)
+        with np.errstate(invalid='ignore'):
+            broken = ((monthly < stored_min[..., np.newaxis] - tolerance) |
+                      (monthly > stored_max[..., np.newaxis] + tolerance))
+        if broken.any():
+            bad_series = [f'{var}_{year}{suffix}' for (var, year, suffix), bad in zip(series, broken.any(axis=(0, 2)))
+                          if bad]
+            add('Ordering', 'warning', _column_list(bad_series), broken.any(axis=(1, 2)).sum(),
+                "Monthly values outside [min*_year, max*_year]")
+
+    # ---------- duplicates ----------
+    if 'ID' in df.columns:
+        duplicated_ids = df['ID'].duplicated(keep=False)
+        if duplicated_ids.any():
+            add('Duplicates', 'error', 'ID', duplicated_ids.sum(), "Duplicate station IDs")
+    if {'LONGITUDE', 'LATITUDE'} <= set(df.columns):
+        coords = df[['LONGITUDE', 'LATITUDE']].round(6)
+        duplicated_coords = coords.duplicated(keep=False)
+        if duplicated_coords.any():
+            add('Duplicates', 'warning', 'LONGITUDE, LATITUDE', duplicated_coords.sum(),
+                f"{int(coords[duplicated_coords].drop_duplicates().shape[0])} coordinates shared by several stations")
+
+    # ---------- targets ----------
+    if 'BIO_CLASS' in df.columns:
+        if BINARY_TARGET in df.columns:
+            inconsistent = df[BINARY_TARGET].astype(bool).values == (df['BIO_CLASS'] == 'absence').values
+            if inconsistent.any():
+                add('Targets', 'error', BINARY_TARGET, inconsistent.sum(), "Presence disagrees with BIO_CLASS")
+        if FAMILY_TARGET in df.columns:
+            families_ok = df[FAMILY_TARGET].values == df['BIO_CLASS'].map(categorize_bio_class).values
+            if not families_ok.all():
+                add('Targets', 'error', FAMILY_TARGET, (~families_ok).sum(), "BIO_FAMILY disagrees with BIO_CLASS")
+
+    return QualityReport(issues, len(df), df.shape[1], time.perf_counter() - start)
+
+
+def main(argv=None):
+    """Validate the merged dataset; exit with status 1 on errors"""
+    from .dataset import load_dataset
+
+    report = validate_dataset(load_dataset())
+    print(f"🩺 Data quality {report.summary()}")
+    if not report.issues.empty:
+        print(report.issues.to_string(index=False))
+    return 0 if report.passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
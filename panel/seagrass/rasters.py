@@ -0,0 +1,360 @@
+"""
+Environmental Raster Sampler - Mediterranean Seagrass Intelligence Panel
+
+Builds the temporal predictor block (VOTEMPER, VOSALINE, CHL, NIT, ZSD,
+PHO, VHM0 by month, surface and ``_maxDepth``, plus seasonal / annual /
+min / max aggregates) and ``Med_bathym`` for arbitrary points from local
+gridded files in the Copernicus Marine layout:
+
+    rasters/
+    ├─ VOTEMPER.nc     thetao (time, depth, latitude, longitude)
+    ├─ VOSALINE.nc     so     (time, depth, latitude, longitude)
+    ├─ NIT.nc          no3    (time, depth, latitude, longitude)
+    ├─ PHO.nc          po4    (time, depth, latitude, longitude)
+    ├─ CHL.nc          CHL    (time, latitude, longitude)
+    ├─ ZSD.nc          ZSD    (time, latitude, longitude)
+    ├─ VHM0.nc         VHM0   (time, latitude, longitude)
+    └─ Med_bathym.nc   elevation (latitude, longitude)
+
+Grids must have 1-D, regularly spaced longitude / latitude axes;
+curvilinear grids (2-D nav_lon / nav_lat) are rejected rather than
+sampled at the wrong cells. Each file may also be a ``.zarr`` store.
+Files are opened lazily with xarray (optional dependency). A grid is
+read in square tiles, and only the tiles that contain query points are
+decoded. Decoded tiles (monthly
+surface and bottom fields) are kept in an LRU cache, so neighbouring
+point batches do not reread them. Daily or 3-hourly inputs are averaged
+to months when a tile is decoded. ``_maxDepth`` is the deepest valid
+level at each cell.
+
+Usage (from the panel folder):
+    python -m seagrass.rasters points.csv features.parquet --raster-dir ../data/rasters
+"""
+
+import argparse
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .temporal import aggregate_columns, compute_aggregates, monthly_column
+
+YEAR = 2015
+MONTHS = range(1, 13)
+
+# Column prefix -> (CMEMS variable name, has depth levels)
+RASTER_VARIABLES = {
+    'VOTEMPER': ('thetao', True),
+    'VOSALINE': ('so', True),
+    'CHL': ('CHL', False),
+    'NIT': ('no3', True),
+    'ZSD': ('ZSD', False),
+    'PHO': ('po4', True),
+    'VHM0': ('VHM0', False)
+}
+BATHYMETRY = ('Med_bathym', 'elevation')
+DISTANCE_FILE_ORDER = [
+    'Distance_to_Major_Cities',
+    'Distance_to_Complete_Cities',
+    'Distance_to_Port',
+    'Distance_to_Major_River',
+    'Distance_to_Complete_River',
+    'Distance_to_Coast'
+]
+
+DIM_NAMES = {
+    'lon': ('longitude', 'lon'),  # 1-D regular axes only; curvilinear x / y grids are rejected
+    'lat': ('latitude', 'lat'),
+    'depth': ('depth', 'deptht', 'lev', 'z'),
+    'time': ('time', 't')
+}
+RASTER_SUFFIXES = ('.nc', '.zarr')
+
+
+# ==================== SCHEMA ====================
+def temporal_columns(prefix, has_depth, year=YEAR):
+    """Dataset column names for one variable (monthly, then aggregates), in dataset order"""
+    columns = []
+    for suffix in ('', '_maxDepth') if has_depth else ('',):
+        columns += [monthly_column(prefix, year, month, suffix) for month in MONTHS]
+        columns += aggregate_columns([(prefix, year, suffix)])
+    return columns
+
+
+def raster_columns(year=YEAR):
+    """All raster-derived columns in dataset order"""
+    columns = []
+    for prefix, (_, has_depth) in RASTER_VARIABLES.items():
+        columns += temporal_columns(prefix, has_depth, year)
+    return columns + [BATHYMETRY[0]]
+
+
+# ==================== TILE CACHE ====================
+class TileCache:
+    """LRU cache of decoded raster tiles"""
+
+    def __init__(self, max_tiles=256):
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, load):
+        if key in self._tiles:
+            self.hits += 1
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+        self.misses += 1
+        tile = load()
+        self._tiles[key] = tile
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+
+# ==================== RASTER SOURCE ====================
+def _find_dim(array, kind):
+    for name in DIM_NAMES[kind]:
+        if name in array.dims:
+            return name
+    return None
+
+
+def open_raster(path, variable):
+    """Lazily opened DataArray from a NetCDF file or Zarr store"""
+    import xarray as xr
+
+    path = Path(path)
+    dataset = xr.open_zarr(path) if path.suffix == '.zarr' else xr.open_dataset(path)
+    if variable not in dataset:
+        raise ValueError(f"{path.name} has no variable '{variable}' (found {list(dataset.data_vars)})")
+    return dataset[variable]
+
+
+class RasterSource:
+    """Regular lon/lat grid sampled through a tile cache"""
+
+    def __init__(self, array, year=YEAR, tile_size=64, cache=None):
+        self.lon_dim, self.lat_dim = _find_dim(array, 'lon'), _find_dim(array, 'lat')
+        self.depth_dim, self.time_dim = _find_dim(array, 'depth'), _find_dim(array, 'time')
+        if self.lon_dim is None or self.lat_dim is None:
+            raise ValueError(f"Raster '{array.name}' needs 1-D longitude/latitude dimensions, got {array.dims} "
+                             f"(curvilinear grids with 2-D nav_lon / nav_lat are not supported)")
+
+        self.months = None
+        if self.time_dim is not None:
+            times = pd.DatetimeIndex(array[self.time_dim].values)
+            steps = np.flatnonzero(times.year == year)
+            if not len(steps):
+                raise ValueError(f"Raster '{array.name}' has no time steps in {year}")
+            steps = steps[np.argsort(times[steps], kind='stable')]
+            array = array.isel({self.time_dim: steps})
+            self.months = times[steps].month.values
+
+        order = [d for d in (self.time_dim, self.depth_dim, self.lat_dim, self.lon_dim) if d is not None]
+        self.array = array.transpose(*order)
+        self.lon = np.asarray(array[self.lon_dim].values, dtype=np.float64)
+        self.lat = np.asarray(array[self.lat_dim].values, dtype=np.float64)
+        for axis, values in (('longitude', self.lon), ('latitude', self.lat)):
+            step = np.diff(values)
+            if not len(step) or not np.allclose(step, step[0], rtol=1e-3, atol=0):
+                raise ValueError(f"Raster '{array.name}' {axis} axis is not regularly spaced; "
+                                 f"regrid it to a regular lon/lat grid first")
+        self.tile_size = tile_size
+        self.cache = cache or TileCache()
+        self.name = array.name
+
+    # ---------- grid geometry ----------
+    def _fractional_index(self, lon, lat):
+        fx = (lon - self.lon[0]) / (self.lon[1] - self.lon[0])
+        fy = (lat - self.lat[0]) / (self.lat[1] - self.lat[0])
+        return fx, fy
+
+    def _load_tile(self, ty, tx):
+        """Decode one tile (+1 cell overlap for bilinear) into monthly surface / bottom fields"""
+        y0, x0 = ty * self.tile_size, tx * self.tile_size
+        window = {self.lat_dim: slice(y0, y0 + self.tile_size + 1),
+                  self.lon_dim: slice(x0, x0 + self.tile_size + 1)}
+        data = np.asarray(self.array.isel(window).values, dtype=np.float64)
+
+        if self.time_dim is None:
+            data = data[np.newaxis]
+        elif len(self.months) != 12 or len(np.unique(self.months)) != 12:
+            # Sub-monthly input: average the steps of each month
+            data = np.stack([np.nanmean(data[self.months == month], axis=0) if (self.months == month).any()
+                             else np.full(data.shape[1:], np.nan) for month in MONTHS])
+
+        if self.depth_dim is None:
+            return {'surface': data}
+
+        valid = ~np.isnan(data)
+        n_levels = data.shape[1]
+        deepest = n_levels - 1 - valid[:, ::-1].argmax(axis=1)
+        bottom = np.take_along_axis(data, deepest[:, np.newaxis], axis=1)[:, 0]
+        bottom[~valid.any(axis=1)] = np.nan
+        return {'surface': data[:, 0], 'bottom': bottom}
+
+    def _gather(self, iy, ix, fields):
+        """Values at integer grid cells, grouped by tile: field -> (n, n_steps)"""
+        out = {name: np.full((len(iy), 12 if self.time_dim is not None else 1), np.nan) for name in fields}
+        inside = (iy >= 0) & (iy < len(self.lat)) & (ix >= 0) & (ix < len(self.lon))
+        tiles = np.where(inside, (iy // self.tile_size) * 1_000_000 + ix // self.tile_size, -1)
+
+        for tile_id in np.unique(tiles[inside]):
+            members = np.flatnonzero(tiles == tile_id)
+            ty, tx = divmod(int(tile_id), 1_000_000)
+            tile = self.cache.get((self.name, ty, tx), lambda: self._load_tile(ty, tx))
+            ly, lx = iy[members] - ty * self.tile_size, ix[members] - tx * self.tile_size
+            for name in fields:
+                out[name][members] = tile[name][:, ly, lx].T
+        return out
+
+    def sample(self, lon, lat, method='nearest'):
+        """Monthly surface (and bottom) values at each point: field -> (n, 12)"""
+        fields = ('surface', 'bottom') if self.depth_dim is not None else ('surface',)
+        fx, fy = self._fractional_index(np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64))
+
+        if method == 'nearest':
+            return self._gather(np.rint(fy).astype(np.int64), np.rint(fx).astype(np.int64), fields)
+        if method != 'bilinear':
+            raise ValueError(f"Unknown sampling method '{method}'. Choose 'nearest' or 'bilinear'")
+
+        x0 = np.clip(np.floor(fx), 0, len(self.lon) - 2).astype(np.int64)
+        y0 = np.clip(np.floor(fy), 0, len(self.lat) - 2).astype(np.int64)
+        wx, wy = fx - x0, fy - y0
+        outside = (wx < 0) | (wx > 1) | (wy < 0) | (wy > 1)
+
+        # The four corners share the tile of (y0, x0) thanks to the 1-cell tile overlap
+        total = {name: 0.0 for name in fields}
+        weight_sum = {name: 0.0 for name in fields}
+        corners = self._gather_corners(y0, x0, fields)
+        for (dy, dx), values in corners.items():
+            w = ((wy if dy else 1 - wy) * (wx if dx else 1 - wx))[:, np.newaxis]
+            for name in fields:
+                valid = ~np.isnan(values[name])
+                total[name] = total[name] + np.where(valid, values[name], 0.0) * w
+                weight_sum[name] = weight_sum[name] + valid * w
+
+        out = {}
+        for name in fields:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out[name] = total[name] / weight_sum[name]  # land corners are dropped and weights renormalized
+            out[name][outside] = np.nan
+        return out
+
+    def _gather_corners(self, y0, x0, fields):
+        """Values at the four corners of each bilinear cell, read from the (y0, x0) tile"""
+        corners = {(dy, dx): {name: np.full((len(y0), 12 if self.time_dim is not None else 1), np.nan)
+                              for name in fields} for dy in (0, 1) for dx in (0, 1)}
+        tiles = (y0 // self.tile_size) * 1_000_000 + x0 // self.tile_size
+        for tile_id in np.unique(tiles):
+            members = np.flatnonzero(tiles == tile_id)
+            ty, tx = divmod(int(tile_id), 1_000_000)
+            tile = self.cache.get((self.name, ty, tx), lambda: self._load_tile(ty, tx))
+            ly, lx = y0[members] - ty * self.tile_size, x0[members] - tx * self.tile_size
+            for (dy, dx), values in corners.items():
+                for name in fields:
+                    values[name][members] = tile[name][:, ly + dy, lx + dx].T
+        return corners
+
+
+# ==================== FEATURE ROWS ====================
+class RasterSampler:
+    """All raster variables found in a folder, sampled into dataset-schema rows"""
+
+    def __init__(self, raster_dir, year=YEAR, tile_size=64, max_tiles=256):
+        raster_dir = Path(raster_dir)
+        self.year = year
+        self.cache = TileCache(max_tiles)
+        self.sources = {}
+        for prefix, (variable, _) in [*RASTER_VARIABLES.items(), (BATHYMETRY[0], (BATHYMETRY[1], False))]:
+            path = next((raster_dir / f'{prefix}{suffix}' for suffix in RASTER_SUFFIXES
+                         if (raster_dir / f'{prefix}{suffix}').exists()), None)
+            if path is not None:
+                self.sources[prefix] = RasterSource(open_raster(path, variable), year, tile_size, self.cache)
+        if not self.sources:
+            raise FileNotFoundError(f"No raster files found in {raster_dir} (expected e.g. VOTEMPER.nc)")
+
+    @property
+    def columns(self):
+        """Columns this sampler can produce, in dataset order"""
+        columns = []
+        for prefix, (_, has_depth) in RASTER_VARIABLES.items():
+            if prefix in self.sources:
+                columns += temporal_columns(prefix, has_depth, self.year)
+        return columns + ([BATHYMETRY[0]] if BATHYMETRY[0] in self.sources else [])
+
+    def sample(self, rows, method='nearest'):
+        """Raster predictor columns for rows with LONGITUDE / LATITUDE"""
+        lon, lat = rows['LONGITUDE'].values, rows['LATITUDE'].values
+        monthly = {}
+        for prefix, (_, has_depth) in RASTER_VARIABLES.items():
+            if prefix not in self.sources:
+                continue
+            fields = self.sources[prefix].sample(lon, lat, method)
+            for field, suffix in (('surface', ''), ('bottom', '_maxDepth'))[:2 if has_depth else 1]:
+                for month in MONTHS:
+                    monthly[monthly_column(prefix, self.year, month, suffix)] = fields[field][:, month - 1]
+        out = pd.DataFrame(monthly, index=rows.index)
+        if monthly:
+            out = pd.concat([out, compute_aggregates(out)], axis=1)
+        if BATHYMETRY[0] in self.sources:
+            out[BATHYMETRY[0]] = self.sources[BATHYMETRY[0]].sample(lon, lat, method)['surface'][:, 0]
+        return out[self.columns]
+
+
+def dataset_schema(year=YEAR):
+    """Raw TSV columns that describe a location (everything except BIO_CLASS), in file order"""
+    from .distances import DISTANCE_LAYERS
+
+    distance_cols = sorted(DISTANCE_LAYERS, key=DISTANCE_FILE_ORDER.index)
+    return ['ID', 'LONGITUDE', 'LATITUDE', *raster_columns(year), *distance_cols, 'Substrate']
+
+
+def build_feature_rows(rows, sampler, method='nearest', distance_layers=None):
+    """Rows in the raw dataset schema for new points; columns that cannot be derived pass through"""
+    parts = [sampler.sample(rows, method)]
+    if distance_layers:
+        from .distances import compute_distances
+
+        parts.append(compute_distances(rows, distance_layers))
+    derived = pd.concat(parts, axis=1)
+    out = pd.concat([rows.drop(columns=[c for c in derived.columns if c in rows.columns]), derived], axis=1)
+    return out[[col for col in dataset_schema(sampler.year) if col in out.columns]]
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    from .scoring import ChunkWriter, iter_chunks
+
+    parser = argparse.ArgumentParser(description="Sample gridded environmental rasters at points")
+    parser.add_argument('input', help="Points file (.parquet, .csv, .tsv) with LONGITUDE/LATITUDE")
+    parser.add_argument('output', help="Output file (.parquet or .csv)")
+    parser.add_argument('--raster-dir', required=True)
+    parser.add_argument('--geometry-dir', help="Also compute Distance_to_* columns (see seagrass.distances)")
+    parser.add_argument('--method', choices=['nearest', 'bilinear'], default='nearest')
+    parser.add_argument('--year', type=int, default=YEAR)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    sampler = RasterSampler(args.raster_dir, args.year)
+    layers = None
+    if args.geometry_dir:
+        from .distances import load_layers
+
+        layers = load_layers(args.geometry_dir)
+
+    start, rows = time.perf_counter(), 0
+    with ChunkWriter(args.output) as writer:
+        for chunk in iter_chunks(args.input, args.chunk_size):
+            writer.write(build_feature_rows(chunk, sampler, args.method, layers))
+            rows += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {rows:,} rows × {len(sampler.columns)} raster columns in {elapsed:.1f}s "
+          f"(tile cache: {sampler.cache.hits:,} hits / {sampler.cache.misses:,} misses)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Correlation-Cluster Feature Reduction - Mediterranean Seagrass Intelligence Panel
+
+The 217 predictors are heavily collinear (monthly / seasonal / annual /
+min-max variants of each variable, at the surface and at ``_maxDepth``).
+Features are clustered by average linkage on the distance 1 - |Spearman rho|
+and each cluster is replaced by one representative (the member most
+correlated with the rest of its cluster) or by the first principal
+component of the standardized block.
+
+Usage (from the panel folder):
+    python -m seagrass.reduction --out reduced_features.json
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+DEFAULT_THRESHOLDS = (None, 0.98, 0.95, 0.9, 0.85, 0.8, 0.7)
+
+
+# ==================== CORRELATION CLUSTERS ====================
+def spearman_abs(X):
+    """Absolute Spearman correlation matrix from column ranks (one vectorized pass)"""
+    ranks = pd.DataFrame(np.asarray(X, dtype=np.float64)).rank(axis=0).to_numpy(copy=True)
+    ranks -= ranks.mean(axis=0)
+    norms = np.sqrt((ranks ** 2).sum(axis=0))
+    norms[norms == 0] = np.inf  # constant columns correlate with nothing
+    ranks /= norms
+    return np.abs(np.clip(ranks.T @ ranks, -1.0, 1.0))
+
+
+def correlation_clusters(corr, threshold):
+    """Cluster labels such that members are linked at |rho| >= threshold (average linkage)"""
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from scipy.spatial.distance import squareform
+
+    distance = 1.0 - corr
+    np.fill_diagonal(distance, 0.0)
+    tree = linkage(squareform(distance, checks=False), method='average')
+    return fcluster(tree, t=1.0 - threshold, criterion='distance')
+
+
+class CorrelationReducer(BaseEstimator, TransformerMixin):
+    """Keep one representative (or block PCA component) per correlation cluster"""
+
+    def __init__(self, threshold=0.9, method='representative'):
+        self.threshold = threshold
+        self.method = method
+
+    def fit(self, X, y=None):
+        if self.method not in ('representative', 'pca'):
+            raise ValueError(f"Unknown method '{self.method}'. Choose 'representative' or 'pca'")
+        X = pd.DataFrame(X)
+        self.feature_names_in_ = np.array(X.columns, dtype=object)
+        values = X.values.astype(np.float64)
+
+        corr = spearman_abs(values)
+        labels = correlation_clusters(corr, self.threshold)
+
+        self.clusters_ = []
+        for label in np.unique(labels):
+            members = np.flatnonzero(labels == label)
+            # Medoid: the member with the highest mean |rho| to its cluster
+            rep = members[corr[np.ix_(members, members)].mean(axis=1).argmax()]
+            self.clusters_.append({
+                'representative': str(self.feature_names_in_[rep]),
+                'members': [str(name) for name in self.feature_names_in_[members]],
+                'index': members
+            })
+        self.clusters_.sort(key=lambda c: c['index'].min())
+
+        if self.method == 'pca':
+            self.components_ = []
+            for cluster in self.clusters_:
+                block = values[:, cluster['index']]
+                mean, std = block.mean(axis=0), block.std(axis=0)
+                std[std == 0] = 1.0
+                if len(cluster['index']) == 1:
+                    self.components_.append((mean, std, np.ones(1)))
+                    continue
+                _, _, vt = np.linalg.svd((block - mean) / std, full_matrices=False)
+                self.components_.append((mean, std, vt[0]))
+
+        self.selected_features_ = [c['representative'] for c in self.clusters_]
+        return self
+
+    def get_feature_names_out(self, input_features=None):
+        if self.method == 'pca':
+            return np.array([f'PC_{name}' if len(c['members']) > 1 else name
+                             for name, c in zip(self.selected_features_, self.clusters_)], dtype=object)
+        return np.array(self.selected_features_, dtype=object)
+
+    def transform(self, X):
+        X = pd.DataFrame(X, columns=self.feature_names_in_) if not hasattr(X, 'columns') else X
+        if self.method == 'representative':
+            return X[self.selected_features_]
+
+        values = X[list(self.feature_names_in_)].values.astype(np.float64)
+        out = np.column_stack([
+            ((values[:, c['index']] - mean) / std) @ weights
+            for c, (mean, std, weights) in zip(self.clusters_, self.components_)
+        ])
+        return pd.DataFrame(out, columns=self.get_feature_names_out(), index=X.index)
+
+    def to_dict(self):
+        """JSON-serialisable description of the reduced feature set"""
+        return {
+            'threshold': self.threshold,
+            'method': self.method,
+            'n_input_features': len(self.feature_names_in_),
+            'n_selected': len(self.selected_features_),
+            'selected_features': self.selected_features_,
+            'clusters': [{'representative': c['representative'], 'members': c['members']}
+                         for c in self.clusters_]
+        }
+
+
+def write_reduced_features(reducer, path):
+    """Save a fitted reducer's feature set and clusters as JSON"""
+    path = Path(path)
+    path.write_text(json.dumps(reducer.to_dict(), indent=2))
+    return path
+
+
+def read_reduced_features(path):
+    """Selected feature names from a reduced feature set file"""
+    return json.loads(Path(path).read_text())['selected_features']
+
+
+# ==================== TRADE-OFF REPORT ====================
+def reduction_report(df, thresholds=DEFAULT_THRESHOLDS, model_id='rf', method='representative',
+                     task='binary', cv_strategy='spatial', radius_km=10.0):
+    """Cross-validated accuracy, fit time and predict time at several reduction levels"""
+    from sklearn.model_selection import cross_validate
+    from sklearn.pipeline import make_pipeline
+
+    from .cv import make_cv
+    from .models import make_model, task_data
+
+    rows, X, y = task_data(df, task)
+    cv, groups = make_cv(rows, cv_strategy, radius_km=radius_km)
+    scoring = ['accuracy', 'f1', 'roc_auc'] if task == 'binary' else ['accuracy', 'f1_macro']
+
+    report = []
+    for threshold in thresholds:
+        model = make_model(model_id)
+        if threshold is None:
+            estimator, n_features = model, X.shape[1]
+        else:
+            estimator = make_pipeline(CorrelationReducer(threshold, method), model)
+            n_features = len(CorrelationReducer(threshold, method).fit(X).selected_features_)
+
+        start = time.perf_counter()
+        scores = cross_validate(estimator, X, y, groups=groups, cv=cv, scoring=scoring)
+        entry = {
+            'Threshold |rho|': 'none' if threshold is None else threshold,
+            'Features': n_features,
+            **{f'{cv_strategy.title()} {name}': scores[f'test_{name}'].mean() for name in scoring},
+            'Fit time (s/fold)': scores['fit_time'].mean(),
+            'Predict time (s/fold)': scores['score_time'].mean(),
+            'Total CV time (s)': time.perf_counter() - start
+        }
+        report.append(entry)
+    return pd.DataFrame(report)
+
+
+def main(argv=None):
+    """Print the trade-off report and write the reduced feature set"""
+    from .cv import CV_STRATEGIES
+    from .dataset import load_dataset
+    from .models import task_data
+
+    parser = argparse.ArgumentParser(description="Correlation-cluster feature reduction")
+    parser.add_argument('--threshold', type=float, default=0.9, help="|rho| linking threshold for the written set")
+    parser.add_argument('--method', choices=['representative', 'pca'], default='representative')
+    parser.add_argument('--out', default='reduced_features.json')
+    parser.add_argument('--cv', choices=list(CV_STRATEGIES), default='spatial', help="CV strategy for the report")
+    parser.add_argument('--radius-km', type=float, default=10.0, help="Exclusion radius for --cv buffered")
+    parser.add_argument('--skip-report', action='store_true')
+    args = parser.parse_args(argv)
+
+    df = load_dataset()
+    if not args.skip_report:
+        print(f"📉 Feature reduction trade-off (Random Forest, {CV_STRATEGIES[args.cv]})")
+        report = reduction_report(df, method=args.method, cv_strategy=args.cv, radius_km=args.radius_km)
+        print(report.round(4).to_string(index=False))
+
+    _, X, _ = task_data(df, 'binary')
+    reducer = CorrelationReducer(args.threshold, args.method).fit(X)
+    path = write_reduced_features(reducer, args.out)
+    print(f"\n✅ {len(reducer.selected_features_)} of {X.shape[1]} features kept "
+          f"at |rho| >= {args.threshold} → {path}")
+
+
+if __name__ == '__main__':
+    main()
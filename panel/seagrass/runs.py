@@ -0,0 +1,461 @@
+"""
+Experiment Run Store - Mediterranean Seagrass Intelligence Panel
+
+Every cross-validated evaluation is recorded in a local SQLite database
+(``data/runs.sqlite``) with its configuration, the dataset hash, per-fold
+metrics and timings, and any saved artifacts (models, out-of-fold
+predictions - see ``seagrass.oof``):
+
+    runs        one row per (task, model, CV strategy) evaluation
+    folds       run_id x fold x metric -> value (fit_time / score_time included)
+    artifacts   run_id x name -> path
+    intervals   run_id x bootstrap method x metric -> estimate, low, high
+                (see ``seagrass.bootstrap``)
+
+Runs are indexed by model, CV strategy and creation date, and the
+classification pages read the latest (or pinned) run per model instead of
+hard-coded result dicts. On first use the store is seeded with the EDA
+notebook results (source 'notebook'), so the pages show the same numbers
+as before until new runs are recorded.
+
+Usage (from the panel folder):
+    python -m seagrass.runs --evaluate rf et dt --task binary --cv spatial
+    python -m seagrass.runs --list
+    python -m seagrass.runs --pin 12
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dataset import DATA_DIR
+
+RUNS_FILE = 'runs.sqlite'
+
+# sklearn scorer -> column label used by the pages
+SCORING = {
+    'binary': {'accuracy': 'Accuracy', 'precision': 'Precision', 'recall': 'Recall', 'f1': 'F1',
+               'roc_auc': 'ROC_AUC'},
+    'family': {'accuracy': 'Accuracy', 'precision_weighted': 'Precision', 'recall_weighted': 'Recall',
+               'f1_macro': 'Macro_F1'}
+}
+TIMING_METRICS = ('fit_time', 'score_time')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id        INTEGER PRIMARY KEY,
+    created       TEXT NOT NULL,
+    task          TEXT NOT NULL,
+    model_id      TEXT NOT NULL,
+    model_name    TEXT NOT NULL,
+    cv_strategy   TEXT NOT NULL,
+    data_hash     TEXT,
+    config        TEXT NOT NULL,
+    n_folds       INTEGER NOT NULL,
+    total_seconds REAL,
+    source        TEXT NOT NULL DEFAULT 'cv',
+    pinned        INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS folds (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    fold   INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    value  REAL,
+    PRIMARY KEY (run_id, metric, fold)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    name   TEXT NOT NULL,
+    path   TEXT NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS intervals (
+    run_id    INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    method    TEXT NOT NULL,
+    metric    TEXT NOT NULL,
+    estimate  REAL,
+    low       REAL,
+    high      REAL,
+    resamples INTEGER,
+    PRIMARY KEY (run_id, method, metric)
+);
+CREATE INDEX IF NOT EXISTS runs_by_model ON runs(model_id);
+CREATE INDEX IF NOT EXISTS runs_by_cv ON runs(cv_strategy);
+CREATE INDEX IF NOT EXISTS runs_by_created ON runs(created);
+CREATE INDEX IF NOT EXISTS runs_lookup ON runs(task, cv_strategy, model_id, pinned, run_id);
+"""
+
+# EDA notebook results (PyCaret, 2015 data) previously hard-coded in the pages
+NOTEBOOK_MODELS = {
+    'rf': 'Random Forest',
+    'dt': 'Decision Tree',
+    'knn': 'K Neighbors',
+    'svm': 'SVM - Linear',
+    'lda': 'LDA',
+    'ridge': 'Ridge Classifier',
+    'lr': 'Logistic Regression'
+}
+NOTEBOOK_RESULTS = {
+    ('binary', 'stratified'): {
+        'rf': [0.9878, 0.9903, 0.9887, 0.9895, 0.9993],
+        'dt': [0.8898, 0.9061, 0.8850, 0.8953, 0.9412],
+        'knn': [0.9342, 0.9398, 0.9320, 0.9358, 0.9856],
+        'svm': [0.8636, 0.8962, 0.8453, 0.8696, 0.9313],
+        'lda': [0.8299, 0.8516, 0.8185, 0.8345, 0.9088],
+        'ridge': [0.7387, 0.7281, 0.7710, 0.7487, 0.7799],
+        'lr': [0.8165, 0.7342, 0.7516, 0.7426, 0.8763]
+    },
+    ('binary', 'spatial'): {
+        'rf': [0.8804, 0.9308, 0.8450, 0.8827, 0.9558],
+        'dt': [0.7956, 0.8327, 0.7722, 0.8011, 0.8507],
+        'knn': [0.8359, 0.8767, 0.8082, 0.8409, 0.9217],
+        'svm': [0.8022, 0.8561, 0.7652, 0.8081, 0.8778],
+        'lda': [0.7846, 0.8463, 0.7390, 0.7886, 0.8642],
+        'ridge': [0.8210, 0.8465, 0.8321, 0.8324, 0.8871],
+        'lr': [0.7846, 0.8524, 0.7545, 0.7843, 0.8865]
+    },
+    ('family', 'stratified'): {
+        'knn': [0.8164, 0.7921, 0.8164, 0.7659],
+        'svm': [0.7199, 0.6893, 0.7199, 0.6572],
+        'rf': [0.8606, 0.8470, 0.8606, 0.8222],
+        'lr': [0.8084, 0.7760, 0.8084, 0.7454],
+        'ridge': [0.8186, 0.7952, 0.8186, 0.7590],
+        'dt': [0.8594, 0.8419, 0.8594, 0.8169],
+        'lda': [0.8277, 0.8099, 0.8277, 0.7781]
+    },
+    ('family', 'spatial'): {
+        'knn': [0.6809, 0.6396, 0.6809, 0.6209],
+        'svm': [0.6413, 0.6083, 0.6413, 0.5844],
+        'rf': [0.6303, 0.5951, 0.6303, 0.5758],
+        'lr': [0.5580, 0.5196, 0.5580, 0.4955],
+        'ridge': [0.5453, 0.5064, 0.5453, 0.4821],
+        'dt': [0.5088, 0.4696, 0.5088, 0.4390],
+        'lda': [0.3629, 0.3168, 0.3629, 0.2788]
+    }
+}
+
+
+# ==================== STORE ====================
+class RunStore:
+    """SQLite-backed store of evaluation runs; one short-lived connection per call"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else DATA_DIR / RUNS_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    def _query(self, sql, params=()):
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def __len__(self):
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def __contains__(self, run_id):
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT 1 FROM runs WHERE run_id = ?', (int(run_id),)).fetchone() is not None
+
+    # ---------- writing ----------
+    def record(self, task, model_id, cv_strategy, fold_scores, model_name=None, data_hash=None,
+               config=None, artifacts=None, total_seconds=None, source='cv', created=None):
+        """Insert one run with its per-fold scores ({metric: [value per fold]}) and return its id"""
+        fold_scores = {metric: np.atleast_1d(np.asarray(values, dtype=np.float64))
+                       for metric, values in fold_scores.items()}
+        n_folds = max((len(values) for values in fold_scores.values()), default=0)
+        created = created or datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                'INSERT INTO runs (created, task, model_id, model_name, cv_strategy, data_hash, config, '
+                'n_folds, total_seconds, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (created, task, model_id, model_name or model_label(model_id), cv_strategy, data_hash,
+                 json.dumps(config or {}, sort_keys=True, default=str), n_folds, total_seconds, source)
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                'INSERT INTO folds (run_id, fold, metric, value) VALUES (?, ?, ?, ?)',
+                [(run_id, fold, metric, float(value))
+                 for metric, values in fold_scores.items() for fold, value in enumerate(values)]
+            )
+            conn.executemany('INSERT INTO artifacts (run_id, name, path) VALUES (?, ?, ?)',
+                             [(run_id, name, str(path)) for name, path in (artifacts or {}).items()])
+        return run_id
+
+    def pin(self, run_id, pinned=True):
+        """Pin (or unpin) a run so the pages can show it instead of the latest one"""
+        with closing(self._connect()) as conn, conn:
+            if conn.execute('UPDATE runs SET pinned = ? WHERE run_id = ?', (int(pinned), run_id)).rowcount == 0:
+                raise ValueError(f"No run with id {run_id}")
+
+    def add_artifact(self, run_id, name, path):
+        """Register (or replace) an artifact of an existing run"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO artifacts (run_id, name, path) VALUES (?, ?, ?)',
+                         (run_id, name, str(path)))
+
+    def save_intervals(self, run_id, table):
+        """Store (or replace) bootstrap intervals: a Metric / Estimate / Low / High / Method / Resamples table"""
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO intervals (run_id, method, metric, estimate, low, high, resamples) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(run_id, row.Method, row.Metric, row.Estimate, row.Low, row.High, int(row.Resamples))
+                 for row in table.itertuples()]
+            )
+
+    def delete(self, run_id):
+        """Remove a run with its folds and artifact records"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM runs WHERE run_id = ?', (run_id,))
+
+    # ---------- reading ----------
+    def runs(self, task=None, cv_strategy=None, model_id=None, limit=None):
+        """Run table (newest first) with the mean of every metric"""
+        filters, params = [], []
+        for column, value in (('task', task), ('cv_strategy', cv_strategy), ('model_id', model_id)):
+            if value is not None:
+                filters.append(f'r.{column} = ?')
+                params.append(value)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ''
+        runs = self._query(
+            f'SELECT r.run_id, r.created, r.task, r.model_id, r.model_name, r.cv_strategy, r.data_hash, '
+            f'r.n_folds, r.total_seconds, r.source, r.pinned FROM runs r {where} '
+            f'ORDER BY r.run_id DESC' + (f' LIMIT {int(limit)}' if limit else ''), params
+        )
+        if runs.empty:
+            return runs
+        means = self._metric_means(runs['run_id'].tolist())
+        return runs.merge(means, left_on='run_id', right_index=True, how='left')
+
+    def _metric_means(self, run_ids):
+        placeholders = ','.join('?' * len(run_ids))
+        means = self._query(f'SELECT run_id, metric, AVG(value) AS value FROM folds '
+                            f'WHERE run_id IN ({placeholders}) GROUP BY run_id, metric', run_ids)
+        return means.pivot(index='run_id', columns='metric', values='value')
+
+    def folds(self, run_id):
+        """Fold x metric table of one run"""
+        folds = self._query('SELECT fold, metric, value FROM folds WHERE run_id = ?', (run_id,))
+        return folds.pivot(index='fold', columns='metric', values='value')
+
+    def config(self, run_id):
+        """Configuration dict recorded with a run"""
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT config FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"No run with id {run_id}")
+        return json.loads(row[0])
+
+    def artifacts(self, run_id):
+        """{name: path} of the artifacts recorded with a run"""
+        with closing(self._connect()) as conn:
+            return dict(conn.execute('SELECT name, path FROM artifacts WHERE run_id = ?', (run_id,)).fetchall())
+
+    def intervals(self, run_ids, method='station'):
+        """Bootstrap intervals of the given runs (one row per run and metric)"""
+        run_ids = [int(run_id) for run_id in np.atleast_1d(run_ids)]
+        placeholders = ','.join('?' * len(run_ids))
+        return self._query(f'SELECT run_id, metric, estimate, low, high, resamples FROM intervals '
+                           f'WHERE method = ? AND run_id IN ({placeholders})', [method, *run_ids])
+
+    def runs_without_intervals(self):
+        """Ids of runs with out-of-fold predictions but no stored intervals"""
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT a.run_id FROM artifacts a WHERE a.name = 'oof' AND NOT EXISTS "
+                "(SELECT 1 FROM intervals i WHERE i.run_id = a.run_id) ORDER BY a.run_id"
+            ).fetchall()]
+
+    def select_runs(self, task, cv_strategy, pinned=False):
+        """Latest run id per model for a task and CV strategy; with pinned=True a pinned run wins"""
+        query = 'SELECT model_id, MAX(run_id) FROM runs WHERE task = ? AND cv_strategy = ?{} GROUP BY model_id'
+        with closing(self._connect()) as conn:
+            selected = dict(conn.execute(query.format(''), (task, cv_strategy)).fetchall())
+            if pinned:
+                selected.update(conn.execute(query.format(' AND pinned = 1'), (task, cv_strategy)).fetchall())
+        return selected
+
+    def results_table(self, task, cv_strategy, pinned=False, run_ids=None, intervals=None):
+        """Page-ready table: Model, run id, source, then one column per metric label (fold means)
+
+        With intervals='station' or 'zone', <metric>_estimate / <metric>_low / <metric>_high
+        columns hold the pooled out-of-fold estimate of each metric and its bootstrap interval
+        (NaN for runs without stored predictions). The interval belongs to that estimate, not
+        to the fold mean in the <metric> column.
+        """
+        if run_ids is None:
+            selected = self.select_runs(task, cv_strategy, pinned)
+            order = {model_id: i for i, model_id in enumerate(NOTEBOOK_MODELS)}
+            run_ids = [selected[m] for m in sorted(selected, key=lambda m: (order.get(m, len(order)), m))]
+        run_ids = [int(run_id) for run_id in run_ids]
+        labels = SCORING[task]
+        columns = ['Model', 'Run', 'Source', 'Created', *labels.values()]
+        if intervals is not None:
+            columns += [f'{label}_{bound}' for label in labels.values() for bound in ('estimate', 'low', 'high')]
+        if not run_ids:
+            return pd.DataFrame(columns=columns)
+
+        placeholders = ','.join('?' * len(run_ids))
+        runs = self._query(f'SELECT run_id, model_name, source, created FROM runs '
+                           f'WHERE run_id IN ({placeholders})', run_ids).set_index('run_id')
+        means = self._metric_means(run_ids).reindex(columns=list(labels)).rename(columns=labels)
+        table = runs.join(means).reset_index().rename(columns={
+            'run_id': 'Run', 'model_name': 'Model', 'source': 'Source', 'created': 'Created'
+        })
+        if intervals is not None:
+            bounds = self.intervals(run_ids, intervals).pivot(index='run_id', columns='metric',
+                                                              values=['estimate', 'low', 'high'])
+            bounds.columns = [f'{metric}_{bound}' for bound, metric in bounds.columns]
+            table = table.join(bounds, on='Run').reindex(columns=columns)
+        order = {run_id: i for i, run_id in enumerate(run_ids)}
+        return table.sort_values('Run', key=lambda s: s.map(order)).reset_index(drop=True)[columns]
+
+
+def model_label(model_id):
+    """Display name of a model id"""
+    from .models import MODEL_NAMES
+
+    return MODEL_NAMES.get(model_id, NOTEBOOK_MODELS.get(model_id, model_id))
+
+
+def seed_notebook_results(store):
+    """Record the EDA notebook results as one single-fold run per model"""
+    for (task, cv_strategy), results in NOTEBOOK_RESULTS.items():
+        for model_id, values in results.items():
+            store.record(task, model_id, cv_strategy, dict(zip(SCORING[task], values)),
+                         model_name=NOTEBOOK_MODELS[model_id], config={'tool': 'pycaret', 'year': 2015},
+                         source='notebook', created='2024-01-01T00:00:00+00:00')
+    return store
+
+
+def get_run_store(path=None):
+    """Run store at path (default data/runs.sqlite), seeded with the notebook results when empty"""
+    store = RunStore(path)
+    if len(store) == 0:
+        seed_notebook_results(store)
+    return store
+
+
+# ==================== EVALUATION ====================
+def evaluate_run(df, model_id='rf', task='binary', cv_strategy='spatial', store=None, radius_km=10.0,
+                 artifact_dir=None, save_predictions=True, n_jobs=-1, splits=None):
+    """Cross-validate one model, record the run (per-fold metrics, timings, OOF predictions) and return its id
+
+    splits: precomputed (train, test) index pairs used instead of the strategy's splitter (seagrass.build)
+    """
+    from sklearn.model_selection import cross_validate
+
+    from .cv import make_cv
+    from .dataset import data_hash
+    from .models import final_estimator, make_model, task_data
+    from .oof import oof_frame, prediction_scores, save_oof
+
+    store = store if store is not None else get_run_store()
+    rows, X, y = task_data(df, task)
+    cv, groups = make_cv(rows, cv_strategy, radius_km=radius_km) if splits is None else (list(splits), None)
+    model = make_model(model_id)
+
+    start = time.perf_counter()
+    scores = cross_validate(model, X, y, groups=groups, cv=cv, scoring=list(SCORING[task]), n_jobs=n_jobs,
+                            return_estimator=save_predictions, return_indices=save_predictions)
+    total_seconds = time.perf_counter() - start
+
+    fold_scores = {metric: scores[f'test_{metric}'] for metric in SCORING[task]}
+    fold_scores.update({metric: scores[metric] for metric in TIMING_METRICS})
+    config = {
+        'estimator': type(final_estimator(model)).__name__,
+        'params': final_estimator(model).get_params(),
+        'imputation': 'mean' if model is not final_estimator(model) else None,
+        'n_features': X.shape[1],
+        'n_rows': len(rows),
+        'cv': type(cv).__name__ if splits is None else 'precomputed',
+        'radius_km': radius_km if cv_strategy == 'buffered' else None
+    }
+
+    oof = None
+    if save_predictions:
+        fold_predictions, classes = [], np.unique(y)
+        for fold, (estimator, test) in enumerate(zip(scores['estimator'], scores['indices']['test'])):
+            predicted, config['oof_score'] = prediction_scores(estimator, X.iloc[test], classes)
+            fold_predictions.append((fold, test, predicted))
+        oof = oof_frame(rows, y, fold_predictions, model_id, classes, config['oof_score'])
+
+    artifacts = {}
+    if artifact_dir is not None:
+        from .artifacts import save_artifact
+
+        hash_ = data_hash(df)
+        path = Path(artifact_dir) / f'{task}_{model_id}_{cv_strategy}_{hash_}.model'
+        artifacts['model'] = save_artifact(make_model(model_id).fit(X, y), path, data_hash=hash_)
+
+    run_id = store.record(task, model_id, cv_strategy, fold_scores, data_hash=data_hash(df), config=config,
+                          artifacts=artifacts, total_seconds=total_seconds)
+    if oof is not None:
+        from .bootstrap import record_intervals
+
+        save_oof(oof, run_id, store)
+        record_intervals(run_id, oof, store)
+    return run_id
+
+
+def main(argv=None):
+    """Record evaluation runs, list them or pin one"""
+    from .cv import CV_STRATEGIES
+    from .models import MODEL_NAMES, TASKS
+
+    parser = argparse.ArgumentParser(description="Local experiment-run store")
+    parser.add_argument('--db', help=f"Store path (default: data/{RUNS_FILE})")
+    parser.add_argument('--evaluate', nargs='+', choices=list(MODEL_NAMES), help="Models to cross-validate")
+    parser.add_argument('--task', choices=list(TASKS), default='binary')
+    parser.add_argument('--cv', choices=list(CV_STRATEGIES), default='spatial')
+    parser.add_argument('--radius-km', type=float, default=10.0)
+    parser.add_argument('--artifact-dir', help="Also save each model fitted on all rows as an artifact")
+    parser.add_argument('--list', action='store_true', help="Print the most recent runs")
+    parser.add_argument('--pin', type=int, metavar='RUN_ID')
+    parser.add_argument('--unpin', type=int, metavar='RUN_ID')
+    args = parser.parse_args(argv)
+
+    store = get_run_store(args.db)
+
+    if args.evaluate:
+        from .dataset import load_dataset
+
+        df = load_dataset()
+        for model_id in args.evaluate:
+            run_id = evaluate_run(df, model_id, args.task, args.cv, store, args.radius_km, args.artifact_dir)
+            run = store.runs(model_id=model_id, limit=1).iloc[0]
+            print(f"✅ Run {run_id}: {run['model_name']} ({args.task}, {args.cv}) "
+                  f"in {run['total_seconds']:.1f}s")
+    if args.pin is not None:
+        store.pin(args.pin)
+        print(f"📌 Pinned run {args.pin}")
+    if args.unpin is not None:
+        store.pin(args.unpin, pinned=False)
+        print(f"📌 Unpinned run {args.unpin}")
+
+    if args.list or not (args.evaluate or args.pin is not None or args.unpin is not None):
+        start = time.perf_counter()
+        runs = store.runs(limit=30)
+        elapsed = time.perf_counter() - start
+        metric_cols = [c for c in runs.columns if c in {m for labels in SCORING.values() for m in labels}]
+        print(f"🗂️ {len(store)} runs in {store.path} (latest 30 listed, queried in {elapsed * 1000:.1f} ms)")
+        print(runs[['run_id', 'created', 'task', 'model_id', 'cv_strategy', 'source', 'pinned', *metric_cols]]
+              .round(4).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
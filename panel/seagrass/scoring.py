@@ -0,0 +1,220 @@
+"""
+Batch Scoring Engine - Mediterranean Seagrass Intelligence Panel
+
+Streams feature rows from disk in chunks, scores them with the binary
+(presence) and family models on a process pool and appends probabilities
+to a columnar output file. At most ``max_pending`` chunks are in flight,
+so memory stays bounded regardless of the input size. With
+``--family-gate`` the family model only scores rows whose presence
+probability reaches the gate (see seagrass.cascade).
+
+Usage (from the panel folder):
+    python -m seagrass.scoring grid.parquet predictions.parquet \
+        --binary-model binary_rf.model --family-model family_rf.model [--family-gate 0.3]
+"""
+
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dataset import prepare_features
+
+ID_COLS = ('ID', 'LONGITUDE', 'LATITUDE')
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+# ==================== INPUT / OUTPUT ====================
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, columns=None):
+    """Yield dataframes of at most chunk_size rows from a Parquet, CSV or TSV file"""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, sep=csv_separator(path), chunksize=chunk_size, usecols=columns)
+
+
+def read_table(path, columns=None):
+    """A whole Parquet, CSV or TSV file (the formats of iter_chunks) as one dataframe"""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, sep=csv_separator(path), usecols=columns)
+
+
+def csv_separator(path):
+    """Tab for .txt / .tsv files, comma otherwise"""
+    return '\t' if Path(path).suffix in ('.txt', '.tsv') else ','
+
+
+class ChunkWriter:
+    """Incremental writer for Parquet (row group per chunk) or CSV output"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._writer = None
+        self._header = True
+
+    def write(self, frame):
+        """Append one chunk of results"""
+        if self.path.suffix == '.parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(frame, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        """Flush and close the output file"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==================== SCORING ====================
+def score_chunk(chunk, binary_model=None, family_model=None, family_gate=None):
+    """Presence and family probabilities for one chunk of raw feature rows
+
+    With family_gate (and a binary model), the family model only scores rows
+    with P_presence >= family_gate; the other rows get NaN family
+    probabilities and no predicted family (presence -> family cascade).
+    """
+    out = chunk[[col for col in ID_COLS if col in chunk.columns]].reset_index(drop=True)
+
+    if binary_model is not None:
+        X = prepare_features(chunk, binary_model.feature_names_in_)
+        proba = binary_model.predict_proba(X)
+        presence_idx = list(binary_model.classes_).index(True)
+        out['P_presence'] = proba[:, presence_idx].astype(np.float32)
+
+    if family_model is not None:
+        gated = family_gate is not None and binary_model is not None
+        rows = np.flatnonzero(out['P_presence'].values >= family_gate) if gated else slice(None)
+        proba = np.full((len(chunk), len(family_model.classes_)), np.nan, dtype=np.float32)
+        predicted = np.full(len(chunk), None, dtype=object)
+        if not gated or len(rows):
+            X = prepare_features(chunk.iloc[rows], family_model.feature_names_in_)
+            proba[rows] = family_model.predict_proba(X)
+            predicted[rows] = family_model.classes_[proba[rows].argmax(axis=1)]
+        for i, family in enumerate(family_model.classes_):
+            out[f'P_{family}'] = proba[:, i]
+        out['Predicted_Family'] = pd.array(predicted, dtype='string')  # string even when no row passes the gate
+
+    return out
+
+
+_WORKER_MODELS = {}
+
+
+def _single_threaded(model):
+    """Avoid nested parallelism inside pool workers"""
+    if hasattr(model, 'get_params'):
+        model.set_params(**{name: 1 for name in model.get_params() if name.split('__')[-1] == 'n_jobs'})
+    return model
+
+
+def _init_worker(binary_model, family_model, family_gate=None):
+    """Receive the models once per worker process"""
+    _WORKER_MODELS['binary'] = _single_threaded(binary_model)
+    _WORKER_MODELS['family'] = _single_threaded(family_model)
+    _WORKER_MODELS['family_gate'] = family_gate
+
+
+def _score_in_worker(chunk):
+    return score_chunk(chunk, _WORKER_MODELS['binary'], _WORKER_MODELS['family'], _WORKER_MODELS['family_gate'])
+
+
+def score_file(input_path, output_path, binary_model=None, family_model=None,
+               chunk_size=DEFAULT_CHUNK_SIZE, n_workers=None, max_pending=None,
+               progress=None, family_gate=None):
+    """Score every row of input_path and write probabilities to output_path"""
+    if binary_model is None and family_model is None:
+        raise ValueError("At least one of binary_model / family_model is required")
+
+    n_workers = n_workers or 1
+    max_pending = max_pending or 2 * n_workers
+    report = {'rows': 0, 'chunks': 0}
+    start = time.perf_counter()
+
+    def record(result):
+        writer.write(result)
+        report['rows'] += len(result)
+        report['chunks'] += 1
+        if progress is not None:
+            elapsed = time.perf_counter() - start
+            progress(report['chunks'], report['rows'], report['rows'] / elapsed)
+
+    with ChunkWriter(output_path) as writer:
+        if n_workers == 1:
+            for chunk in iter_chunks(input_path, chunk_size):
+                record(score_chunk(chunk, binary_model, family_model, family_gate))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(binary_model, family_model, family_gate)) as pool:
+                pending = deque()
+                for chunk in iter_chunks(input_path, chunk_size):
+                    if len(pending) >= max_pending:
+                        record(pending.popleft().result())
+                    pending.append(pool.submit(_score_in_worker, chunk))
+                while pending:
+                    record(pending.popleft().result())
+
+    report['seconds'] = time.perf_counter() - start
+    report['rows_per_s'] = report['rows'] / report['seconds'] if report['seconds'] else 0.0
+    report['n_workers'] = n_workers
+    report['chunk_size'] = chunk_size
+    return report
+
+
+# ==================== COMMAND LINE ====================
+def main(argv=None):
+    """Command-line entry point"""
+    from .artifacts import load_model
+
+    parser = argparse.ArgumentParser(description="Score a prediction grid in chunks")
+    parser.add_argument('input', help="Feature rows (.parquet, .csv, .tsv or .txt)")
+    parser.add_argument('output', help="Output file (.parquet or .csv)")
+    parser.add_argument('--binary-model', help="Presence model (artifact directory or joblib file)")
+    parser.add_argument('--family-model', help="Family model (artifact directory or joblib file)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--family-gate', type=float,
+                        help="Score the family model only where P_presence >= this value (cascade)")
+    args = parser.parse_args(argv)
+
+    binary_model = load_model(args.binary_model) if args.binary_model else None
+    family_model = load_model(args.family_model) if args.family_model else None
+
+    def progress(chunks, rows, rate):
+        print(f"   • chunk {chunks:>5}: {rows:>12,} rows ({rate:,.0f} rows/s)")
+
+    report = score_file(args.input, args.output, binary_model, family_model,
+                        chunk_size=args.chunk_size, n_workers=args.workers, progress=progress,
+                        family_gate=args.family_gate)
+    print(f"✅ Scored {report['rows']:,} rows in {report['seconds']:.1f}s "
+          f"({report['rows_per_s']:,.0f} rows/s, {report['n_workers']} workers)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+"""
+Local Prediction Service - Mediterranean Seagrass Intelligence Panel
+
+A small HTTP service (standard library only) that loads the presence and
+family models once and answers prediction requests. Concurrent requests
+are coalesced into micro-batches before ``predict_proba`` is called.
+
+Endpoints:
+    POST /predict   {"rows": [{<predictor>: value, ...}, ...]} or a single row object
+    GET  /metrics   latency percentiles, batch sizes and throughput
+    GET  /health    liveness check
+
+Usage (from the panel folder):
+    python -m seagrass.service serve --binary-model binary_rf.model --family-model family_rf.model
+    python -m seagrass.service loadtest --rows-file ../data/pres_abs_merge_def.csv --concurrency 16
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from .dataset import prepare_features
+
+DEFAULT_PORT = 8765
+DEFAULT_BACKLOG = 128  # listen queue; socketserver's default of 5 makes concurrent clients wait on SYN retries
+
+
+# ==================== MICRO-BATCHING ====================
+class MicroBatcher:
+    """Coalesce concurrent feature matrices into batched predict calls"""
+
+    def __init__(self, predict_fn, max_batch_rows=512, max_wait_ms=5.0, on_batch=None):
+        self.predict_fn = predict_fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.on_batch = on_batch
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        """Queue a feature matrix; the future resolves to its slice of the batch output"""
+        future = Future()
+        self._queue.put((X, future))
+        return future
+
+    def close(self):
+        """Stop the batching thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        """Gather queued requests until the batch is full or the wait window closes"""
+        items = [first]
+        n_rows = len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch_rows:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            items.append(item)
+            n_rows += len(item[0])
+        return items
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            items = self._collect(first)
+            start = time.perf_counter()
+            try:
+                outputs = self.predict_fn(np.vstack([X for X, _ in items]))
+            except Exception as exc:
+                for _, future in items:
+                    future.set_exception(exc)
+                continue
+
+            offset = 0
+            for X, future in items:
+                future.set_result({key: value[offset:offset + len(X)] for key, value in outputs.items()})
+                offset += len(X)
+            if self.on_batch is not None:
+                self.on_batch(offset, len(items), time.perf_counter() - start)
+
+
+# ==================== METRICS ====================
+class ServiceMetrics:
+    """Thread-safe request/batch counters with a rolling latency window"""
+
+    def __init__(self, window=10_000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.batches = 0
+        self.batch_rows = 0
+        self.batch_seconds = 0.0
+
+    def record_request(self, latency, n_rows):
+        with self._lock:
+            self.requests += 1
+            self.rows += n_rows
+            self._latencies.append(latency)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def record_batch(self, n_rows, n_requests, seconds):
+        with self._lock:
+            self.batches += 1
+            self.batch_rows += n_rows
+            self.batch_seconds += seconds
+
+    def snapshot(self):
+        """Current metrics as a JSON-serialisable dict"""
+        with self._lock:
+            uptime = time.perf_counter() - self._started
+            latencies = np.array(self._latencies) * 1000.0
+            percentiles = (np.percentile(latencies, [50, 95, 99]).round(3).tolist()
+                           if len(latencies) else [None, None, None])
+            return {
+                'uptime_s': round(uptime, 3),
+                'requests': self.requests,
+                'rows': self.rows,
+                'errors': self.errors,
+                'batches': self.batches,
+                'mean_batch_rows': round(self.batch_rows / self.batches, 2) if self.batches else 0.0,
+                'mean_batch_ms': round(1000.0 * self.batch_seconds / self.batches, 3) if self.batches else 0.0,
+                'latency_ms': dict(zip(('p50', 'p95', 'p99'), percentiles)),
+                'requests_per_s': round(self.requests / uptime, 2) if uptime else 0.0,
+                'rows_per_s': round(self.rows / uptime, 2) if uptime else 0.0
+            }
+
+
+# ==================== PREDICTION SERVICE ====================
+class PredictionService:
+    """Models, feature schema, batcher and metrics shared by all request handlers"""
+
+    def __init__(self, binary_model=None, family_model=None, max_batch_rows=512, max_wait_ms=5.0):
+        if binary_model is None and family_model is None:
+            raise ValueError("At least one of binary_model / family_model is required")
+        models = [m for m in (binary_model, family_model) if m is not None]
+        self.feature_names = list(models[0].feature_names_in_)
+        if any(list(m.feature_names_in_) != self.feature_names for m in models):
+            raise ValueError("Binary and family models must share the same feature columns")
+
+        self.binary_model = binary_model
+        self.family_model = family_model
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(self._predict, max_batch_rows, max_wait_ms,
+                                    on_batch=self.metrics.record_batch)
+
+    def _predict(self, X):
+        X = pd.DataFrame(X, columns=self.feature_names)
+        outputs = {}
+        if self.binary_model is not None:
+            presence_idx = list(self.binary_model.classes_).index(True)
+            outputs['P_presence'] = self.binary_model.predict_proba(X)[:, presence_idx]
+        if self.family_model is not None:
+            outputs['family_proba'] = self.family_model.predict_proba(X)
+        return outputs
+
+    def predict_records(self, records):
+        """Validate, enqueue and format predictions for a list of row dicts"""
+        frame = pd.DataFrame.from_records(records)
+        X = prepare_features(frame, self.feature_names).values
+        outputs = self.batcher.submit(X).result()
+
+        predictions = [{} for _ in range(len(X))]
+        if 'P_presence' in outputs:
+            for pred, p in zip(predictions, outputs['P_presence']):
+                pred['P_presence'] = float(p)
+        if 'family_proba' in outputs:
+            classes = self.family_model.classes_
+            for pred, row in zip(predictions, outputs['family_proba']):
+                pred.update({f'P_{c}': float(p) for c, p in zip(classes, row)})
+                pred['Predicted_Family'] = str(classes[row.argmax()])
+        return predictions
+
+    def close(self):
+        self.batcher.close()
+
+
+def make_handler(service):
+    """Request handler class bound to a PredictionService"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok', 'n_features': len(service.feature_names)})
+            elif self.path == '/metrics':
+                self._send_json(200, service.metrics.snapshot())
+            else:
+                self._send_json(404, {'error': f'Unknown path {self.path}'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': f'Unknown path {self.path}'})
+                return
+            start = time.perf_counter()
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length))
+                records = payload.get('rows', [payload]) if isinstance(payload, dict) else payload
+                predictions = service.predict_records(records)
+            except (ValueError, KeyError, TypeError) as exc:
+                service.metrics.record_error()
+                self._send_json(400, {'error': str(exc)})
+                return
+            except Exception as exc:  # e.g. a model / numpy error raised through the batcher future
+                service.metrics.record_error()
+                self._send_json(500, {'error': f'{type(exc).__name__}: {exc}'})
+                return
+            service.metrics.record_request(time.perf_counter() - start, len(predictions))
+            self._send_json(200, {'predictions': predictions})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class PredictionServer(ThreadingHTTPServer):
+    """Threaded HTTP server with a configurable listen backlog"""
+
+    def __init__(self, address, handler, backlog=DEFAULT_BACKLOG):
+        self.request_queue_size = backlog  # read by server_activate() in the base constructor
+        super().__init__(address, handler)
+
+
+def serve(service, host='127.0.0.1', port=DEFAULT_PORT, backlog=DEFAULT_BACKLOG):
+    """Create (but do not start) the threaded HTTP server"""
+    return PredictionServer((host, port), make_handler(service), backlog)
+
+
+# ==================== LOAD-TEST CLIENT ====================
+def load_test(url, rows, n_requests=500, concurrency=16, batch_size=1):
+    """Fire n_requests POSTs of batch_size rows from concurrency threads and time them
+
+    latency_ms is measured by the client (connection, queueing and transfer included);
+    server_latency_ms is the service's own /metrics view, which starts once a handler runs.
+    """
+    import urllib.request
+
+    records = rows.replace({np.nan: None}).to_dict(orient='records')
+    bodies = [
+        json.dumps({'rows': [records[(i * batch_size + j) % len(records)] for j in range(batch_size)]}).encode('utf-8')
+        for i in range(n_requests)
+    ]
+
+    def post(body):
+        start = time.perf_counter()
+        request = urllib.request.Request(url.rstrip('/') + '/predict', data=body,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(post, bodies))) * 1000.0
+    elapsed = time.perf_counter() - start
+    with urllib.request.urlopen(url.rstrip('/') + '/metrics') as response:
+        server_latency = json.loads(response.read())['latency_ms']
+
+    return {
+        'requests': n_requests,
+        'rows': n_requests * batch_size,
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'requests_per_s': round(n_requests / elapsed, 2),
+        'rows_per_s': round(n_requests * batch_size / elapsed, 2),
+        'latency_ms': dict(zip(('p50', 'p95', 'p99'), np.percentile(latencies, [50, 95, 99]).round(3).tolist())),
+        'server_latency_ms': server_latency
+    }
+
+
+# ==================== COMMAND LINE ====================
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Local seagrass prediction service")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help="Run the prediction service")
+    serve_parser.add_argument('--binary-model', help="Presence model (artifact directory or joblib file)")
+    serve_parser.add_argument('--family-model', help="Family model (artifact directory or joblib file)")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--max-batch-rows', type=int, default=512)
+    serve_parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    serve_parser.add_argument('--backlog', type=int, default=DEFAULT_BACKLOG, help="Listen queue size")
+    serve_parser.add_argument('--compiled', action='store_true',
+                              help="Score joblib tree models with the array-compiled runtime "
+                                   "(artifacts are always compiled)")
+
+    load_parser = sub.add_parser('loadtest', help="Load-test a running service")
+    load_parser.add_argument('--url', default=f'http://127.0.0.1:{DEFAULT_PORT}')
+    load_parser.add_argument('--rows-file', required=True, help="CSV/TSV with predictor columns")
+    load_parser.add_argument('--requests', type=int, default=500)
+    load_parser.add_argument('--concurrency', type=int, default=16)
+    load_parser.add_argument('--batch-size', type=int, default=1)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        from .artifacts import load_model
+
+        binary_model = load_model(args.binary_model) if args.binary_model else None
+        family_model = load_model(args.family_model) if args.family_model else None
+        if args.compiled:
+            from .compiled import CompiledForest, compile_model
+
+            binary_model, family_model = [
+                compile_model(m) if m is not None and not isinstance(m, CompiledForest) else m
+                for m in (binary_model, family_model)
+            ]
+
+        service = PredictionService(
+            binary_model,
+            family_model,
+            max_batch_rows=args.max_batch_rows,
+            max_wait_ms=args.max_wait_ms
+        )
+        server = serve(service, args.host, args.port, args.backlog)
+        print(f"🌊 Serving predictions on http://{args.host}:{args.port} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            service.close()
+    else:
+        sep = '\t' if args.rows_file.endswith(('.txt', '.tsv')) else ','
+        rows = pd.read_csv(args.rows_file, sep=sep)
+        print(json.dumps(load_test(args.url, rows, args.requests, args.concurrency, args.batch_size), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Station Spatial Index - Mediterranean Seagrass Intelligence Panel
+
+Haversine BallTree over station LONGITUDE / LATITUDE with bulk k-nearest
+and radius queries (distances in km). Indexes are cached per dataset
+version (``dataset.data_hash``), so pages and analysis code share one
+tree per loaded dataset, and a changed dataset gets a new one.
+
+Usage (from the panel folder):
+    python -m seagrass.spatial --lon 3.05 --lat 42.6 --k 10
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .cv import EARTH_RADIUS_KM, to_radians
+
+COORD_COLS = ['LONGITUDE', 'LATITUDE']
+_INDEX_CACHE = {}
+
+
+class StationIndex:
+    """Haversine BallTree over (lon, lat) points with km-based queries"""
+
+    def __init__(self, coordinates, ids=None, version=None, leaf_size=40):
+        from sklearn.neighbors import BallTree
+
+        self.coordinates = np.asarray(coordinates, dtype=np.float64)
+        self.ids = np.arange(len(self.coordinates)) if ids is None else np.asarray(ids)
+        self.version = version
+        self.tree = BallTree(to_radians(self.coordinates), leaf_size=leaf_size, metric='haversine')
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def knn(self, points, k=10):
+        """Distances (km) and row positions of the k nearest stations to each point"""
+        k = min(k, len(self))
+        distance, index = self.tree.query(to_radians(np.atleast_2d(points)), k=k)
+        return distance * EARTH_RADIUS_KM, index
+
+    def within(self, points, radius_km, sort=True):
+        """Per point: row positions and distances (km) of all stations within radius_km"""
+        index, distance = self.tree.query_radius(to_radians(np.atleast_2d(points)),
+                                                 r=radius_km / EARTH_RADIUS_KM,
+                                                 return_distance=True, sort_results=sort)
+        return index, [d * EARTH_RADIUS_KM for d in distance]
+
+    def count_within(self, points, radius_km):
+        """Number of stations within radius_km of each point"""
+        return self.tree.query_radius(to_radians(np.atleast_2d(points)), r=radius_km / EARTH_RADIUS_KM,
+                                      count_only=True)
+
+    def close_pairs(self, radius_km):
+        """All station pairs (i < j) closer than radius_km, e.g. near-duplicate records"""
+        index, distance = self.within(self.coordinates, radius_km, sort=False)
+        counts = np.array([len(i) for i in index])
+        left = np.repeat(np.arange(len(self)), counts)
+        right = np.concatenate(index) if len(index) else np.array([], dtype=np.int64)
+        km = np.concatenate(distance) if len(distance) else np.array([])
+        keep = left < right
+        return pd.DataFrame({'i': left[keep], 'j': right[keep], 'Distance (km)': km[keep]})
+
+
+def station_index(df):
+    """StationIndex for a dataset, built once per dataset version"""
+    from .dataset import data_hash
+
+    version = data_hash(df[['ID', *COORD_COLS]] if 'ID' in df.columns else df[COORD_COLS])
+    if version not in _INDEX_CACHE:
+        ids = df['ID'].values if 'ID' in df.columns else None
+        _INDEX_CACHE.clear()  # one dataset is loaded at a time; drop stale trees
+        _INDEX_CACHE[version] = StationIndex(df[COORD_COLS].values, ids, version)
+    return _INDEX_CACHE[version]
+
+
+def stations_near(df, lon, lat, k=10, radius_km=None, columns=None):
+    """Rows of df nearest to (lon, lat), with a distance column; radius_km switches to a radius query"""
+    index = station_index(df)
+    if radius_km is None:
+        distance, rows = index.knn([[lon, lat]], k)
+        rows, distance = rows[0], distance[0]
+    else:
+        rows, distance = index.within([[lon, lat]], radius_km)
+        rows, distance = rows[0], distance[0]
+
+    columns = list(df.columns) if columns is None else [col for col in columns if col in df.columns]
+    out = df.iloc[rows][columns].copy()
+    out.insert(0, 'Distance (km)', distance)
+    return out.reset_index(drop=True)
+
+
+def main(argv=None):
+    """Print the stations nearest to a point"""
+    from .dataset import load_dataset
+
+    parser = argparse.ArgumentParser(description="Stations near a point")
+    parser.add_argument('--lon', type=float, required=True)
+    parser.add_argument('--lat', type=float, required=True)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--radius-km', type=float)
+    args = parser.parse_args(argv)
+
+    df = load_dataset()
+    near = stations_near(df, args.lon, args.lat, args.k, args.radius_km,
+                         columns=['ID', 'BIO_CLASS', *COORD_COLS, 'GEOGRAPHIC_ZONE'])
+    print(f"📍 {len(near)} stations near ({args.lon}, {args.lat})")
+    print(near.round(4).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
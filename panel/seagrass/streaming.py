@@ -0,0 +1,724 @@
+"""
+Out-of-Core Incremental Training - Mediterranean Seagrass Intelligence Panel
+
+Cross-validates and trains on a columnar file (Parquet / CSV / TSV) read in
+chunks, so memory is bounded by the chunk size rather than the row count:
+
+- a first pass counts rows, classes, zones and Substrate categories and
+  keeps a reservoir sample of the numeric predictors (bin thresholds,
+  scaling shift);
+- every row gets its fold from the stream itself, seeded so that every
+  pass sees the same folds: its zone (spatial CV, one fold per zone like
+  GroupKFold) or a per-class round robin after an in-chunk shuffle
+  (stratified CV, per-class fold sizes within one row like
+  StratifiedKFold). Buffered CV needs neighbour queries over all stations
+  and is not streamed;
+- ``sgd``: log-loss SGDClassifier updated with ``partial_fit``. The fold
+  models and the full model learn from the same chunk, each standardised
+  with its own training moments (all rows minus the held-out fold). A
+  bounded shuffle buffer mixes the label-sorted input every epoch, and
+  averaged SGD steadies the few-epoch solution;
+- ``hist``: gradient boosting grown level by level from gradient /
+  hessian histograms summed chunk by chunk over uint8 bin codes
+  (seagrass.boosting thresholds from the reservoir). The codes, classes,
+  folds and running margins live in on-disk memmaps, and each tree level
+  is one pass over them.
+
+Held-out predictions only feed per-fold confusion counts and score
+histograms, so the scores match runs.SCORING without keeping anything
+row-sized in memory. ROC AUC comes from a 4096-bin histogram of
+asinh(positive margin), where ties within a bin count one half. Margins
+rather than probabilities keep the ranking of the many SGD scores that
+saturate to 0 / 1.
+
+Usage (from the panel folder):
+    python -m seagrass.streaming                              # both learners, spatial CV, merged CSV
+    python -m seagrass.streaming extraction.parquet --task family --cv stratified --learner hist
+    python -m seagrass.streaming --benchmark                  # peak memory / time vs in-memory sklearn
+    python -m seagrass.streaming --record                     # record the streamed runs in the run store
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .boosting import (CATEGORICAL_COLS, MAX_BINS, MISSING_CODE, BinnedDataset, bin_thresholds,
+                       boosting_columns)
+from .dataset import BINARY_TARGET, DATA_DIR, FAMILY_TARGET, MERGED_FILE, ZONE_COL
+from .temporal import FILL_VALUE_LIMIT
+
+CHUNK_SIZE = 10_000
+BOOSTING_CHUNK = 4096  # rows per histogram pass over the memmaps (bounds the rows x features index arrays)
+RESERVOIR_ROWS = 25_000
+SHUFFLE_ROWS = 30_000
+SCORE_BINS = 4096
+SCORE_RANGE = 10.0  # asinh(margin) histogram range: margins up to ~1e4 get their own bins
+LEARNERS = {'sgd': 'SGD Log-Loss (streamed)', 'hist': 'Histogram Boosting (streamed)'}
+STREAM_PARAMS = {
+    'sgd': {'epochs': 10, 'alpha': 1e-4, 'average': True},
+    'hist': {'n_trees': 100, 'max_depth': 4, 'learning_rate': 0.1, 'l2_regularization': 1.0,
+             'min_samples_leaf': 20}
+}
+MIN_HESSIAN = 1e-3
+
+
+# ==================== SOURCES ====================
+def source_chunks(source, chunk_size=CHUNK_SIZE):
+    """Chunks of a file (seagrass.scoring.iter_chunks) or of an in-memory dataframe"""
+    if isinstance(source, pd.DataFrame):
+        return (source.iloc[start:start + chunk_size] for start in range(0, len(source), chunk_size))
+    from .scoring import iter_chunks
+
+    return iter_chunks(source, chunk_size)
+
+
+def task_chunks(source, task='binary', chunk_size=CHUNK_SIZE):
+    """(chunk, target) pairs of a task's rows: every row for presence, presences only for the family"""
+    for chunk in source_chunks(source, chunk_size):
+        if ZONE_COL not in chunk.columns:
+            from .zoning import get_zoning
+
+            chunk = chunk.assign(**{ZONE_COL: get_zoning().assign_rows(chunk)})
+        if task == 'family':
+            chunk = chunk[chunk[BINARY_TARGET].astype(bool).to_numpy()]
+            y = chunk[FAMILY_TARGET].astype(str).to_numpy()
+        else:
+            y = chunk[BINARY_TARGET].astype(bool).to_numpy()
+        if len(chunk):
+            yield chunk, y
+
+
+def reservoir_update(sample, values, seen, rng):
+    """Algorithm R over one chunk: offer its rows to the sample after `seen` earlier rows"""
+    capacity = len(sample)
+    fill = max(0, min(capacity - seen, len(values)))
+    sample[seen:seen + fill] = values[:fill]
+    rest = values[fill:]
+    if len(rest):
+        slots = rng.integers(0, seen + fill + np.arange(1, len(rest) + 1))
+        keep = slots < capacity
+        sample[slots[keep]] = rest[keep]
+
+
+def scan(source, task='binary', chunk_size=CHUNK_SIZE, reservoir_rows=RESERVOIR_ROWS, max_bins=MAX_BINS,
+         random_state=42):
+    """First pass: rows, classes, zones, categories, and bin thresholds / means from a reservoir sample"""
+    from .models import TASKS
+
+    if task not in TASKS:
+        raise ValueError(f"Unknown task '{task}'. Choose from {list(TASKS)}")
+    rng = np.random.default_rng(random_state)
+    n_rows, class_counts, zones = 0, {}, set()
+    columns = None
+    for chunk, y in task_chunks(source, task, chunk_size):
+        if columns is None:
+            columns = boosting_columns(chunk)
+            numeric = [col for col in columns if col not in CATEGORICAL_COLS]
+            categories = {col: set() for col in columns if col in CATEGORICAL_COLS}
+            sample = np.empty((reservoir_rows, len(numeric)))
+        reservoir_update(sample, chunk[numeric].to_numpy(np.float64), n_rows, rng)
+        n_rows += len(chunk)
+        for label, count in zip(*np.unique(y, return_counts=True)):
+            class_counts[label] = class_counts.get(label, 0) + int(count)
+        zones.update(np.unique(chunk[ZONE_COL].to_numpy()).tolist())
+        for col in categories:
+            categories[col].update(chunk[col].dropna().astype(str).unique())
+    if not n_rows:
+        raise ValueError(f"The stream has no rows for the {task} task")
+
+    thresholds, means = {}, {}
+    for j, col in enumerate(numeric):  # column by column: no full-size temporaries of the sample
+        values = sample[:min(n_rows, reservoir_rows), j]
+        values = values[np.abs(values) < FILL_VALUE_LIMIT]
+        thresholds[col] = bin_thresholds(values, max_bins)
+        means[col] = values.mean() if len(values) else 0.0
+    classes = np.array(sorted(class_counts))
+    return {
+        'n_rows': n_rows,
+        'classes': classes,
+        'class_counts': np.array([class_counts[label] for label in classes]),
+        'zones': np.array(sorted(zones)),
+        'columns': columns,
+        'numeric': numeric,
+        'categories': {col: sorted(values) for col, values in categories.items()},
+        'thresholds': thresholds,
+        'means': means
+    }
+
+
+def shuffle_buffer(batches, chunk_size, buffer_rows, rng):
+    """Shuffle (X, y, fold) batches of at most buffer_rows rows through a fixed pool
+
+    Once the pool is full, each batch takes the place of as many random
+    pool rows, which are emitted instead (memory: one pool, one batch).
+    """
+    pool, size = None, 0
+    for batch in batches:
+        if pool is None:
+            pool = tuple(np.empty((buffer_rows, *values.shape[1:]), dtype=values.dtype) for values in batch)
+        fill = min(buffer_rows - size, len(batch[0]))
+        for stored, values in zip(pool, batch):
+            stored[size:size + fill] = values[:fill]
+        size += fill
+        rest = tuple(values[fill:] for values in batch)
+        if len(rest[0]):
+            slots = rng.choice(buffer_rows, len(rest[0]), replace=False)
+            yield tuple(stored[slots] for stored in pool)
+            for stored, values in zip(pool, rest):
+                stored[slots] = values
+    if pool is not None:
+        order = rng.permutation(size)
+        for start in range(0, size, chunk_size):
+            yield tuple(stored[order[start:start + chunk_size]] for stored in pool)
+
+
+# ==================== FOLDS ====================
+class StreamFolds:
+    """Seeded fold of every streamed row: its zone (spatial) or a per-class round robin (stratified)"""
+
+    def __init__(self, strategy, summary, n_splits=10, random_state=42):
+        if strategy not in ('stratified', 'spatial'):
+            raise ValueError(f"Streaming CV supports 'stratified' and 'spatial', not '{strategy}'")
+        self.strategy = strategy
+        self.zones, self.classes = summary['zones'], summary['classes']
+        self.n_splits = len(self.zones) if strategy == 'spatial' else n_splits
+        self.random_state = random_state
+        self.reset()
+
+    def reset(self):
+        """Restart the assignment; call once per pass so every pass gets the same folds"""
+        self._rng = np.random.default_rng(self.random_state)
+        self._next = self._rng.integers(0, self.n_splits, len(self.classes))
+
+    def assign(self, chunk, y):
+        """int8 fold of every row of the next chunk"""
+        if self.strategy == 'spatial':
+            return np.searchsorted(self.zones, chunk[ZONE_COL].to_numpy()).astype(np.int8)
+        codes = np.searchsorted(self.classes, y)
+        folds = np.empty(len(y), dtype=np.int8)
+        for k in np.unique(codes):
+            rows = np.flatnonzero(codes == k)
+            rows = rows[self._rng.permutation(len(rows))]
+            folds[rows] = (self._next[k] + np.arange(len(rows))) % self.n_splits
+            self._next[k] = (self._next[k] + len(rows)) % self.n_splits
+        return folds
+
+
+def labelled_chunks(source, task, folds, chunk_size=CHUNK_SIZE):
+    """(chunk, target, fold) triples of one pass over the stream"""
+    folds.reset()
+    for chunk, y in task_chunks(source, task, chunk_size):
+        yield chunk, y, folds.assign(chunk, y)
+
+
+# ==================== METRICS ====================
+def _ratio(numerator, denominator):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / denominator, 0.0)
+
+
+def histogram_auc(histogram):
+    """ROC AUC per fold from (folds, 2, bins) negative / positive score counts, ties in a bin as one half"""
+    negatives, positives = histogram[:, 0].astype(np.float64), histogram[:, 1].astype(np.float64)
+    below = np.cumsum(negatives, axis=1) - negatives
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (positives * (below + 0.5 * negatives)).sum(axis=1) / (positives.sum(axis=1) * negatives.sum(axis=1))
+
+
+class FoldMetrics:
+    """Per-fold confusion counts (plus score histograms for presence) of held-out predictions"""
+
+    def __init__(self, task, n_folds, n_classes, score_bins=SCORE_BINS):
+        self.task = task
+        self.confusion = np.zeros((n_folds, n_classes, n_classes), dtype=np.int64)
+        self.histogram = np.zeros((n_folds, 2, score_bins), dtype=np.int64) if task == 'binary' else None
+
+    def update(self, fold, y_codes, proba, margin):
+        """Add the held-out rows of one fold (class codes, class probabilities, positive-class margin)"""
+        k = self.confusion.shape[1]
+        cells = y_codes * k + proba.argmax(axis=1)
+        self.confusion[fold] += np.bincount(cells, minlength=k * k).reshape(k, k)
+        if self.histogram is not None:
+            bins = self.histogram.shape[2]
+            scaled = (np.arcsinh(margin) + SCORE_RANGE) / (2 * SCORE_RANGE) * bins
+            score_bin = np.clip(scaled, 0, bins - 1).astype(np.int64)
+            self.histogram[fold] += np.bincount(y_codes * bins + score_bin, minlength=2 * bins).reshape(2, bins)
+
+    def fold_scores(self):
+        """{metric: value per fold} with the metric keys of runs.SCORING"""
+        confusion = self.confusion.astype(np.float64)
+        n = confusion.sum(axis=(1, 2))
+        tp = np.diagonal(confusion, axis1=1, axis2=2)
+        support, predicted = confusion.sum(axis=2), confusion.sum(axis=1)
+        precision, recall = _ratio(tp, predicted), _ratio(tp, support)
+        f1 = _ratio(2 * precision * recall, precision + recall)
+        accuracy = tp.sum(axis=1) / n
+        if self.task == 'binary':
+            return {'accuracy': accuracy, 'precision': precision[:, 1], 'recall': recall[:, 1], 'f1': f1[:, 1],
+                    'roc_auc': histogram_auc(self.histogram)}
+        present = (support > 0) | (predicted > 0)  # sklearn averages over labels seen in y_true or y_pred
+        return {
+            'accuracy': accuracy,
+            'precision_weighted': (precision * support).sum(axis=1) / n,
+            'recall_weighted': (recall * support).sum(axis=1) / n,
+            'f1_macro': np.where(present, f1, 0.0).sum(axis=1) / present.sum(axis=1)
+        }
+
+
+# ==================== SGD (PARTIAL FIT) ====================
+def design_matrix(chunk, numeric, categories):
+    """float64 numeric predictors (fill values as NaN) followed by one-hot categoricals"""
+    X = chunk[numeric].to_numpy(np.float64, copy=True)
+    X[~(np.abs(X) < FILL_VALUE_LIMIT)] = np.nan
+    onehot = [chunk[col].astype(str).to_numpy()[:, np.newaxis] == np.array(values)
+              for col, values in categories.items()]
+    return np.hstack([X, *onehot])
+
+
+def column_moments(X):
+    """Finite count, sum and sum of squares of every column"""
+    finite = np.isfinite(X)
+    X = np.where(finite, X, 0.0)
+    return np.stack([finite.sum(axis=0), X.sum(axis=0), (X * X).sum(axis=0)])
+
+
+def standardisation(moments, shift):
+    """Mean and scale from column_moments of shifted values (the shift keeps the sums well conditioned)"""
+    count, total, squares = moments
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, total / count, 0.0)
+        scale = np.sqrt(np.maximum(np.where(count > 0, squares / count, 0.0) - mean ** 2, 0.0))
+    return shift + mean, np.where(scale > 0, scale, 1.0)
+
+
+class StreamingLinear:
+    """Log-loss SGD classifier on standardised design rows; missing values take the training mean"""
+
+    def __init__(self, classes, mean, scale, numeric, categories, alpha=1e-4, average=False, random_state=42):
+        from sklearn.linear_model import SGDClassifier
+
+        self.classes_ = classes
+        self.mean, self.scale = mean, scale
+        self.numeric, self.categories = numeric, categories
+        self.model = SGDClassifier(loss='log_loss', alpha=alpha, average=average, random_state=random_state)
+
+    def _standardise(self, X):
+        Z = (X - self.mean) / self.scale
+        Z[np.isnan(Z)] = 0.0
+        return Z
+
+    def partial_fit(self, X, y):
+        """One SGD epoch over a batch of design rows"""
+        self.model.partial_fit(self._standardise(X), y, classes=self.classes_)
+        return self
+
+    def design_scores(self, X):
+        """Class probabilities and the positive-class margin (binary) of design rows"""
+        Z = self._standardise(X)
+        margin = self.model.decision_function(Z) if len(self.classes_) == 2 else None
+        return self.model.predict_proba(Z), margin
+
+    def predict_proba(self, rows):
+        """Class probabilities of raw feature rows (e.g. a prediction grid chunk)"""
+        return self.design_scores(design_matrix(rows, self.numeric, self.categories))[0]
+
+
+def train_linear(source, task='binary', cv_strategy='spatial', summary=None, chunk_size=CHUNK_SIZE,
+                 shuffle_rows=SHUFFLE_ROWS, random_state=42, epochs=10, alpha=1e-4, average=True):
+    """Streamed CV and full fit of the SGD learner; returns (full model, FoldMetrics)"""
+    summary = summary if summary is not None else scan(source, task, chunk_size, random_state=random_state)
+    folds = StreamFolds(cv_strategy, summary, random_state=random_state)
+    numeric, categories, classes = summary['numeric'], summary['categories'], summary['classes']
+    shift = np.r_[[summary['means'][col] for col in numeric],
+                  np.zeros(sum(len(values) for values in categories.values()))]
+
+    def batches():
+        for chunk, y, fold in labelled_chunks(source, task, folds, chunk_size):
+            yield design_matrix(chunk, numeric, categories), y, fold
+
+    moments = np.zeros((folds.n_splits, 3, len(shift)))
+    for X, _, fold in batches():
+        for f in np.unique(fold):
+            moments[f] += column_moments(X[fold == f] - shift)
+    total = moments.sum(axis=0)
+    # Fold models first; the full model (index n_splits) never matches a fold, so it sees every row
+    models = [StreamingLinear(classes, *standardisation(total - moments[f], shift), numeric, categories,
+                              alpha, average, random_state) for f in range(folds.n_splits)]
+    models.append(StreamingLinear(classes, *standardisation(total, shift), numeric, categories, alpha,
+                                  average, random_state))
+
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        for X, y, fold in shuffle_buffer(batches(), chunk_size, max(shuffle_rows, chunk_size), rng):
+            for m, model in enumerate(models):
+                train = fold != m
+                if train.any():
+                    model.partial_fit(X[train], y[train])
+
+    metrics = FoldMetrics(task, folds.n_splits, len(classes))
+    for X, y, fold in batches():
+        codes = np.searchsorted(classes, y)
+        for f in np.unique(fold):
+            rows = fold == f
+            metrics.update(f, codes[rows], *models[f].design_scores(X[rows]))
+    return models[-1], metrics
+
+
+# ==================== HISTOGRAM BOOSTING ====================
+class BinnedStream:
+    """uint8 bin codes, class codes and folds of a task's rows in on-disk .npy memmaps"""
+
+    def __init__(self, directory, n_rows, n_features):
+        from numpy.lib.format import open_memmap
+
+        self.directory = Path(directory)
+        self.codes = open_memmap(self.directory / 'codes.npy', mode='w+', dtype=np.uint8,
+                                 shape=(n_rows, n_features))
+        self.y = open_memmap(self.directory / 'classes.npy', mode='w+', dtype=np.int16, shape=(n_rows,))
+        self.fold = open_memmap(self.directory / 'folds.npy', mode='w+', dtype=np.int8, shape=(n_rows,))
+
+    def __len__(self):
+        return len(self.y)
+
+    def slices(self, chunk_size=BOOSTING_CHUNK):
+        for start in range(0, len(self), chunk_size):
+            yield slice(start, min(start + chunk_size, len(self)))
+
+    def margins(self, baseline, chunk_size=BOOSTING_CHUNK):
+        """Fresh on-disk (rows, outputs) margin file filled with the baseline"""
+        from numpy.lib.format import open_memmap
+
+        margins = open_memmap(self.directory / 'margins.npy', mode='w+', dtype=np.float64,
+                              shape=(len(self), len(baseline)))
+        for rows in self.slices(chunk_size):
+            margins[rows] = baseline
+        return margins
+
+
+def stream_binning(summary):
+    """Scanned thresholds and categories as a BinnedDataset without codes (it only encodes chunks)"""
+    return BinnedDataset(None, summary['columns'], summary['thresholds'], summary['categories'])
+
+
+def tree_leaves(tree, codes, levels=None):
+    """Node of every row after `levels` levels (default: its leaf) in each of the K trees, shape (rows, K)"""
+    feature, split_bin, missing_left = tree[:3]
+    outputs = np.arange(len(feature))
+    levels = int(np.log2(feature.shape[1] + 1)) if levels is None else levels
+    rows = np.arange(len(codes))[:, np.newaxis]
+    node = np.zeros((len(codes), len(feature)), dtype=np.intp)
+    for level in range(levels):
+        position = (1 << level) - 1 + node
+        f = feature[outputs, position]
+        code = codes[rows, np.maximum(f, 0)]
+        right = np.where(code == MISSING_CODE, ~missing_left[outputs, position], code > split_bin[outputs, position])
+        node = 2 * node + (right & (f >= 0))
+    return node
+
+
+class StreamingBooster:
+    """Gradient boosting grown level by level from streamed gradient / hessian histograms
+
+    Binary log loss (one output) or softmax (one tree per class and
+    iteration). A node without a valid split sends every row left, so all
+    trees are complete with 2**max_depth leaves. The Substrate codes are
+    split like ordered bins.
+    """
+
+    def __init__(self, binning, classes, n_trees=100, max_depth=4, learning_rate=0.1, l2_regularization=1.0,
+                 min_samples_leaf=20):
+        self.binning = binning
+        self.classes_ = np.asarray(classes)
+        self.n_outputs = 1 if len(self.classes_) == 2 else len(self.classes_)
+        self.n_trees, self.max_depth, self.learning_rate = n_trees, max_depth, learning_rate
+        self.l2_regularization, self.min_samples_leaf = l2_regularization, min_samples_leaf
+        self.baseline = None
+        self.trees = []
+
+    # ---------- link ----------
+    def probabilities(self, margins):
+        """Class probabilities from (rows, outputs) margins"""
+        if self.n_outputs == 1:
+            p = 1 / (1 + np.exp(-margins[:, 0]))
+            return np.column_stack([1 - p, p])
+        exp = np.exp(margins - margins.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def _gradients(self, margins, y):
+        proba = self.probabilities(margins)
+        if self.n_outputs == 1:
+            proba, target = proba[:, 1:], (y == 1)[:, np.newaxis]
+        else:
+            target = y[:, np.newaxis] == np.arange(self.n_outputs)
+        return proba - target, np.maximum(proba * (1 - proba), 1e-16)
+
+    def _leaf_values(self, tree, codes):
+        return tree[3][np.arange(self.n_outputs), tree_leaves(tree, codes)]
+
+    def decision_function(self, codes):
+        """(rows, outputs) margins of bin codes"""
+        margins = np.tile(self.baseline, (len(codes), 1))
+        for tree in self.trees:
+            margins += self._leaf_values(tree, codes)
+        return margins
+
+    def predict_proba(self, rows):
+        """Class probabilities of raw feature rows, binned with the training thresholds"""
+        return self.probabilities(self.decision_function(self.binning.encode(rows)))
+
+    # ---------- growing ----------
+    def _best_split(self, G, H, N):
+        """(feature, bin, missing_left, left sums, right sums) of a node's (features, bins) histograms, or None"""
+        l2, min_rows = self.l2_regularization, self.min_samples_leaf
+        GL, HL, NL = (np.cumsum(hist[:, :MISSING_CODE], axis=1) for hist in (G, H, N))
+        Gm, Hm, Nm = (hist[:, MISSING_CODE, np.newaxis] for hist in (G, H, N))
+        Gt, Ht, Nt = GL[0, -1] + Gm[0, 0], HL[0, -1] + Hm[0, 0], NL[0, -1] + Nm[0, 0]
+        if Nt < 2 * min_rows:
+            return None
+        parent = Gt ** 2 / (Ht + l2)
+        best = None
+        for missing_left in (False, True):
+            gl, hl, nl = (GL + Gm, HL + Hm, NL + Nm) if missing_left else (GL, HL, NL)
+            gr, hr, nr = Gt - gl, Ht - hl, Nt - nl
+            gain = gl ** 2 / (hl + l2) + gr ** 2 / (hr + l2) - parent
+            valid = (nl >= min_rows) & (nr >= min_rows) & (hl >= MIN_HESSIAN) & (hr >= MIN_HESSIAN)
+            gain = np.where(valid, gain, -np.inf)
+            top = gain.max()
+            # Near-ties go to the first feature / bin, so the chunking (summation order) cannot flip a split
+            j, b = np.unravel_index(np.argmax(gain >= top - 1e-9 * abs(top)), gain.shape)
+            if top > 1e-12 and (best is None or top > best[0] * (1 + 1e-9)):
+                best = (gain[j, b], j, b, missing_left, (gl[j, b], hl[j, b]), (gr[j, b], hr[j, b]))
+        return None if best is None else best[1:]
+
+    def _split_level(self, tree, level, hist):
+        """Choose the splits of one level from (3, outputs, nodes, features, bins) histograms"""
+        feature, split_bin, missing_left, leaves = tree
+        last = level == self.max_depth - 1
+
+        def value(sums):
+            return -self.learning_rate * sums[0] / (sums[1] + self.l2_regularization)
+
+        for k in range(self.n_outputs):
+            for i in range(1 << level):
+                G, H, N = hist[:, k, i]
+                best = self._best_split(G, H, N)
+                if best is None:
+                    if last:
+                        leaves[k, 2 * i] = value((G[0].sum(), H[0].sum()))
+                    continue
+                position = (1 << level) - 1 + i
+                feature[k, position], split_bin[k, position], missing_left[k, position] = best[:3]
+                if last:
+                    leaves[k, 2 * i], leaves[k, 2 * i + 1] = value(best[3]), value(best[4])
+
+    def fit(self, stream, holdout=-1, chunk_size=BOOSTING_CHUNK):
+        """Grow the trees on the rows outside fold `holdout` (-1: every row); leaves final margins in the stream"""
+        K, depth, p, n_bins = self.n_outputs, self.max_depth, stream.codes.shape[1], MISSING_CODE + 1
+        counts = np.zeros(len(self.classes_))
+        for rows in stream.slices(chunk_size):
+            counts += np.bincount(stream.y[rows][stream.fold[rows] != holdout], minlength=len(counts))
+        prior = np.maximum(counts / counts.sum(), 1e-12)
+        self.baseline = np.log(prior[1:] / prior[:1]) if K == 1 else np.log(prior)
+        margins = stream.margins(self.baseline, chunk_size)
+        cells = np.arange(p) * n_bins
+
+        self.trees = []
+        for _ in range(self.n_trees):
+            tree = (np.full((K, 2 ** depth - 1), -1, dtype=np.int16), np.zeros((K, 2 ** depth - 1), dtype=np.uint8),
+                    np.ones((K, 2 ** depth - 1), dtype=bool), np.zeros((K, 2 ** depth)))
+            for level in range(depth):
+                size = (1 << level) * p * n_bins
+                hist = np.zeros((3, K, size))
+                for rows in stream.slices(chunk_size):
+                    if level == 0 and self.trees:
+                        margins[rows] += self._leaf_values(self.trees[-1], stream.codes[rows])
+                    train = stream.fold[rows] != holdout
+                    if not train.any():
+                        continue
+                    codes = stream.codes[rows][train]
+                    g, h = self._gradients(margins[rows][train], stream.y[rows][train])
+                    node = tree_leaves(tree, codes, level)
+                    flat_cells = (cells + codes).ravel()
+                    for k in range(K):
+                        flat = np.repeat(node[:, k] * (p * n_bins), p) + flat_cells
+                        hist[0, k] += np.bincount(flat, np.repeat(g[:, k], p), minlength=size)
+                        hist[1, k] += np.bincount(flat, np.repeat(h[:, k], p), minlength=size)
+                        hist[2, k] += np.bincount(flat, minlength=size)
+                self._split_level(tree, level, hist.reshape(3, K, 1 << level, p, n_bins))
+            self.trees.append(tree)
+
+        for rows in stream.slices(chunk_size):
+            margins[rows] += self._leaf_values(self.trees[-1], stream.codes[rows])
+        self.margins_ = margins
+        return self
+
+
+def train_booster(source, task='binary', cv_strategy='spatial', summary=None, chunk_size=CHUNK_SIZE,
+                  work_dir=None, random_state=42, **params):
+    """Streamed CV and full fit of the histogram booster; returns (full model, FoldMetrics)"""
+    summary = summary if summary is not None else scan(source, task, chunk_size, random_state=random_state)
+    folds = StreamFolds(cv_strategy, summary, random_state=random_state)
+    binning = stream_binning(summary)
+    classes = summary['classes']
+    metrics = FoldMetrics(task, folds.n_splits, len(classes))
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as directory:
+        stream = BinnedStream(directory, summary['n_rows'], len(binning.columns))
+        start = 0
+        for chunk, y, fold in labelled_chunks(source, task, folds, chunk_size):
+            end = start + len(chunk)
+            stream.codes[start:end] = binning.encode(chunk)
+            stream.y[start:end] = np.searchsorted(classes, y)
+            stream.fold[start:end] = fold
+            start = end
+
+        for f in range(folds.n_splits):
+            model = StreamingBooster(binning, classes, **params).fit(stream, holdout=f)
+            for rows in stream.slices():
+                held_out = stream.fold[rows] == f
+                if held_out.any():
+                    margins = model.margins_[rows][held_out]
+                    metrics.update(f, stream.y[rows][held_out], model.probabilities(margins), margins[:, 0])
+            del model.margins_
+        full = StreamingBooster(binning, classes, **params).fit(stream)
+        del full.margins_, stream
+    return full, metrics
+
+
+# ==================== PROTOCOL ====================
+def stream_cv(source, learner='sgd', task='binary', cv_strategy='spatial', chunk_size=CHUNK_SIZE,
+              random_state=42, **params):
+    """Scan the stream, then cross-validate and fit one learner; returns a result dict"""
+    if learner not in LEARNERS:
+        raise ValueError(f"Unknown streaming learner '{learner}'. Choose from {list(LEARNERS)}")
+    params = {**STREAM_PARAMS[learner], **params}
+    start = time.perf_counter()
+    summary = scan(source, task, chunk_size, random_state=random_state)
+    train = train_linear if learner == 'sgd' else train_booster
+    model, metrics = train(source, task, cv_strategy, summary, chunk_size, random_state=random_state, **params)
+    return {
+        'learner': learner,
+        'model': model,
+        'metrics': metrics,
+        'n_rows': summary['n_rows'],
+        'n_folds': len(metrics.confusion),
+        'seconds': time.perf_counter() - start,
+        'config': {'learner': learner, 'params': params, 'chunk_size': chunk_size,
+                   'source': source if not isinstance(source, pd.DataFrame) else 'dataframe',
+                   'n_rows': summary['n_rows'], 'n_features': len(summary['columns'])}
+    }
+
+
+def record_stream_run(result, task, cv_strategy, store=None):
+    """Record a streamed CV result in the run store as model '<learner>_stream' (no OOF predictions)"""
+    from .runs import get_run_store
+
+    store = store if store is not None else get_run_store()
+    learner = result['learner']
+    return store.record(task, f'{learner}_stream', cv_strategy, result['metrics'].fold_scores(),
+                        model_name=LEARNERS[learner], config=result['config'], total_seconds=result['seconds'])
+
+
+def fold_means(result, task):
+    """Mean per-fold score of a streamed result, labelled like the results tables"""
+    from .runs import SCORING
+
+    scores = result['metrics'].fold_scores()
+    return {label: float(np.nanmean(scores[metric])) for metric, label in SCORING[task].items()}
+
+
+# ==================== BENCHMARK ====================
+def in_memory_reference(path, learner, task, cv_strategy, random_state=42):
+    """The same protocol with sklearn on the fully loaded file: SGD pipeline or HistGradientBoosting"""
+    from sklearn.model_selection import cross_validate
+
+    from .cv import make_cv
+    from .models import make_model, task_data
+    from .runs import SCORING
+    from .scoring import read_table
+
+    df = read_table(path)
+    rows, X, y = task_data(df, task)
+    X = X.mask(X.abs() > FILL_VALUE_LIMIT)
+    if learner == 'sgd':
+        from sklearn.impute import SimpleImputer
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        model = make_pipeline(SimpleImputer(), StandardScaler(),
+                              SGDClassifier(loss='log_loss', random_state=random_state))
+    else:
+        model = make_model('hgb', random_state)
+    cv, groups = make_cv(rows, cv_strategy, random_state=random_state)
+    scores = cross_validate(model, X, y, groups=groups, cv=cv, scoring=list(SCORING[task]), n_jobs=1)
+    model.fit(X, y)
+    return {label: scores[f'test_{metric}'].mean() for metric, label in SCORING[task].items()}
+
+
+def benchmark(path, task='binary', cv_strategy='spatial', learners=tuple(LEARNERS), chunk_sizes=(1000, CHUNK_SIZE)):
+    """Peak traced memory, time and CV scores: streamed per chunk size vs in-memory sklearn
+
+    tracemalloc sees NumPy / pandas allocations but not pyarrow's buffers,
+    so compare memory on CSV input.
+    """
+    import tracemalloc
+
+    rows = []
+
+    def measure(label, learner, chunk_size, run):
+        tracemalloc.start()
+        start = time.perf_counter()
+        scores = run()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rows.append({'Learner': label, 'Chunk': chunk_size, 'Peak MB': peak / 2 ** 20, 'Seconds': seconds,
+                     **scores})
+
+    for learner in learners:
+        for chunk_size in chunk_sizes:
+            measure(LEARNERS[learner], learner, chunk_size,
+                    lambda: fold_means(stream_cv(path, learner, task, cv_strategy, chunk_size), task))
+        reference = 'SGD pipeline (in memory)' if learner == 'sgd' else 'HistGradientBoosting (in memory)'
+        measure(reference, learner, 'all', lambda: in_memory_reference(path, learner, task, cv_strategy))
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    """Cross-validate the streamed learners on a file, benchmark them, or record their runs"""
+    parser = argparse.ArgumentParser(description="Out-of-core incremental training and cross-validation")
+    parser.add_argument('input', nargs='?', default=str(DATA_DIR / MERGED_FILE),
+                        help="Feature rows (.parquet, .csv, .tsv or .txt) with targets and zones")
+    parser.add_argument('--task', choices=['binary', 'family'], default='binary')
+    parser.add_argument('--cv', choices=['stratified', 'spatial'], default='spatial')
+    parser.add_argument('--learner', choices=[*LEARNERS, 'all'], default='all')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--benchmark', action='store_true', help="Peak memory / time vs in-memory sklearn")
+    parser.add_argument('--record', action='store_true', help="Record the streamed runs in the run store")
+    args = parser.parse_args(argv)
+    learners = list(LEARNERS) if args.learner == 'all' else [args.learner]
+
+    if args.benchmark:
+        table = benchmark(args.input, args.task, args.cv, learners, sorted({1000, args.chunk_size}))
+        print(f"🌊 {args.task} task, {args.cv} CV, {args.input}")
+        print(table.round(4).to_string(index=False))
+        return
+
+    for learner in learners:
+        result = stream_cv(args.input, learner, args.task, args.cv, args.chunk_size)
+        print(f"🌊 {LEARNERS[learner]}: {result['n_rows']:,} rows, {result['n_folds']} folds ({args.cv}), "
+              f"chunks of {args.chunk_size:,} in {result['seconds']:.1f}s")
+        for label, value in fold_means(result, args.task).items():
+            print(f"   {label:<10} {value:.4f}")
+        if args.record:
+            run_id = record_stream_run(result, args.task, args.cv)
+            print(f"✅ Run {run_id}")
+
+
+if __name__ == '__main__':
+    main()
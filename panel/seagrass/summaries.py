@@ -0,0 +1,408 @@
+"""
+Mergeable Statistics - Mediterranean Seagrass Intelligence Panel
+
+The statistics of the Variables page as summary states that are computed
+per data partition and merged on demand:
+
+- Moments: count, mean, M2 (sum of squared deviations), min and max per
+  column, merged with the pairwise update of Chan et al.;
+- QuantileSketch: sorted weighted centroids per column. It is exact up to
+  ``capacity`` values and then averages equal-weight neighbours into
+  capacity / 2 centroids (rank error about 2 / capacity). Quantiles
+  interpolate between centroid centres like ``DataFrame.describe``;
+- count tables per zone, family, substrate and presence;
+- CoMoments: row count, means and co-moment matrix of the numeric columns
+  (complete rows), merged exactly and turned into Pearson correlations.
+
+States are kept per presence class, so the overall statistics are the
+merge of the two classes and the per-class tables come for free.
+``partition_states`` splits the dataset into fixed row blocks, keys each
+block by the hash of its rows and caches its state in ``data/stats/``;
+``dataset_state`` also caches the merge of the full leading blocks.
+Appending rows then hashes the rows (one vectorised pass), recomputes the
+last block and the new ones, and merges them into the cached prefix.
+Rank statistics (Spearman correlation) cannot be merged, so the page
+still computes them from the rows.
+
+Usage (from the panel folder):
+    python -m seagrass.summaries                     # merged describe table of the dataset
+    python -m seagrass.summaries --benchmark 300     # append 300 rows: cached partitions vs full recompute
+    python -m seagrass.summaries --benchmark 300 --rows 200000
+"""
+
+import argparse
+import hashlib
+import pickle
+import time
+from functools import reduce
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dataset import BINARY_TARGET, DATA_DIR, FAMILY_TARGET, ZONE_COL
+
+STATS_DIR = 'stats'
+CAPACITY = 2048  # centroids per column before compaction
+BLOCK_ROWS = 1024  # rows per cached partition
+COUNT_COLS = (ZONE_COL, FAMILY_TARGET, 'Substrate', BINARY_TARGET)
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def numeric_columns(df):
+    """Numeric columns summarised (the page's "All Numerical Variables")"""
+    return df.select_dtypes(include=np.number).columns.tolist()
+
+
+# ==================== MOMENTS ====================
+class Moments:
+    """Count, mean, M2 (sum of squared deviations), min and max per column, NaN ignored"""
+
+    def __init__(self, count, mean, m2, minimum, maximum):
+        self.count, self.mean, self.m2 = count, mean, m2
+        self.minimum, self.maximum = minimum, maximum
+
+    @classmethod
+    def from_values(cls, values):
+        """Moments of the columns of a 2-D float array"""
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, values, 0.0).sum(axis=0) / count
+        m2 = (np.where(valid, values - mean, 0.0) ** 2).sum(axis=0)
+        minimum = np.where(valid, values, np.inf).min(axis=0)
+        maximum = np.where(valid, values, -np.inf).max(axis=0)
+        return cls(count, mean, m2, minimum, maximum)
+
+    def merge(self, other):
+        """Moments of the union of both row sets"""
+        count = self.count + other.count
+        both = (self.count > 0) & (other.count > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            share = other.count / count
+            mean = np.where(both, self.mean + delta * share, np.where(self.count > 0, self.mean, other.mean))
+            m2 = self.m2 + other.m2 + np.where(both, delta ** 2 * self.count * share, 0.0)
+        return Moments(count, mean, m2, np.minimum(self.minimum, other.minimum),
+                       np.maximum(self.maximum, other.maximum))
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, as pandas)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+
+# ==================== QUANTILES ====================
+def compact(values, weights, capacity):
+    """Sorted weighted values -> at most capacity centroids (neighbours of equal total weight averaged)"""
+    if len(values) <= capacity:
+        return values, weights
+    n_buckets = max(int(capacity) // 2, 1)
+    before = np.cumsum(weights) - weights
+    bucket = np.minimum((before / weights.sum() * n_buckets).astype(np.int64), n_buckets - 1)
+    total = np.bincount(bucket, weights, minlength=n_buckets)
+    moment = np.bincount(bucket, weights * values, minlength=n_buckets)
+    keep = total > 0
+    return moment[keep] / total[keep], total[keep]
+
+
+class QuantileSketch:
+    """(values, weights) centroids per column, values sorted"""
+
+    def __init__(self, centroids, capacity=CAPACITY):
+        self.centroids = centroids
+        self.capacity = capacity
+
+    @classmethod
+    def from_values(cls, values, capacity=CAPACITY):
+        """Sketch of the columns of a 2-D float array"""
+        centroids = []
+        for column in values.T:
+            column = np.sort(column[~np.isnan(column)])
+            centroids.append(compact(column, np.ones(len(column)), capacity))
+        return cls(centroids, capacity)
+
+    def merge(self, other, capacity=None):
+        """Sketch of the union of both row sets (compacted beyond capacity; np.inf keeps it exact)"""
+        capacity = self.capacity if capacity is None else capacity
+        merged = []
+        for (values_a, weights_a), (values_b, weights_b) in zip(self.centroids, other.centroids):
+            values = np.concatenate([values_a, values_b])
+            order = np.argsort(values, kind='stable')
+            merged.append(compact(values[order], np.concatenate([weights_a, weights_b])[order], capacity))
+        return QuantileSketch(merged, self.capacity)
+
+    def quantiles(self, qs=QUANTILES):
+        """len(qs) x columns array, linear interpolation between centroid centres (exact while uncompacted)"""
+        qs = np.asarray(qs, dtype=np.float64)
+        out = np.full((len(qs), len(self.centroids)), np.nan)
+        for j, (values, weights) in enumerate(self.centroids):
+            if len(values):
+                centres = np.cumsum(weights) - weights / 2
+                out[:, j] = np.interp(qs * (weights.sum() - 1) + 0.5, centres, values)
+        return out
+
+
+# ==================== CO-MOMENTS ====================
+class CoMoments:
+    """Row count, column means and co-moment matrix (sum of outer products of deviations) of complete rows"""
+
+    def __init__(self, count, mean, comoment):
+        self.count, self.mean, self.comoment = count, mean, comoment
+
+    @classmethod
+    def from_values(cls, values):
+        """Co-moments of the rows of a 2-D float array without NaN"""
+        values = values[~np.isnan(values).any(axis=1)]
+        mean = values.mean(axis=0) if len(values) else np.zeros(values.shape[1])
+        centred = values - mean
+        return cls(len(values), mean, centred.T @ centred)
+
+    def merge(self, other):
+        """Co-moments of the union of both row sets"""
+        if self.count == 0 or other.count == 0:
+            return other if self.count == 0 else self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return CoMoments(count, self.mean + delta * other.count / count,
+                         self.comoment + other.comoment + np.outer(delta, delta) * self.count * other.count / count)
+
+    def correlation(self):
+        """Pearson correlation matrix (NaN for constant columns)"""
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.comoment / np.outer(scale, scale)
+
+
+# ==================== SUMMARY ====================
+class Summary:
+    """Mergeable statistics of a set of rows: moments, quantile sketch, co-moments and count tables"""
+
+    def __init__(self, columns, moments, sketch, comoments, counts):
+        self.columns = columns
+        self.moments = moments
+        self.sketch = sketch
+        self.comoments = comoments
+        self.counts = counts
+
+    @classmethod
+    def from_frame(cls, frame, columns, capacity=CAPACITY):
+        """Summary of the given numeric columns (and the count columns) of a dataframe"""
+        values = frame[columns].to_numpy(np.float64)
+        counts = {col: frame[col].value_counts() for col in COUNT_COLS if col in frame.columns}
+        return cls(list(columns), Moments.from_values(values), QuantileSketch.from_values(values, capacity),
+                   CoMoments.from_values(values), counts)
+
+    def merge(self, other, capacity=None):
+        """Summary of the union of both row sets"""
+        if self.columns != other.columns:
+            raise ValueError("Summaries over different columns cannot be merged")
+        counts = {col: self.counts[col].add(other.counts[col], fill_value=0).astype(np.int64)
+                  for col in self.counts}
+        return Summary(self.columns, self.moments.merge(other.moments), self.sketch.merge(other.sketch, capacity),
+                       self.comoments.merge(other.comoments), counts)
+
+    def describe(self):
+        """count, mean, std, min, quartiles and max per column, laid out like DataFrame.describe().T"""
+        moments, quartiles = self.moments, self.sketch.quantiles(QUANTILES)
+        empty = moments.count == 0
+        return pd.DataFrame({
+            'count': moments.count.astype(np.float64),
+            'mean': moments.mean,
+            'std': moments.std,
+            'min': np.where(empty, np.nan, moments.minimum),
+            **{f'{q:.0%}': quartiles[i] for i, q in enumerate(QUANTILES)},
+            'max': np.where(empty, np.nan, moments.maximum)
+        }, index=pd.Index(self.columns))
+
+    def correlation(self, columns=None):
+        """Pearson correlation of the given (or all) columns from the merged co-moments"""
+        corr = pd.DataFrame(self.comoments.correlation(), index=self.columns, columns=self.columns)
+        return corr if columns is None else corr.loc[columns, columns]
+
+
+def summarize(frame, columns=None, capacity=CAPACITY):
+    """State of a set of rows: {presence class: Summary}"""
+    columns = numeric_columns(frame) if columns is None else list(columns)
+    return {bool(presence): Summary.from_frame(rows, columns, capacity)
+            for presence, rows in frame.groupby(BINARY_TARGET)}
+
+
+def merge_states(states, capacity=None):
+    """Merge {presence class: Summary} states class by class"""
+    merged = {}
+    for state in states:
+        for presence, summary in state.items():
+            merged[presence] = merged[presence].merge(summary, capacity) if presence in merged else summary
+    return merged
+
+
+def overall(state):
+    """Summary of every row: the presence classes merged without compaction"""
+    return reduce(lambda a, b: a.merge(b, capacity=np.inf), [state[presence] for presence in sorted(state)])
+
+
+# ==================== PARTITIONS ====================
+def block_keys(df, columns, capacity, block_rows=BLOCK_ROWS):
+    """Cache key of every row block: hash of its row hashes (one pass over df), columns and capacity"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    salt = f"{capacity}|{'|'.join(map(str, df.columns))}|{'|'.join(columns)}".encode()
+    return [hashlib.sha256(salt + row_hashes[start:start + block_rows].tobytes()).hexdigest()[:16]
+            for start in range(0, len(df), block_rows)]
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _write(path, state):
+    with open(path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def partition_states(df, data_dir=DATA_DIR, block_rows=BLOCK_ROWS, capacity=CAPACITY, first_block=0):
+    """State of every block_rows row block of df (from first_block), cached in data/stats/ -> (states, computed)"""
+    cache_dir = Path(data_dir) / STATS_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    columns = numeric_columns(df)
+    states, computed = [], 0
+    for i, key in enumerate(block_keys(df, columns, capacity, block_rows)[first_block:], start=first_block):
+        path = cache_dir / f'block-{key}.pkl'
+        if path.exists():
+            states.append(_read(path))
+            continue
+        states.append(summarize(df.iloc[i * block_rows:(i + 1) * block_rows], columns, capacity))
+        _write(path, states[-1])
+        computed += 1
+    return states, computed
+
+
+def dataset_state(df, data_dir=DATA_DIR, block_rows=BLOCK_ROWS, capacity=CAPACITY):
+    """Merged state of df -> (state, blocks computed)
+
+    The merge of the full leading blocks is cached as well (keyed by the chain of their
+    block keys), so an append reads that merge and only merges the blocks after it.
+    """
+    cache_dir = Path(data_dir) / STATS_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    keys = block_keys(df, numeric_columns(df), capacity, block_rows)
+    n_full = len(df) // block_rows
+    chain, chains = hashlib.sha256(), []
+    for key in keys[:n_full]:
+        chain.update(key.encode())
+        chains.append(chain.hexdigest()[:16])
+
+    done, prefix = 0, {}
+    for k in range(n_full, 0, -1):
+        path = cache_dir / f'prefix-{chains[k - 1]}.pkl'
+        if path.exists():
+            done, prefix = k, _read(path)
+            break
+    states, computed = partition_states(df, data_dir, block_rows, capacity, first_block=done)
+    if n_full > done:
+        prefix = merge_states([prefix, *states[:n_full - done]])
+        _write(cache_dir / f'prefix-{chains[-1]}.pkl', prefix)
+    state = merge_states([prefix, *states[n_full - done:]])
+
+    current = {f'block-{key}' for key in keys} | ({f'prefix-{chains[-1]}'} if chains else set())
+    for path in cache_dir.glob('*.pkl'):
+        if path.stem not in current:
+            path.unlink()
+    return state, computed
+
+
+# ==================== BENCHMARK ====================
+def append_rows(df, n_rows, random_state=0):
+    """df with n_rows resampled stations appended under new IDs (stand-in for newly collected records)"""
+    new = df.sample(n_rows, replace=True, random_state=random_state)
+    new = new.assign(ID=np.arange(n_rows) + df['ID'].max() + 1)
+    return pd.concat([df, new], ignore_index=True)
+
+
+def full_statistics(df, columns):
+    """Reference: the page's statistics recomputed from every row with pandas"""
+    return {
+        'describe': df[columns].describe().T,
+        'by_presence': df.groupby(BINARY_TARGET)[columns].describe(),
+        'pearson': df[columns].corr(),
+        'counts': {col: df[col].value_counts() for col in COUNT_COLS if col in df.columns}
+    }
+
+
+def benchmark(df, n_new=300, block_rows=BLOCK_ROWS, capacity=CAPACITY):
+    """Refresh time after appending n_new rows (cached partitions, full re-summary, pandas) and agreement"""
+    import tempfile
+
+    appended = append_rows(df, n_new)
+    columns = numeric_columns(df)
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_state(df, tmp, block_rows, capacity)
+        start = time.perf_counter()
+        state, computed = dataset_state(appended, tmp, block_rows, capacity)
+        merged = overall(state)
+        incremental = time.perf_counter() - start
+
+    start = time.perf_counter()
+    overall(summarize(appended, columns, capacity))
+    summary = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = full_statistics(appended, columns)
+    pandas_seconds = time.perf_counter() - start
+
+    describe = merged.describe()
+    quantile_cols = [f'{q:.0%}' for q in QUANTILES]
+    scale = (reference['describe']['max'] - reference['describe']['min']).replace(0, 1)
+    return {
+        'rows': len(appended),
+        'blocks': -(-len(appended) // block_rows),
+        'blocks_computed': computed,
+        'incremental_seconds': incremental,
+        'full_summary_seconds': summary,
+        'pandas_seconds': pandas_seconds,
+        'max_moment_error': float((describe[['mean', 'std']] - reference['describe'][['mean', 'std']]).abs()
+                                  .div(reference['describe']['std'].replace(0, 1), axis=0).max().max()),
+        'max_quantile_error': float((describe[quantile_cols] - reference['describe'][quantile_cols]).abs()
+                                    .div(scale, axis=0).max().max()),
+        'max_correlation_error': float(np.nanmax(np.abs(merged.correlation().values - reference['pearson'].values)))
+    }
+
+
+def main(argv=None):
+    """Print the merged describe table, or benchmark incremental refreshes after appending rows"""
+    from .dataset import load_dataset
+
+    parser = argparse.ArgumentParser(description="Mergeable per-partition statistics of the dataset")
+    parser.add_argument('--benchmark', type=int, metavar='N_NEW', help="Append N_NEW rows and time the refresh")
+    parser.add_argument('--rows', type=int, help="Tile the dataset to this many rows first (benchmark)")
+    parser.add_argument('--block-rows', type=int, default=BLOCK_ROWS)
+    parser.add_argument('--capacity', type=int, default=CAPACITY)
+    args = parser.parse_args(argv)
+
+    df = load_dataset()
+    if args.benchmark is None:
+        start = time.perf_counter()
+        state, computed = dataset_state(df, block_rows=args.block_rows, capacity=args.capacity)
+        describe = overall(state).describe()
+        print(f"📊 {len(df):,} rows in {-(-len(df) // args.block_rows)} partitions ({computed} computed) "
+              f"in {time.perf_counter() - start:.2f}s")
+        print(describe.round(3).to_string())
+        return
+
+    if args.rows and args.rows > len(df):
+        df = append_rows(df, args.rows - len(df), random_state=1)
+    result = benchmark(df, args.benchmark, args.block_rows, args.capacity)
+    print(f"⏱️ Appending {args.benchmark:,} rows to {len(df):,} "
+          f"({result['blocks_computed']} of {result['blocks']} partitions recomputed)")
+    print(f"   cached partitions + merge  {result['incremental_seconds']:.3f}s")
+    print(f"   full re-summary            {result['full_summary_seconds']:.3f}s")
+    print(f"   pandas recompute           {result['pandas_seconds']:.3f}s")
+    print(f"   max |error|: moments {result['max_moment_error']:.2e} (in std), "
+          f"quartiles {result['max_quantile_error']:.2e} (in range), "
+          f"correlation {result['max_correlation_error']:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Temporal Aggregates - Mediterranean Seagrass Intelligence Panel
+
+Derives the seasonal, annual and extreme columns of every variable from
+its monthly columns (``VOTEMPER_2015-01-01``, ..., ``VOTEMPER_2015-12-01``,
+with or without ``_maxDepth``).
+
+The shipped aggregates are reproduced exactly (to the 1e-9 rounding of
+the TSVs) with:
+
+    winter = mean(Jan, Feb, Dec) of the same calendar year
+    spring = mean(Mar, Apr, May)    summer = mean(Jun, Jul, Aug)
+    autumn = mean(Sep, Oct, Nov)    year   = mean of the 12 months
+    max<token>_year / min<token>_year = extreme monthly mean
+
+Months holding NetCDF fill values (|x| > 1e30) or NaN are skipped. Two
+absence stations carry such values in ZSD January to March. Their shipped
+ZSD aggregates came from other source data and cannot be rebuilt from
+the monthly columns; ``validate`` reports them as the only mismatches.
+
+Every monthly series (variable x year x depth) is stacked into one
+station x series x 12 array. The means are then one matrix product with
+a 12 x 5 weight matrix, and the extremes are one max/min reduction. Rows
+are processed in chunks, so memory does not grow with the input size.
+
+Usage (from the panel folder):
+    python -m seagrass.temporal                       # validate against the shipped TSVs
+    python -m seagrass.temporal monthly.parquet out.parquet
+"""
+
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+SEASONS = {
+    'winter': (12, 1, 2),
+    'spring': (3, 4, 5),
+    'summer': (6, 7, 8),
+    'autumn': (9, 10, 11)
+}
+MEANS = (*SEASONS, 'year')
+FILL_VALUE_LIMIT = 1e30  # NetCDF fill values (e.g. -3.4e38) leaked into a few ZSD months
+
+# Token used in the min/max column names (maxTemp_year, minVosa_year_maxDepth, ...)
+EXTREME_TOKENS = {
+    'VOTEMPER': 'Temp',
+    'VOSALINE': 'Vosa',
+    'CHL': 'CHL',
+    'NIT': 'NIT',
+    'ZSD': 'ZSD',
+    'PHO': 'PHO',
+    'VHM0': 'VHM0'
+}
+MONTHLY_PATTERN = re.compile(r'^(?P<var>[A-Za-z0-9]+)_(?P<year>\d{4})-(?P<month>\d{2})-01(?P<suffix>_maxDepth)?$')
+
+
+# ==================== COLUMN NAMES ====================
+def monthly_column(var, year, month, suffix=''):
+    return f'{var}_{year}-{month:02d}-01{suffix}'
+
+
+def mean_column(var, year, period, suffix=''):
+    return f'{var}_{year}_{period}{suffix}'
+
+
+def extreme_column(var, year, kind, suffix='', single_year=True):
+    """Shipped name (maxTemp_year) for single-year data; year-qualified otherwise"""
+    token = EXTREME_TOKENS.get(var, var)
+    return f'{kind}{token}_year{suffix}' if single_year else f'{kind}{token}_{year}{suffix}'
+
+
+def monthly_series(columns):
+    """(var, year, suffix) series with all 12 monthly columns present, in column order"""
+    found = {}
+    for col in columns:
+        match = MONTHLY_PATTERN.match(col)
+        if match:
+            key = (match['var'], int(match['year']), match['suffix'] or '')
+            found.setdefault(key, set()).add(int(match['month']))
+    return [key for key, months in found.items() if len(months) == 12]
+
+
+def aggregate_columns(series):
+    """Output column names for each series: 4 seasons, year, max, min"""
+    single_year = len({year for _, year, _ in series}) <= 1
+    names = []
+    for var, year, suffix in series:
+        names += [mean_column(var, year, period, suffix) for period in MEANS]
+        names += [extreme_column(var, year, kind, suffix, single_year) for kind in ('max', 'min')]
+    return names
+
+
+# ==================== ENGINE ====================
+def mean_weights():
+    """12 x 5 matrix turning monthly values into winter/spring/summer/autumn/year means"""
+    weights = np.zeros((12, len(MEANS)))
+    for j, months in enumerate(SEASONS.values()):
+        weights[[m - 1 for m in months], j] = 1 / len(months)
+    weights[:, -1] = 1 / 12
+    return weights
+
+
+def aggregate_array(monthly):
+    """(n, S, 12) monthly array -> (n, S, 7): seasons, year, max, min; missing months are skipped"""
+    weights = mean_weights()
+    with np.errstate(invalid='ignore'):
+        out = np.concatenate([monthly @ weights, monthly.max(axis=2, keepdims=True),
+                              monthly.min(axis=2, keepdims=True)], axis=2)
+
+    valid = np.abs(monthly) < FILL_VALUE_LIMIT  # False for NaN too
+    bad = ~valid.all(axis=(1, 2))
+    if bad.any():
+        # Masked recomputation only for the (rare) rows with missing months
+        values, valid = monthly[bad], valid[bad]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (np.where(valid, values, 0.0) @ weights) / (valid @ weights) * weights.sum(axis=0)
+        maxima = np.where(valid, values, -np.inf).max(axis=2, keepdims=True)
+        minima = np.where(valid, values, np.inf).min(axis=2, keepdims=True)
+        fixed = np.concatenate([means, maxima, minima], axis=2)
+        fixed[np.isinf(fixed)] = np.nan
+        out[bad] = fixed
+    return out
+
+
+def compute_aggregates(df, series=None, chunk_size=200_000):
+    """Seasonal, annual and extreme columns for every complete monthly series in df"""
+    series = monthly_series(df.columns) if series is None else series
+    if not series:
+        raise ValueError("No complete monthly series (VAR_YYYY-MM-01 x 12) found")
+    monthly_cols = [monthly_column(var, year, month, suffix)
+                    for var, year, suffix in series for month in range(1, 13)]
+
+    monthly = df[monthly_cols]
+    out = np.empty((len(df), len(series) * 7))
+    for start in range(0, len(df), chunk_size):
+        block = monthly.iloc[start:start + chunk_size].to_numpy(dtype=np.float64)
+        out[start:start + len(block)] = aggregate_array(block.reshape(len(block), len(series), 12)).reshape(len(block), -1)
+    return pd.DataFrame(out, columns=aggregate_columns(series), index=df.index)
+
+
+def add_aggregates(df, chunk_size=200_000):
+    """df with aggregate columns (re)computed and placed after each series' December column"""
+    series = monthly_series(df.columns)
+    aggregates = compute_aggregates(df, series, chunk_size)
+    base = df.drop(columns=[col for col in aggregates.columns if col in df.columns])
+
+    names = np.array(aggregates.columns).reshape(len(series), 7)
+    after = {monthly_column(var, year, 12, suffix): list(cols) for (var, year, suffix), cols in zip(series, names)}
+    order = []
+    for col in base.columns:
+        order.append(col)
+        order += after.get(col, [])
+    return pd.concat([base, aggregates], axis=1)[order]
+
+
+# ==================== VALIDATION ====================
+def validate(df, tolerance=1e-6):
+    """Largest absolute difference between recomputed and shipped aggregate columns, per series"""
+    series = monthly_series(df.columns)
+    computed = compute_aggregates(df, series)
+    rows = []
+    for (var, year, suffix), names in zip(series, np.array(computed.columns).reshape(len(series), 7)):
+        shipped = [name for name in names if name in df.columns]
+        if not shipped:
+            continue
+        diff = (computed[shipped] - df[shipped]).abs()
+        error = diff.max()
+        rows.append({'Series': f'{var}_{year}{suffix}', 'Columns checked': len(shipped),
+                     'Rows over tolerance': int((diff > tolerance).any(axis=1).sum()),
+                     'Max abs error': error.max(), 'Worst column': error.idxmax(),
+                     'OK': bool(error.max() <= tolerance)})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    """Validate against the shipped data, benchmark, or aggregate a monthly file"""
+    from .dataset import load_raw
+
+    parser = argparse.ArgumentParser(description="Seasonal / annual / extreme aggregates from monthly columns")
+    parser.add_argument('input', nargs='?', help="File with monthly columns (.parquet, .csv, .tsv)")
+    parser.add_argument('output', nargs='?', help="Output file (.parquet or .csv)")
+    parser.add_argument('--chunk-size', type=int, default=200_000)
+    parser.add_argument('--benchmark-rows', type=int, default=2_000_000)
+    args = parser.parse_args(argv)
+
+    if args.input:
+        from .scoring import ChunkWriter, iter_chunks
+
+        start, rows = time.perf_counter(), 0
+        with ChunkWriter(args.output) as writer:
+            for chunk in iter_chunks(args.input, args.chunk_size):
+                writer.write(add_aggregates(chunk, args.chunk_size))
+                rows += len(chunk)
+        print(f"✅ {rows:,} rows aggregated in {time.perf_counter() - start:.1f}s → {args.output}")
+        return
+
+    df = pd.concat(load_raw(), ignore_index=True)
+    report = validate(df)
+    print(f"🔎 Validation against shipped aggregates ({len(report)} series)")
+    print(report.to_string(index=False))
+
+    series = monthly_series(df.columns)
+    monthly_cols = [monthly_column(var, year, m, suffix) for var, year, suffix in series for m in range(1, 13)]
+    reps = -(-args.benchmark_rows // len(df))
+    big = pd.DataFrame(np.tile(df[monthly_cols].to_numpy(), (reps, 1))[:args.benchmark_rows], columns=monthly_cols)
+    start = time.perf_counter()
+    compute_aggregates(big, series, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"\n⏱️ {len(big):,} rows × {len(series)} series → {len(series) * 7} aggregate columns "
+          f"in {elapsed:.2f}s ({len(big) / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Geographic Zoning - Mediterranean Seagrass Intelligence Panel
+
+GEOGRAPHIC_ZONE is a KMeans clustering of station coordinates (k=8,
+random_state=42, n_init=10, as in the preprocessing notebook). The fitted
+centroids are persisted in ``data/zone_centroids.json`` and every station,
+old or new, is assigned by a vectorized nearest-centroid lookup. Zone IDs
+therefore never change when stations are added: nothing is re-clustered
+unless ``--refit`` is asked for explicitly.
+
+Usage (from the panel folder):
+    python -m seagrass.zoning              # elbow sweep + persisted zones summary
+    python -m seagrass.zoning --refit      # re-cluster and overwrite the centroids
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dataset import DATA_DIR, N_ZONES
+
+CENTROIDS_FILE = 'zone_centroids.json'
+COORD_COLS = ['LONGITUDE', 'LATITUDE']
+K_RANGE = range(3, 15)
+
+
+class Zoning:
+    """Fixed zone centroids with a nearest-centroid assignment"""
+
+    def __init__(self, centroids, meta=None):
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.meta = meta or {}
+
+    @property
+    def n_zones(self):
+        return len(self.centroids)
+
+    def assign(self, coordinates, chunk_size=1_000_000):
+        """Zone ID for each (lon, lat) row: index of the nearest centroid (Euclidean, like KMeans)"""
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        labels = np.empty(len(coordinates), dtype=np.int64)
+        for start in range(0, len(coordinates), chunk_size):
+            block = coordinates[start:start + chunk_size]
+            distances = ((block[:, np.newaxis, :] - self.centroids[np.newaxis]) ** 2).sum(axis=2)
+            labels[start:start + chunk_size] = distances.argmin(axis=1)
+        return labels
+
+    def assign_rows(self, rows):
+        """Zone IDs for a dataframe with LONGITUDE / LATITUDE columns"""
+        missing = [col for col in COORD_COLS if col not in rows.columns]
+        if missing:
+            raise ValueError(f"Cannot assign zones without coordinate columns {missing}")
+        return pd.Series(self.assign(rows[COORD_COLS].values), index=rows.index, name='GEOGRAPHIC_ZONE')
+
+    def save(self, path):
+        """Persist centroids and fit metadata as JSON"""
+        path = Path(path)
+        payload = {**self.meta, 'centroids': self.centroids.tolist()}
+        path.write_text(json.dumps(payload, indent=2))
+        return path
+
+
+# ==================== FITTING ====================
+def _fit_kmeans(coordinates, k, random_state=42, mini_batch=False):
+    """Fit one KMeans (or MiniBatchKMeans) and return it"""
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    if mini_batch:
+        model = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=10, batch_size=1024)
+    else:
+        model = KMeans(n_clusters=k, random_state=random_state, n_init=10)
+    return model.fit(coordinates)
+
+
+def fit_zoning(coordinates, n_zones=N_ZONES, random_state=42):
+    """Cluster coordinates with the notebook's KMeans settings"""
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    model = _fit_kmeans(coordinates, n_zones, random_state)
+    meta = {
+        'n_zones': n_zones,
+        'random_state': random_state,
+        'n_stations': len(coordinates),
+        'inertia': float(model.inertia_),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds')
+    }
+    return Zoning(model.cluster_centers_, meta)
+
+
+def elbow_sweep(coordinates, k_range=K_RANGE, random_state=42, mini_batch=False, n_jobs=-1):
+    """Inertia for each k, with the fits run in parallel"""
+    from joblib import Parallel, delayed
+
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+
+    def run(k):
+        start = time.perf_counter()
+        model = _fit_kmeans(coordinates, k, random_state, mini_batch)
+        return {'k': k, 'Inertia': model.inertia_, 'Fit time (s)': time.perf_counter() - start}
+
+    results = Parallel(n_jobs=n_jobs)(delayed(run)(k) for k in k_range)
+    return pd.DataFrame(results)
+
+
+# ==================== PERSISTENCE ====================
+def load_zoning(data_dir=DATA_DIR):
+    """Persisted zoning, or None when no centroids file exists yet"""
+    path = Path(data_dir) / CENTROIDS_FILE
+    if not path.exists():
+        return None
+    payload = json.loads(path.read_text())
+    centroids = payload.pop('centroids')
+    return Zoning(centroids, payload)
+
+
+def get_zoning(data_dir=DATA_DIR, coordinates=None):
+    """Persisted zoning; fitted once on the raw stations (and saved) if none exists"""
+    zoning = load_zoning(data_dir)
+    if zoning is not None:
+        return zoning
+
+    if coordinates is None:
+        from .dataset import load_raw
+
+        coordinates = pd.concat(load_raw(data_dir), ignore_index=True)[COORD_COLS].values
+    zoning = fit_zoning(coordinates)
+    zoning.save(Path(data_dir) / CENTROIDS_FILE)
+    return zoning
+
+
+def main(argv=None):
+    """Print the elbow sweep and the persisted zones"""
+    from .dataset import load_raw
+
+    parser = argparse.ArgumentParser(description="Geographic zoning of stations")
+    parser.add_argument('--refit', action='store_true', help="Re-cluster and overwrite the persisted centroids")
+    parser.add_argument('--mini-batch', action='store_true', help="Use MiniBatchKMeans for the elbow sweep")
+    parser.add_argument('--skip-sweep', action='store_true')
+    args = parser.parse_args(argv)
+
+    coordinates = pd.concat(load_raw(), ignore_index=True)[COORD_COLS].values
+
+    if not args.skip_sweep:
+        start = time.perf_counter()
+        sweep = elbow_sweep(coordinates, mini_batch=args.mini_batch)
+        print(f"📐 Elbow sweep k={K_RANGE.start}..{K_RANGE.stop - 1} "
+              f"({time.perf_counter() - start:.1f}s wall)")
+        print(sweep.round(3).to_string(index=False))
+
+    if args.refit:
+        zoning = fit_zoning(coordinates)
+        path = zoning.save(DATA_DIR / CENTROIDS_FILE)
+        print(f"\n⚠️ Zones re-clustered; zone IDs may have changed → {path}")
+    else:
+        zoning = get_zoning(coordinates=coordinates)
+
+    counts = pd.Series(zoning.assign(coordinates)).value_counts().sort_index()
+    summary = pd.DataFrame(zoning.centroids, columns=['Centroid Lon', 'Centroid Lat'])
+    summary.insert(0, 'Zone', range(zoning.n_zones))
+    summary['Stations'] = counts.reindex(summary['Zone'], fill_value=0).values
+    print(f"\n🗺️ {zoning.n_zones} persisted zones ({CENTROIDS_FILE})")
+    print(summary.round(4).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+"""
+Test configuration - Mediterranean Seagrass Intelligence Panel
+
+Makes the ``seagrass`` package importable when pytest runs from the panel folder.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
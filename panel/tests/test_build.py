@@ -0,0 +1,60 @@
+"""
+Build graph tests - Mediterranean Seagrass Intelligence Panel
+"""
+
+import pytest
+
+from seagrass import build as build_module
+from seagrass.build import Node, build, node_key, run_recorded
+from seagrass.runs import RunStore
+
+
+def record_node(data_dir):
+    """A run recorded in a store of the data folder"""
+    store = RunStore(data_dir / 'runs.sqlite')
+    run_id = store.record('binary', 'rf', 'spatial', {'accuracy': [0.5, 0.7]})
+    return {'run_id': run_id, 'model_id': 'rf', 'store': str(store.path)}
+
+
+def statuses(data_dir):
+    graph = [Node('run', record_node, check=run_recorded)]
+    return build(graph, data_dir)['Status'].tolist()
+
+
+def test_run_node_rebuilt_when_store_is_deleted(tmp_path):
+    """A deleted run store makes the cached run node outdated"""
+    assert statuses(tmp_path) == ['built']
+    assert statuses(tmp_path) == ['cached']
+
+    (tmp_path / 'runs.sqlite').unlink()
+    assert statuses(tmp_path) == ['built']
+    assert len(RunStore(tmp_path / 'runs.sqlite')) == 1
+
+
+def test_run_node_rebuilt_when_run_is_deleted(tmp_path):
+    """A run removed from the store is recorded again"""
+    statuses(tmp_path)
+    store = RunStore(tmp_path / 'runs.sqlite')
+    store.delete(int(store.runs()['run_id'].iloc[0]))
+
+    assert statuses(tmp_path) == ['built']
+    assert len(store) == 1
+
+
+def test_node_key_covers_the_modules_it_calls(tmp_path, monkeypatch):
+    """Editing a module in a node's code list changes its key; other modules do not"""
+    package = tmp_path / 'seagrass'
+    package.mkdir()
+    (package / 'dataset.py').write_text('COLUMNS = 1\n')
+    (package / 'service.py').write_text('PORT = 1\n')
+    monkeypatch.setattr(build_module, 'PACKAGE_DIR', package)
+    node = Node('stats', record_node, code=('dataset',))
+    key = node_key(node, tmp_path, {})
+
+    (package / 'service.py').write_text('PORT = 2\n')
+    assert node_key(node, tmp_path, {}) == key
+    (package / 'dataset.py').write_text('COLUMNS = 2\n')
+    assert node_key(node, tmp_path, {}) != key
+
+    with pytest.raises(ValueError, match='unknown seagrass module'):
+        node_key(Node('stats', record_node, code=('missing',)), tmp_path, {})
@@ -0,0 +1,38 @@
+"""
+Cross-validation splitter tests - Mediterranean Seagrass Intelligence Panel
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import cross_val_predict
+from sklearn.tree import DecisionTreeClassifier
+
+from seagrass.cv import BufferedSpatialCV, make_cv
+from seagrass.dataset import ZONE_COL
+
+
+@pytest.fixture
+def rows():
+    """Stations of four zones, one degree of longitude apart"""
+    rng = np.random.default_rng(0)
+    zone = np.repeat([1, 2, 3, 4], 25)
+    return pd.DataFrame({ZONE_COL: zone, 'LONGITUDE': zone + rng.uniform(0, 0.5, 100),
+                         'LATITUDE': 40 + rng.uniform(0, 0.5, 100)})
+
+
+def test_buffered_splitter_keeps_its_zone_groups(rows):
+    """get_n_splits() without groups, as sklearn calls it, counts the zones"""
+    cv, groups = make_cv(rows, 'buffered', radius_km=5.0)
+    assert cv.get_n_splits() == 4
+
+    X, y = rows[['LONGITUDE', 'LATITUDE']], rows[ZONE_COL] % 2 == 0
+    assert len(cross_val_predict(DecisionTreeClassifier(), X, y, cv=cv)) == len(rows)
+    assert [len(test) for _, test in cv.split(X)] == [25] * 4
+
+
+def test_buffered_splitter_without_groups_raises(rows):
+    cv = BufferedSpatialCV(rows[['LONGITUDE', 'LATITUDE']].values)
+    with pytest.raises(ValueError, match='zone groups'):
+        cv.get_n_splits()
+    assert cv.get_n_splits(groups=rows[ZONE_COL]) == 4
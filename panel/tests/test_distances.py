@@ -0,0 +1,42 @@
+"""
+Distance predictor tests - Mediterranean Seagrass Intelligence Panel
+"""
+
+import numpy as np
+import pytest
+
+from seagrass.distances import GeometryIndex
+
+
+def exact_distance(points, lines):
+    """Brute-force planar distance from each point to every segment of the lines"""
+    best = np.full(len(points), np.inf)
+    for line in lines:
+        line = np.asarray(line, dtype=np.float64)
+        for a, b in zip(line[:-1], line[1:]):
+            ab = b - a
+            t = np.clip(((points - a) @ ab) / (ab @ ab), 0.0, 1.0)
+            best = np.minimum(best, np.hypot(*(points - (a + t[:, np.newaxis] * ab)).T))
+    return best
+
+
+def test_line_end_points_are_vertices():
+    """Past the end of a line, the line end wins over a farther isolated point"""
+    index = GeometryIndex(points=[[(1.5, 0.3)]], lines=[[(0.0, 0.0), (1.0, 0.0)]], spacing=0.4)
+
+    assert (1.0, 0.0) in {tuple(vertex) for vertex in index.tree.data}
+    assert index.distance([(1.2, 0.0)], k=1)[0] == pytest.approx(0.2)
+
+
+def test_error_stays_within_half_the_spacing():
+    """With the single nearest vertex, the distance is never more than spacing / 2 too large"""
+    rng = np.random.default_rng(0)
+    lines = [np.cumsum(rng.normal(scale=0.3, size=(rng.integers(2, 6), 2)), axis=0) for _ in range(20)]
+    points = rng.uniform(-2, 2, size=(2000, 2))
+    spacing = 0.25
+
+    computed = GeometryIndex(lines=lines, spacing=spacing).distance(points, k=1)
+    exact = exact_distance(points, lines)
+
+    assert (computed >= exact - 1e-12).all()
+    assert (computed - exact).max() <= spacing / 2 + 1e-12
@@ -0,0 +1,31 @@
+"""
+Model definition tests - Mediterranean Seagrass Intelligence Panel
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from seagrass.models import IMPUTED_MODELS, final_estimator, make_model
+
+
+@pytest.mark.parametrize('model_id', IMPUTED_MODELS)
+def test_fill_values_are_masked_and_imputed(model_id):
+    """A leaked 1e38 fill value and a NaN in raw features neither crash nor dominate the fit"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'x': rng.normal(size=200), 'z': rng.normal(size=200)})
+    y = X['x'] > 0
+    X.loc[:9, 'z'] = -3.4e38
+    X.loc[10, 'x'] = np.nan
+
+    model = make_model(model_id, n_jobs=1).fit(X, y)
+
+    assert list(model.feature_names_in_) == ['x', 'z']
+    assert final_estimator(model) is not model
+    assert (model.predict(X) == y).mean() > 0.9
+
+
+def test_tree_models_stay_bare():
+    """Trees take the raw features as they are"""
+    model = make_model('rf', n_jobs=1)
+    assert final_estimator(model) is model
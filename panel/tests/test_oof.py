@@ -0,0 +1,53 @@
+"""
+Out-of-fold prediction tests - Mediterranean Seagrass Intelligence Panel
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression, RidgeClassifier
+
+from seagrass.dataset import ZONE_COL
+from seagrass.oof import (CLASS_PREFIX, confusion_at, curve_index, oof_frame, prediction_scores, threshold_curve,
+                          threshold_metrics, zone_metrics)
+
+CLASSES = np.array(['Cymodocea', 'Posidonia', 'Zostera'], dtype=object)
+
+
+@pytest.mark.parametrize('estimator', [LogisticRegression(), RidgeClassifier()])
+def test_fold_without_a_class_keeps_its_columns(estimator):
+    """A fold model that never saw Posidonia writes its scores under its own classes"""
+    X = pd.DataFrame({'x': [-2.0, -1.5, -1.0, 1.0, 1.5, 2.0]})
+    y = np.array(['Cymodocea'] * 3 + ['Zostera'] * 3, dtype=object)
+    model = estimator.fit(X, y)
+
+    scores, kind = prediction_scores(model, X, CLASSES)
+    rows = pd.DataFrame({'ID': np.arange(6), ZONE_COL: np.zeros(6, dtype=int)})
+    frame = oof_frame(rows, y, [(0, np.arange(6), scores)], 'lr', CLASSES, kind)
+
+    labels = [col[len(CLASS_PREFIX):] for col in frame.columns if col.startswith(CLASS_PREFIX)]
+    predicted = np.array(labels, dtype=object)[frame[[CLASS_PREFIX + c for c in labels]].to_numpy().argmax(axis=1)]
+    assert labels == list(CLASSES)
+    assert (predicted == model.predict(X)).all()
+    missing = frame[f'{CLASS_PREFIX}Posidonia']
+    assert (missing == 0).all() if kind == 'probability' else np.isneginf(missing).all()
+
+
+def test_threshold_metrics_predict_above_the_threshold():
+    """A score equal to the threshold is negative, like predict on p = 0.5"""
+    y_true = np.array([True, False, True, False, True])
+    score = np.array([0.9, 0.5, 0.5, 0.2, 0.7], dtype=np.float32)
+    thresholds = [0.0, 0.2, 0.5, 0.7, 0.9, 1.0]
+
+    tp, fp, fn, tn = confusion_at(y_true, score, thresholds)
+    for i, threshold in enumerate(thresholds):
+        predicted = score > np.float32(threshold)
+        assert (tp[i], fp[i]) == ((predicted & y_true).sum(), (predicted & ~y_true).sum())
+
+    curve = threshold_curve(y_true, score)
+    table = threshold_metrics(y_true, score, thresholds)
+    for threshold, (_, row) in zip(thresholds, table.iterrows()):
+        assert curve.iloc[curve_index(curve, threshold)][['TP', 'FP']].tolist() == row[['TP', 'FP']].tolist()
+
+    frame = pd.DataFrame({'zone': np.zeros(5, dtype=np.int8), 'y_true': y_true, 'score': score})
+    assert zone_metrics(frame, 0.5)['Precision'].iloc[0] == 1.0
@@ -0,0 +1,37 @@
+"""
+Raster sampler tests - Mediterranean Seagrass Intelligence Panel
+"""
+
+import numpy as np
+import pytest
+
+xr = pytest.importorskip('xarray')
+
+from seagrass.rasters import RasterSource  # noqa: E402
+
+
+def grid(lon, lat):
+    """Bathymetry-like field equal to 100 * lon + lat on the given axes"""
+    return xr.DataArray(100 * lon[np.newaxis, :] + lat[:, np.newaxis], name='elevation',
+                        dims=('latitude', 'longitude'), coords={'latitude': lat, 'longitude': lon})
+
+
+def test_regular_grid_is_sampled_at_its_cells():
+    source = RasterSource(grid(np.arange(10.0, 12.0, 0.25), np.arange(40.0, 41.0, 0.25)))
+    values = source.sample([10.5, 11.75], [40.25, 40.75])['surface'][:, 0]
+    np.testing.assert_allclose(values, [1090.25, 1215.75])
+
+
+def test_curvilinear_grid_is_rejected():
+    """NEMO-style x / y dimensions with 2-D nav_lon / nav_lat are not read as lon / lat axes"""
+    nav_lon, nav_lat = np.meshgrid(np.linspace(10, 12, 8), np.linspace(40, 41, 4))
+    array = xr.DataArray(np.zeros((4, 8)), name='elevation', dims=('y', 'x'),
+                         coords={'nav_lon': (('y', 'x'), nav_lon + 0.1 * nav_lat),
+                                 'nav_lat': (('y', 'x'), nav_lat)})
+    with pytest.raises(ValueError, match='curvilinear'):
+        RasterSource(array)
+
+
+def test_irregular_axis_is_rejected():
+    with pytest.raises(ValueError, match='not regularly spaced'):
+        RasterSource(grid(np.array([10.0, 10.25, 10.5, 11.0]), np.arange(40.0, 41.0, 0.25)))
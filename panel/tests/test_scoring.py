@@ -0,0 +1,37 @@
+"""
+Batch scoring tests - Mediterranean Seagrass Intelligence Panel
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from seagrass.scoring import score_file
+
+
+@pytest.fixture
+def models():
+    """Tiny binary and family models on one feature: presence rises with x"""
+    rng = np.random.default_rng(0)
+    train = pd.DataFrame({'x': rng.normal(size=400)})
+    binary = LogisticRegression().fit(train, train['x'] > 0)
+    family = LogisticRegression().fit(train, np.where(train['x'] > 1, 'Posidonia', 'Cymodocea'))
+    return binary, family
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.csv'])
+def test_gated_scoring_with_first_chunk_below_gate(tmp_path, models, suffix):
+    """No row of the first chunk reaches the gate; later chunks still get families"""
+    binary, family = models
+    grid = pd.DataFrame({'ID': np.arange(200), 'x': np.r_[np.full(100, -5.0), np.full(100, 5.0)]})
+    grid.to_csv(tmp_path / 'grid.csv', index=False)
+
+    output = tmp_path / f'scores{suffix}'
+    report = score_file(tmp_path / 'grid.csv', output, binary, family, chunk_size=100, family_gate=0.5)
+    scores = pd.read_parquet(output) if suffix == '.parquet' else pd.read_csv(output)
+
+    assert report['rows'] == 200
+    assert scores['Predicted_Family'].iloc[:100].isna().all()
+    assert scores['Predicted_Family'].iloc[100:].notna().all()
+    assert scores['P_Posidonia'].iloc[:100].isna().all()
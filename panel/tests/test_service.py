@@ -0,0 +1,65 @@
+"""
+Prediction service tests - Mediterranean Seagrass Intelligence Panel
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from seagrass.service import DEFAULT_BACKLOG, PredictionService, load_test, serve
+
+
+def test_load_test_reports_client_and_server_latency():
+    """Concurrent clients above the old backlog of 5 are all answered"""
+    rng = np.random.default_rng(0)
+    rows = pd.DataFrame({'x': rng.normal(size=100)})
+    service = PredictionService(LogisticRegression().fit(rows, rows['x'] > 0))
+    server = serve(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        report = load_test(f'http://{host}:{port}', rows, n_requests=64, concurrency=32)
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+    assert server.request_queue_size == DEFAULT_BACKLOG
+    assert report['requests'] == 64
+    assert report['latency_ms']['p95'] >= report['server_latency_ms']['p50'] > 0
+
+
+class BrokenModel:
+    """Passes the schema checks, then fails inside the batched predict call"""
+    feature_names_in_ = np.array(['x'], dtype=object)
+    classes_ = np.array([False, True])
+
+    def predict_proba(self, X):
+        raise FloatingPointError("overflow in model")
+
+
+def test_predict_error_returns_json_500():
+    """An unexpected error from the batcher still answers the client"""
+    service = PredictionService(BrokenModel())
+    server = serve(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        request = urllib.request.Request(f'http://{host}:{port}/predict', data=json.dumps({'x': 1.0}).encode(),
+                                         headers={'Content-Type': 'application/json'})
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+    assert error.value.code == 500
+    assert json.loads(error.value.read()) == {'error': 'FloatingPointError: overflow in model'}
+    assert service.metrics.errors == 1
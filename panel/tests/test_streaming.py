@@ -0,0 +1,107 @@
+"""
+Out-of-core training tests - Mediterranean Seagrass Intelligence Panel
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+
+from seagrass.cv import make_cv
+from seagrass.dataset import ZONE_COL
+from seagrass.scoring import read_table
+from seagrass.streaming import FoldMetrics, StreamFolds, histogram_auc
+
+
+def test_histogram_auc_matches_sklearn_with_ties():
+    """Scores that share a bin are ties, counted one half like roc_auc_score"""
+    rng = np.random.default_rng(0)
+    y = rng.random(300) < 0.4
+    score_bin = rng.integers(0, 50, 300) + 10 * y
+    histogram = np.zeros((1, 2, 64), dtype=np.int64)
+    np.add.at(histogram, (0, y.astype(int), score_bin), 1)
+
+    assert histogram_auc(histogram)[0] == pytest.approx(roc_auc_score(y, score_bin))
+
+
+def stream(metrics, y_codes, proba, margin, folds, chunk_size=37):
+    """Feed held-out rows to FoldMetrics in chunks, one fold at a time within each chunk"""
+    for start in range(0, len(y_codes), chunk_size):
+        rows = slice(start, start + chunk_size)
+        for fold in np.unique(folds[rows]):
+            mask = folds[rows] == fold
+            metrics.update(fold, y_codes[rows][mask], proba[rows][mask], margin[rows][mask])
+
+
+def test_binary_fold_scores_match_sklearn():
+    """Confusion counts and the margin histogram reproduce the sklearn metrics of every fold"""
+    rng = np.random.default_rng(1)
+    n = 400
+    margin = np.sinh(rng.permutation(np.linspace(-5, 5, n)))  # one histogram bin per row
+    y = rng.random(n) < 1 / (1 + np.exp(-np.arcsinh(margin)))
+    p = 1 / (1 + np.exp(-margin))
+    folds = rng.integers(0, 3, n)
+    metrics = FoldMetrics('binary', 3, 2)
+    stream(metrics, y.astype(np.int64), np.column_stack([1 - p, p]), margin, folds)
+
+    scores = metrics.fold_scores()
+    for fold in range(3):
+        held_out = folds == fold
+        truth, predicted = y[held_out], p[held_out] > 0.5
+        assert scores['accuracy'][fold] == pytest.approx(accuracy_score(truth, predicted))
+        assert scores['precision'][fold] == pytest.approx(precision_score(truth, predicted))
+        assert scores['recall'][fold] == pytest.approx(recall_score(truth, predicted))
+        assert scores['f1'][fold] == pytest.approx(f1_score(truth, predicted))
+        assert scores['roc_auc'][fold] == pytest.approx(roc_auc_score(truth, margin[held_out]))
+
+
+def test_family_fold_scores_match_sklearn():
+    """Weighted precision / recall and macro F1 over the labels seen in each fold"""
+    rng = np.random.default_rng(2)
+    n, k = 300, 4
+    y = rng.integers(0, k, n)
+    proba = rng.dirichlet(np.ones(k), n)
+    proba[np.arange(n), y] += rng.random(n) * 0.5
+    folds = rng.integers(0, 3, n)
+    metrics = FoldMetrics('family', 3, k)
+    stream(metrics, y, proba, np.zeros(n), folds)
+
+    scores = metrics.fold_scores()
+    for fold in range(3):
+        truth, predicted = y[folds == fold], proba[folds == fold].argmax(axis=1)
+        assert scores['accuracy'][fold] == pytest.approx(accuracy_score(truth, predicted))
+        assert scores['precision_weighted'][fold] == pytest.approx(
+            precision_score(truth, predicted, average='weighted', zero_division=0))
+        assert scores['recall_weighted'][fold] == pytest.approx(
+            recall_score(truth, predicted, average='weighted', zero_division=0))
+        assert scores['f1_macro'][fold] == pytest.approx(f1_score(truth, predicted, average='macro'))
+
+
+def test_spatial_stream_folds_match_make_cv():
+    """Streamed zone folds hold out the same rows as the GroupKFold of make_cv"""
+    rng = np.random.default_rng(3)
+    rows = pd.DataFrame({ZONE_COL: rng.choice([1, 2, 4, 5, 7], 500, p=[0.4, 0.25, 0.15, 0.1, 0.1])})
+    y = rng.random(500) < 0.5
+    summary = {'zones': np.unique(rows[ZONE_COL]), 'classes': np.array([False, True])}
+    folds = StreamFolds('spatial', summary)
+    folds.reset()
+    assigned = np.concatenate([folds.assign(rows.iloc[start:start + 64], y[start:start + 64])
+                               for start in range(0, 500, 64)])
+
+    cv, groups = make_cv(rows, 'spatial')
+    expected = {frozenset(test) for _, test in cv.split(rows, y, groups)}
+    assert folds.n_splits == cv.get_n_splits()
+    assert {frozenset(np.flatnonzero(assigned == fold)) for fold in range(folds.n_splits)} == expected
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.csv', '.tsv', '.txt'])
+def test_read_table_formats(tmp_path, suffix):
+    """The in-memory reference reads every format the streamed path accepts"""
+    frame = pd.DataFrame({'ID': np.arange(5), 'x': np.linspace(0, 1, 5)})
+    path = tmp_path / f'rows{suffix}'
+    if suffix == '.parquet':
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, sep='\t' if suffix in ('.tsv', '.txt') else ',', index=False)
+
+    pd.testing.assert_frame_equal(read_table(path), frame)